@@ -1,12 +1,30 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
+from utils.assets import install_built_templates
+from utils.compression import CompressionMiddleware
+from utils.json_provider import FastJSONProvider
+from utils.metrics import install_metrics
+from utils.session_store import make_session_interface
+
 def create_app():
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_pyfile('config.py')
+
+    # Templates with inline CSS/JS moved to /assets (flask --app app templates build-assets)
+    install_built_templates(app)
+
+    # JSON encoding (orjson when available)
+    app.json = FastJSONProvider(app)
+
+    # Server-side session store (cookie only carries the session ID)
+    session_interface = make_session_interface(app.config)
+    if session_interface is not None:
+        app.session_interface = session_interface
     
     # CORS configuration
     CORS(app, supports_credentials=True, resources={
@@ -19,14 +37,37 @@ def create_app():
         }
     })
     
+    # Per-route latency/status metrics (GET /metrics); hooks go in ahead of the blueprints'
+    if app.config.get("METRICS_ENABLED", True):
+        install_metrics(app)
+
     # Register blueprints
     from routes.auth_routes import auth_bp
     from routes.appointment_routes import appointment_bp
     from routes.template_routes import template_bp
+    from routes.stats_routes import stats_bp
+    from routes.metrics_routes import metrics_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(appointment_bp)
     app.register_blueprint(template_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(metrics_bp)
+
+    # Client address/scheme from X-Forwarded-* set by our own proxies (rate-limit keys)
+    trusted_proxies = app.config.get("TRUSTED_PROXIES", 0)
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+
+    # gzip/br for dynamic responses; precompressed pages and assets pass through
+    if app.config.get("COMPRESSION_ENABLED", True):
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config.get("COMPRESSION_MIN_SIZE", 500),
+            level=app.config.get("COMPRESSION_LEVEL", 6),
+            br_quality=app.config.get("COMPRESSION_BR_QUALITY", 4),
+        )
+        app.extensions["compression_stats"] = app.wsgi_app.stats
     
     return app
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Bloom filter footprint and false-positive rate for the signup availability check.
+
+Usage: python benchmarks/bench_bloom.py [--accounts 1000000] [--probes 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.bloom import BloomFilter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--probes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"accounts={args.accounts:,} probes={args.probes:,}")
+    print(f"{'target fp':>10} {'bits/key':>9} {'hashes':>7} {'MiB':>7} {'build s':>8} "
+          f"{'us/lookup':>10} {'measured fp':>12}")
+    for error_rate in (0.01, 0.001):
+        bloom = BloomFilter(args.accounts, error_rate)
+        start = time.perf_counter()
+        for i in range(args.accounts):
+            bloom.add(f"staff{i}@example.com")
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = sum(f"candidate{i}@example.com" in bloom for i in range(args.probes))
+        lookup = (time.perf_counter() - start) / args.probes * 1e6
+
+        print(f"{error_rate:>10} {bloom.num_bits / args.accounts:>9.2f} {bloom.num_hashes:>7} "
+              f"{bloom.size_bytes / 2**20:>7.2f} {build:>8.2f} {lookup:>10.2f} {hits / args.probes:>12.5f}")
+    print("Two filters (username + email) are kept per worker.")
+
+
+if __name__ == "__main__":
+    main()
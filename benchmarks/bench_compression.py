@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compression level tuning: CPU time per response vs bytes saved, per encoding.
+
+Runs a search-sized JSON body and a streamed calendar through
+CompressionMiddleware at each level and prints the same counters
+GET /stats/compression reports in production.
+
+Usage: python benchmarks/bench_compression.py [--rows 200] [--requests 200]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, Response, jsonify
+
+from utils.compression import ENCODINGS, CompressionMiddleware
+
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 11)}
+
+
+def make_app(rows, level, br_quality):
+    app = Flask(__name__)
+    appointments = [
+        {
+            "Appointment_id": i,
+            "Date": (date(2025, 1, 1) + timedelta(days=i % 365)).isoformat(),
+            "Time": f"{8 + i % 9:02d}:00:00",
+            "Notes": "Customer waiting",
+            "Car_plate": f"ABC{i:05d}",
+            "Services": "Oil Change,Tire Rotation",
+        }
+        for i in range(rows)
+    ]
+
+    @app.route("/search")
+    def search():
+        return jsonify({"status": "success", "appointments": appointments})
+
+    @app.route("/calendar")
+    def calendar():
+        def generate():
+            for row in appointments:
+                yield (f"BEGIN:VEVENT\r\nUID:appointment-{row['Appointment_id']}@shop\r\n"
+                       f"DTSTART:{row['Date'].replace('-', '')}T{row['Time'].replace(':', '')}\r\n"
+                       f"SUMMARY:{row['Car_plate']} - {row['Services']}\r\nEND:VEVENT\r\n")
+        return Response(generate(), mimetype="text/calendar")
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, level=level, br_quality=br_quality)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'path':<10} {'enc':<5} {'level':>5} {'ratio':>7} {'saved/req':>10} {'cpu us/req':>11} {'us/KiB saved':>13}")
+    for encoding in ENCODINGS:
+        for level in LEVELS[encoding]:
+            for path in ("/search", "/calendar"):
+                app = make_app(args.rows, level, level)
+                client = app.test_client()
+                for _ in range(args.requests):
+                    client.get(path, headers={"Accept-Encoding": encoding}).get_data()  # drain streams
+                counters = app.wsgi_app.stats.snapshot()["encodings"][encoding]
+                n = counters["responses"]
+                print(f"{path:<10} {encoding:<5} {level:>5} {counters['ratio']:>7.3f} "
+                      f"{counters['bytes_saved'] // n:>10} {counters['cpu_ms'] * 1000 / n:>11.1f} "
+                      f"{counters['cpu_us_per_kib_saved']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
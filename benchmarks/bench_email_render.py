@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Reminder rendering cost per message, next to the cost of sending one.
+
+Times the template body alone, the full EmailMessage, and its wire
+serialization (what smtplib does before sending).
+
+Usage: python benchmarks/bench_email_render.py [--messages 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.mail_templates import ReminderRenderer
+
+
+def rows(count):
+    for i in range(count):
+        yield {"plate_number": f"P{i:07d}", "owner_name": "Sam Driver", "model": "Civic",
+               "next_oil_change_due": date(2030, 1, 25), "owner_email": f"owner{i}@example.com"}
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>22} {elapsed / count * 1e6:>9.1f} us/msg {count / elapsed:>10.0f} msg/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20_000)
+    args = parser.parse_args()
+    n = args.messages
+
+    start = time.perf_counter()
+    renderer = ReminderRenderer("https://garage.example.com", "shop@example.com")
+    print(f"template load + compile: {(time.perf_counter() - start) * 1000:.1f} ms (once per process)")
+    print(f"messages={n:,}")
+    timed("body only", n, lambda: [renderer.render_body(row) for row in rows(n)])
+    timed("message", n, lambda: [m for _, m in renderer.render_batch(rows(n))])
+    timed("message + bytes", n, lambda: [m.as_bytes() for _, m in renderer.render_batch(rows(n))])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-field serialize() + stdlib jsonify vs compiled row encoder + FastJSONProvider.
+
+Usage: python benchmarks/bench_json_encoding.py
+"""
+
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from mysql.connector import FieldType
+
+from utils.helper import serialize
+from utils.json_provider import FastJSONProvider, compile_row_encoder, orjson
+
+DESCRIPTION = [
+    ("Appointment_id", FieldType.LONG),
+    ("Date", FieldType.DATE),
+    ("Time", FieldType.TIME),
+    ("Notes", FieldType.VAR_STRING),
+    ("Car_plate", FieldType.VAR_STRING),
+    ("Services", FieldType.BLOB),
+]
+
+
+def make_rows(n):
+    return [
+        {
+            "Appointment_id": i,
+            "Date": date(2025, 1, 1) + timedelta(days=i % 365),
+            "Time": timedelta(hours=8 + i % 9),
+            "Notes": "Customer waiting",
+            "Car_plate": f"ABC{i:05d}",
+            "Services": "Oil Change,Tire Rotation",
+        }
+        for i in range(n)
+    ]
+
+
+def baseline(app, rows):
+    out = []
+    for row in rows:
+        row = dict(row)
+        for k, v in row.items():
+            row[k] = serialize(v)
+        out.append(row)
+    return app.json.response({"status": "success", "appointments": out}).get_data()
+
+
+def compiled(app, rows):
+    encode = compile_row_encoder(DESCRIPTION)
+    out = [encode(row) for row in rows]
+    return app.json.response({"status": "success", "appointments": out}).get_data()
+
+
+def main():
+    stdlib_app = Flask("bench_stdlib")
+    stdlib_app.json = DefaultJSONProvider(stdlib_app)
+    fast_app = Flask("bench_fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    print(f"JSON backend: {'orjson' if orjson else 'stdlib json'}")
+    print(f"{'rows':>8} {'baseline ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for n, number in ((1, 20000), (100, 500), (10000, 5)):
+        rows = make_rows(n)
+        with stdlib_app.app_context():
+            t_base = min(timeit.repeat(lambda: baseline(stdlib_app, rows), number=number, repeat=3)) / number
+        with fast_app.app_context():
+            t_fast = min(timeit.repeat(lambda: compiled(fast_app, rows), number=number, repeat=3)) / number
+        print(f"{n:>8} {t_base * 1000:>12.4f} {t_fast * 1000:>12.4f} {t_base / t_fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Per-request cost of the /metrics instrumentation.
+
+Times a trivial route through the WSGI stack with and without
+install_metrics, plus the bare RequestMetrics.finish() call and a
+/metrics render for the app's full route set.
+
+Usage: python benchmarks/bench_metrics.py [--requests 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from werkzeug.test import EnvironBuilder
+
+from utils.metrics import RequestMetrics, install_metrics, render_prometheus
+
+
+def make_app(instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        install_metrics(app)
+
+    @app.route("/ping")
+    def ping():
+        return "pong"
+
+    return app
+
+
+def per_request_us(app, requests):
+    environ = EnvironBuilder(path="/ping").get_environ()
+
+    def start_response(status, headers, exc_info=None):
+        return None
+
+    def request():
+        # As a WSGI server does: iterate the body, then close it
+        app_iter = app.wsgi_app(dict(environ), start_response)
+        try:
+            b"".join(app_iter)
+        finally:
+            app_iter.close()
+
+    for _ in range(1000):  # warm-up
+        request()
+    started = time.perf_counter()
+    for _ in range(requests):
+        request()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    bare = min(per_request_us(make_app(False), args.requests) for _ in range(3))
+    instrumented = min(per_request_us(make_app(True), args.requests) for _ in range(3))
+    print(f"request without metrics: {bare:7.2f} us")
+    print(f"request with metrics:    {instrumented:7.2f} us  (+{instrumented - bare:.2f} us)")
+
+    metrics = RequestMetrics()
+    metrics.start("appointments")
+    n = 100000
+    cost = timeit.timeit(lambda: (metrics.start("appointments"),
+                                  metrics.finish("appointments", "appointments.book", "POST", 201, 4200)),
+                         number=n) / n * 1e6
+    print(f"start() + finish():      {cost:7.2f} us")
+
+    rng = random.Random(1)
+    for i in range(40):  # about the size of the app's URL map
+        for _ in range(500):
+            metrics.start(f"bp{i % 5}")
+            metrics.finish(f"bp{i % 5}", f"bp{i % 5}.route{i}", "GET", rng.choice((200, 200, 200, 404, 500)),
+                           int(rng.lognormvariate(8, 1)))
+    started = time.perf_counter()
+    text = render_prometheus(metrics.collect())
+    print(f"/metrics render:         {(time.perf_counter() - started) * 1000:7.2f} ms "
+          f"({len(text.splitlines())} lines, 40 routes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Template page throughput: render_template per request vs the rendered-page cache.
+
+Usage: python benchmarks/bench_page_cache.py [--requests 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import render_template
+
+from app import create_app
+from utils.page_cache import cached_page
+
+PAGES = ["login.html", "signup.html", "appointment.html", "viewAppointment.html"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.debug = False
+
+    cases = [
+        ("render_template", lambda name: render_template(name), {}),
+        ("cache", cached_page, {}),
+        ("cache + gzip", cached_page, {"Accept-Encoding": "gzip, br"}),
+    ]
+    print(f"requests={args.requests} per case, pages={', '.join(PAGES)}")
+    print(f"{'case':>16} {'req/s':>9} {'bytes/resp':>11}")
+    for label, handler, headers in cases:
+        total_bytes = 0
+        start = time.perf_counter()
+        for i in range(args.requests):
+            with app.test_request_context(headers=headers):
+                response = app.make_response(handler(PAGES[i % len(PAGES)]))
+                total_bytes += len(response.get_data())
+        elapsed = time.perf_counter() - start
+        print(f"{label:>16} {args.requests / elapsed:>9.0f} {total_bytes // args.requests:>11}")
+
+    etags = {}
+    with app.test_request_context():
+        for name in PAGES:
+            etags[name] = cached_page(name).headers["ETag"]
+    start = time.perf_counter()
+    for i in range(args.requests):
+        name = PAGES[i % len(PAGES)]
+        with app.test_request_context(headers={"If-None-Match": etags[name]}):
+            cached_page(name)
+    elapsed = time.perf_counter() - start
+    print(f"{'304 revalidate':>16} {args.requests / elapsed:>9.0f} {0:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Mixed login + booking traffic with password hashing inline vs in a process pool.
+
+Login threads hammer /login while a booking thread measures /book latency
+(the database is faked so only CPU contention is measured).
+
+Usage: python benchmarks/bench_password_pool.py [--seconds 3] [--login-threads 4]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+
+
+def fake_connection(stored_hash):
+    conn = MagicMock()
+    cursor = conn.cursor.return_value
+    cursor.fetchone.return_value = (stored_hash,)
+    cursor.fetchall.return_value = [(1,), (2,)]
+    cursor.lastrowid = 1
+    return conn
+
+
+def run(pool_size, seconds, login_threads, method):
+    app = create_app()
+    app.config.update(HASH_POOL_WORKERS=pool_size, PASSWORD_HASH_METHOD=method, DEBUG=False)
+    stored = generate_password_hash("benchpass", method)
+    booking = json.dumps({
+        "car_plate": "BENCH1",
+        "date": (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
+        "time": "10:00",
+        "service_ids": [1],
+    })
+    stop = threading.Event()
+    logins = []
+    latencies = []
+
+    def login_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            client.post("/login", data=json.dumps({"username": "u", "password": "benchpass"}),
+                        content_type="application/json")
+            logins.append(1)
+
+    def booking_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.post("/book", data=booking, content_type="application/json")
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    with patch("routes.auth_routes.get_connection", side_effect=lambda: fake_connection(stored)), \
+         patch("routes.appointment_routes.get_connection", side_effect=lambda: fake_connection(stored)):
+        threads = [threading.Thread(target=login_loop) for _ in range(login_threads)]
+        threads.append(threading.Thread(target=booking_loop))
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    hasher = app.extensions.get("password_hasher")
+    if hasher:
+        hasher.shutdown()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return len(logins) / seconds, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--login-threads", type=int, default=4)
+    parser.add_argument("--method", default="pbkdf2:sha256:200000")
+    args = parser.parse_args()
+
+    print(f"method={args.method} login_threads={args.login_threads} cpus={os.cpu_count()}")
+    print(f"{'pool':>6} {'logins/s':>9} {'book p50 ms':>12} {'book p99 ms':>12}")
+    for pool_size in (0, 1, 2, 4):
+        rate, p50, p99 = run(pool_size, args.seconds, args.login_threads, args.method)
+        label = "inline" if pool_size == 0 else str(pool_size)
+        print(f"{label:>6} {rate:>9.1f} {p50:>12.2f} {p99:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
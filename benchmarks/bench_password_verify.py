@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Per-scheme password verify cost, to pick PASSWORD_HASH_METHOD for the login latency budget.
+
+Usage: python benchmarks/bench_password_verify.py [--budget-ms 100]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.security import generate_password_hash
+
+from utils.passwords import identify_scheme, verify_any
+
+PASSWORD = "correct horse battery"
+
+
+def legacy_scrypt(n=8192, r=4, p=1):
+    salt = os.urandom(16).hex()
+    digest = hashlib.scrypt(PASSWORD.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p, maxmem=132 * n * r * p).hex()
+    return f"scrypt:{n}:{r}:{p}${salt}${digest}"
+
+
+CANDIDATES = [
+    ("sha1 (login.py)", hashlib.sha1(PASSWORD.encode()).hexdigest()),
+    ("sha256 fallback (appointment.py)", "sha256$00$" + hashlib.sha256(PASSWORD.encode()).hexdigest()),
+    ("scrypt n=8192 r=4 (appointment.py)", legacy_scrypt()),
+    ("pbkdf2:sha256:260000", generate_password_hash(PASSWORD, "pbkdf2:sha256:260000")),
+    ("pbkdf2:sha256:600000", generate_password_hash(PASSWORD, "pbkdf2:sha256:600000")),
+    ("pbkdf2:sha256:1000000", generate_password_hash(PASSWORD, "pbkdf2:sha256:1000000")),
+    ("scrypt:16384:8:1", generate_password_hash(PASSWORD, "scrypt:16384:8:1")),
+    ("scrypt:32768:8:1", generate_password_hash(PASSWORD, "scrypt:32768:8:1")),
+]
+
+
+def time_verify(stored, rounds):
+    verify_any(stored, PASSWORD)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        assert verify_any(stored, PASSWORD)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Login latency budget for hashing.")
+    args = parser.parse_args()
+
+    print(f"{'scheme':<36} {'detected':<14} {'verify ms':>10}  within budget")
+    for label, stored in CANDIDATES:
+        scheme = identify_scheme(stored)
+        cost = time_verify(stored, 2000 if scheme.startswith(("sha", "legacy-sha")) else 5)
+        ok = "yes" if cost <= args.budget_ms else "no"
+        print(f"{label:<36} {scheme:<14} {cost:>10.3f}  {ok}")
+
+
+if __name__ == "__main__":
+    main()
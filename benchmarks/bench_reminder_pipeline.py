@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Buffered (fetchall) vs streaming reminder pipeline: time to first send and peak memory.
+
+Candidate rows come from a synthetic cursor and messages go to the local
+SMTP stand-in, so only the pipeline shape differs between the two runs.
+
+Usage: python benchmarks/bench_reminder_pipeline.py [--rows 50000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import mail
+from tests.smtp_standin import SMTPStandIn
+from utils.mail_templates import ReminderRenderer
+from utils.smtp_pool import SMTPPool
+
+
+def candidate_rows(count):
+    for i in range(count):
+        yield {"plate_number": f"P{i:07d}", "owner_name": "Sam Driver", "model": "Civic",
+               "next_oil_change_due": date(2030, 1, 25), "owner_email": f"owner{i}@example.com"}
+
+
+def run(server, rows, streaming):
+    pool = SMTPPool("127.0.0.1", server.port, starttls=False, size=4)
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    source = candidate_rows(rows) if streaming else list(candidate_rows(rows))
+    for _ in mail.send(pool, mail.render(source)):
+        if first is None:
+            first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    pool.close()
+    return first, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    mail._report = lambda message, error: None
+    mail._renderer = ReminderRenderer("http://localhost:5000", "shop@example.com")
+    print(f"rows={args.rows:,}")
+    print(f"{'pipeline':>10} {'first send ms':>14} {'total s':>8} {'peak MiB':>9}")
+    for streaming in (False, True):
+        with SMTPStandIn() as server:
+            first, elapsed, peak = run(server, args.rows, streaming)
+        name = "streaming" if streaming else "fetchall"
+        print(f"{name:>10} {first * 1000:>14.1f} {elapsed:>8.2f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
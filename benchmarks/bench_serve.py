@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Throughput: Flask dev server (python run.py) vs prefork gunicorn (python serve.py).
+
+Starts each server in its own process group, drives it with keep-alive
+client threads for a fixed time and prints requests/s and latency
+percentiles. The default path is served from the rendered-page cache, so
+MySQL does not need to be running.
+
+Usage: python benchmarks/bench_serve.py [--path /login.html] [--clients 32] [--seconds 10]
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SERVERS = {
+    "dev (run.py)": (["run.py"], 5000),
+    "prefork (serve.py)": (["serve.py"], 5001),
+}
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def drive(port, path, clients, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        local = []
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    raise http.client.HTTPException(response.status)
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors[0]
+
+
+def run_server(args, port, options):
+    env = dict(os.environ, SERVE_BIND=f"127.0.0.1:{port}")
+    proc = subprocess.Popen([sys.executable, *args], cwd=ROOT, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            return None
+        drive(port, options.path, options.clients, 1)  # warm-up: page cache, keep-alive
+        return drive(port, options.path, options.clients, options.seconds)
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default="/login.html")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    options = parser.parse_args()
+
+    print(f"GET {options.path}, {options.clients} keep-alive clients, {options.seconds:g}s")
+    for name, (args, port) in SERVERS.items():
+        result = run_server(args, port, options)
+        if result is None:
+            print(f"{name:<20} did not start (is gunicorn installed? pip install -r requirements.txt)")
+            continue
+        latencies, errors = result
+        if not latencies:
+            print(f"{name:<20} no successful requests ({errors} errors)")
+            continue
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        print(f"{name:<20} {len(latencies) / options.seconds:>8.0f} req/s  "
+              f"p50 {pct(0.5):6.2f} ms  p99 {pct(0.99):7.2f} ms  errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compare signed-cookie sessions with the server-side session backends.
+
+Reports the Cookie header size sent on every request after
+/appointments/select and the per-request time of GET /appointments/current.
+
+Usage: python benchmarks/bench_sessions.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from utils.session_store import make_session_interface
+
+SELECTED = {
+    "Appointment_id": 1042,
+    "Date": "2025-03-14",
+    "Time": "10:30:00",
+    "Notes": "Customer reports squeaking brakes, check pads and rotors as well",
+    "Car_plate": "ABC12345",
+    "Services": "Oil Change,Tire Rotation,Brake Inspection,Full Service",
+    "service_ids": "1,2,3,4",
+}
+REQUESTS = 2000
+
+
+def run(backend, tmpdir):
+    app = create_app()
+    app.config["SESSION_BACKEND"] = backend
+    app.config["SESSION_SQLITE_PATH"] = os.path.join(tmpdir, "sessions.db")
+    interface = make_session_interface(app.config)
+    if interface is not None:
+        app.session_interface = interface
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["logged_in"] = True
+        session["username"] = "manager"
+        session["selected_appointment_id"] = SELECTED["Appointment_id"]
+        session["selected_appointment"] = SELECTED
+    cookie = client.get_cookie(app.config["SESSION_COOKIE_NAME"])
+
+    client.get("/appointments/current")
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get("/appointments/current")
+    elapsed = time.perf_counter() - start
+    return len(cookie.value), elapsed / REQUESTS * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"{'backend':>8} {'cookie bytes':>13} {'us/request':>11}")
+        for backend in ("cookie", "memory", "sqlite"):
+            size, per_request = run(backend, tmpdir)
+            print(f"{backend:>8} {size:>13} {per_request:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Reminder throughput (messages/s) against SMTP pool size.
+
+Runs against the local SMTP stand-in with an artificial per-message
+server latency, which is what dominates real SMTP dispatch.
+
+Usage: python benchmarks/bench_smtp_pool.py [--messages 400] [--latency-ms 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from email.message import EmailMessage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.smtp_standin import SMTPStandIn
+from utils.smtp_pool import SMTPPool
+
+
+def messages(count):
+    for i in range(count):
+        message = EmailMessage()
+        message["Subject"] = "Oil Change Reminder"
+        message["From"] = "shop@example.com"
+        message["To"] = f"owner{i}@example.com"
+        message.set_content("<p>Your car is due for an oil change.</p>", subtype="html")
+        yield message
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"messages={args.messages} server latency={args.latency_ms} ms")
+    print(f"{'pool':>5} {'msgs/s':>9} {'connections':>12}")
+    for size in (1, 2, 4, 8, 16):
+        with SMTPStandIn(latency=args.latency_ms / 1000) as server:
+            pool = SMTPPool("127.0.0.1", server.port, starttls=False, size=size)
+            start = time.perf_counter()
+            result = pool.dispatch(messages(args.messages))
+            elapsed = time.perf_counter() - start
+            pool.close()
+            assert result.sent == args.messages
+            print(f"{size:>5} {args.messages / elapsed:>9.1f} {server.connections:>12}")
+
+
+if __name__ == "__main__":
+    main()
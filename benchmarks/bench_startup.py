@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Cold-start budget for create_app, measured with ``python -X importtime``.
+
+Each run is a fresh interpreter that imports app and calls create_app().
+Reported: wall time of the import and of create_app(), the number of
+modules it imports (beyond interpreter startup) and the slowest ones.
+Exits with status 1 when the median time or the import count exceeds
+benchmarks/startup_budget.json; --record rewrites the budget from this
+machine with some headroom.
+
+Both numbers depend on the interpreter and on which optional accelerators
+(orjson, brotli) are installed, so budgets are kept per environment, keyed
+e.g. "3.10" or "3.11+orjson"; only the one for the running environment is
+checked or recorded.
+
+Usage: python benchmarks/bench_startup.py [--runs 7] [--record]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Headroom applied by --record: timing is noisy, the import count is not
+TIME_HEADROOM = 1.3
+IMPORT_HEADROOM = 5
+
+# Optional dependencies create_app imports when they are installed
+OPTIONAL_EXTRAS = ("brotli", "orjson")
+
+PROBE = """
+import json, sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (done - imported) * 1000,
+    "modules": sorted(set(sys.modules) - before),
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Module name -> (self us, cumulative us) from ``-X importtime`` output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure() -> dict:
+    """One cold start in a fresh interpreter."""
+    # Bytecode is precompiled in the image (Dockerfile), so measure with a warm __pycache__
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    modules = result.pop("modules")
+    times = parse_importtime(proc.stderr)
+    result["imports"] = len(modules)
+    result["import_times"] = {name: times[name] for name in modules if name in times}
+    result["total_ms"] = result["import_ms"] + result["create_app_ms"]
+    return result
+
+
+def environment_key() -> str:
+    """Python major.minor plus the installed optional extras, e.g. "3.11+orjson"."""
+    extras = [name for name in OPTIONAL_EXTRAS if importlib.util.find_spec(name) is not None]
+    return "+".join([f"{sys.version_info.major}.{sys.version_info.minor}", *extras])
+
+
+def load_budgets() -> dict:
+    """All recorded budgets, keyed by ``environment_key()``."""
+    if not os.path.exists(BUDGET_PATH):
+        return {}
+    with open(BUDGET_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_budget() -> dict | None:
+    """Budget for the running environment, or None when none was recorded for it."""
+    return load_budgets().get(environment_key())
+
+
+def check(runs: int = 7) -> tuple[dict, list[str]]:
+    """Median cold start and the list of budget violations (empty when within budget)."""
+    measure()  # warm the bytecode cache; only the first run compiles
+    samples = [measure() for _ in range(runs)]
+    summary = {
+        "total_ms": statistics.median(s["total_ms"] for s in samples),
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "create_app_ms": statistics.median(s["create_app_ms"] for s in samples),
+        "imports": max(s["imports"] for s in samples),
+        "import_times": samples[-1]["import_times"],
+    }
+    budget = load_budget()
+    violations = []
+    if budget is not None:
+        if summary["total_ms"] > budget["max_total_ms"]:
+            violations.append(f"cold start {summary['total_ms']:.1f} ms > budget {budget['max_total_ms']} ms")
+        if summary["imports"] > budget["max_imports"]:
+            violations.append(f"{summary['imports']} modules imported > budget {budget['max_imports']}")
+    return summary, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--record", action="store_true", help="Write the budget from this run.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list.")
+    args = parser.parse_args()
+
+    summary, violations = check(args.runs)
+    print(f"cold start {summary['total_ms']:.1f} ms (import {summary['import_ms']:.1f} ms, "
+          f"create_app {summary['create_app_ms']:.1f} ms), {summary['imports']} modules imported")
+    print(f"\n{'self ms':>8} {'cumul ms':>9}  module")
+    slowest = sorted(summary["import_times"].items(), key=lambda kv: -kv[1][0])[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{self_us / 1000:>8.2f} {cumulative_us / 1000:>9.2f}  {name}")
+
+    if args.record:
+        budgets = load_budgets()
+        budgets[environment_key()] = {
+            "max_total_ms": round(summary["total_ms"] * TIME_HEADROOM, 1),
+            "max_imports": summary["imports"] + IMPORT_HEADROOM,
+            "recorded": {"total_ms": round(summary["total_ms"], 1), "imports": summary["imports"],
+                         "python": sys.version.split()[0]},
+        }
+        with open(BUDGET_PATH, "w", encoding="utf-8") as fh:
+            json.dump(dict(sorted(budgets.items())), fh, indent=2)
+            fh.write("\n")
+        print(f"\nBudget for {environment_key()} written to {os.path.relpath(BUDGET_PATH)}")
+        return
+    if violations:
+        print("\nStartup budget exceeded:\n  " + "\n  ".join(violations))
+        sys.exit(1)
+    print(f"\nWithin startup budget for {environment_key()}" if load_budget()
+          else f"\nNo budget recorded for {environment_key()} (run with --record)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,12 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 
+# Server-side sessions: "cookie" (signed cookie, default), "memory" (single
+# process LRU) or "sqlite" (file shared by all workers on the host)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cookie")
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "")
+SESSION_MEMORY_MAX_ENTRIES = 10000
+
 # Database Configuration
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -17,6 +23,103 @@ DB_CONFIG = {
     "auth_plugin": "mysql_native_password"
 }
 
-# Flask Configuration
-DEBUG = True
-TESTING = False
\ No newline at end of file
+# Password hashing (werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000")
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_SALT_LENGTH = 16
+# Hashing runs in a process pool; 0 workers hashes on the request thread
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", 32))
+
+# Rate limiting (token buckets keyed by client IP and, where set, username)
+# The IP is request.remote_addr: behind a reverse proxy set TRUSTED_PROXIES to the
+# number of proxies in front of the app, or every client shares the proxy's bucket.
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "sqlite" (shared by workers)
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "")
+RATE_LIMIT_MAX_KEYS = 100000
+RATE_LIMIT_RULES = {
+    "auth.login": {"per_minute": 10, "burst": 10, "per_username": True},
+    "auth.signup": {"per_minute": 5, "burst": 5, "per_username": True},
+    "auth.check_availability": {"per_minute": 60, "burst": 30},
+    "appointments.book_appointment": {"per_minute": 30, "burst": 20},
+}
+
+# Signed API tokens for machine clients. Falls back to SECRET_KEY; set one of
+# them explicitly when running several workers or tokens will not validate.
+API_TOKEN_SECRET = os.getenv("API_TOKEN_SECRET", "")
+# calendar:read tokens go in the feed URL: /appointments.ics?token=...
+API_TOKEN_SCOPES = ["appointments:write", "stats:read", "metrics:read", "calendar:read"]
+API_TOKEN_DEFAULT_TTL = 24 * 3600
+API_TOKEN_MAX_TTL = 30 * 24 * 3600
+
+# Bloom filters answering "definitely available" for signup availability checks
+SIGNUP_BLOOM_CAPACITY = 100000
+SIGNUP_BLOOM_ERROR_RATE = 0.01
+# Each worker refreshes its filters in the background this often (seconds); accounts
+# created by other workers may read as available until then, signup still rejects them
+SIGNUP_BLOOM_REBUILD_INTERVAL = 60
+
+# Outgoing mail (reminders). Credentials come from the environment only.
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 4))
+SMTP_MAX_RETRIES = 3
+MAIL_FROM = os.getenv("MAIL_FROM", SMTP_USER)
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:5000")  # used for links in emails
+
+# Outbox dispatcher (flask --app app appointments dispatch-outbox)
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_LEASE_SECONDS = 300  # an unacknowledged batch becomes due again after this
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_POLL_INTERVAL = 2.0
+
+# Reminder scheduler (python mail.py --loop)
+REMINDER_LEAD_DAYS = 15  # remind this many days before next_oil_change_due
+REMINDER_BATCH_SIZE = 500
+REMINDER_INTERVAL = int(os.getenv("REMINDER_INTERVAL", 3600))
+REMINDER_MAX_ATTEMPTS = 5  # runs a transiently failing reminder is retried in before it is given up
+
+# Flask Configuration (serve.py defaults APP_DEBUG to 0)
+DEBUG = os.getenv("APP_DEBUG", "1") == "1"
+TESTING = False
+
+# Service catalog cache (seconds before the service table is re-read)
+SERVICE_CATALOG_TTL = int(os.getenv("SERVICE_CATALOG_TTL", 300))
+SERVICES_MAX_AGE = 24 * 3600  # browser/CDN cache lifetime of GET /services (revalidated by ETag)
+
+# iCalendar feed
+APPOINTMENT_DURATION_MINUTES = int(os.getenv("APPOINTMENT_DURATION_MINUTES", 60))
+ICS_MAX_DAYS = 366
+
+# Multi-get: maximum IDs accepted by GET /appointments?ids=...
+MULTI_GET_MAX_IDS = 250
+
+# Precompressed static pages (flask --app app templates build-pages)
+STATIC_PAGES = ["auto.html", "tires.html", "store.html", "offers.html", "franch.html", "carrer.html", "client.html"]
+STATIC_PAGE_ALIASES = {"careers.html": "carrer.html"}  # the pages link to careers.html
+STATIC_PAGES_DIR = "build/pages"
+STATIC_PAGE_MAX_AGE = 365 * 24 * 3600
+
+# Template asset build output (flask --app app templates build-assets)
+ASSET_BUILD_DIR = "build"
+
+# Response compression for dynamic responses (counters: GET /stats/compression)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = 500  # bytes; smaller bodies gain less than the header costs
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))  # gzip, 1-9
+COMPRESSION_BR_QUALITY = int(os.getenv("COMPRESSION_BR_QUALITY", 4))  # brotli, 0-11
+
+# Request metrics (GET /metrics, Prometheus text format)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_DIR = os.getenv("METRICS_DIR", "")  # worker snapshots are merged from here; serve.py creates one
+METRICS_FLUSH_INTERVAL = 5  # seconds between snapshot writes per worker
+
+# Production server (python serve.py); sized from the CPU count unless set
+SERVE_BIND = os.getenv("SERVE_BIND", "0.0.0.0:5000")
+SERVE_WORKERS = int(os.getenv("WEB_CONCURRENCY", 0))  # 0: 2 * CPUs + 1
+SERVE_THREADS = int(os.getenv("SERVE_THREADS", 0))  # 0: 4 per worker (requests mostly wait on MySQL)
+SERVE_ACCESS_LOG = os.getenv("SERVE_ACCESS_LOG", "0") == "1"  # one stdout line per request
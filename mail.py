@@ -1,6 +1,15 @@
+import argparse
+import time
+
 import mysql.connector
-from datetime import datetime, timedelta
-import yagmail  # Or use smtplib if preferred
+
+from config import (
+    MAIL_FROM, PUBLIC_BASE_URL, REMINDER_BATCH_SIZE, REMINDER_INTERVAL, REMINDER_LEAD_DAYS, REMINDER_MAX_ATTEMPTS,
+    SMTP_HOST, SMTP_MAX_RETRIES, SMTP_PASSWORD, SMTP_POOL_SIZE, SMTP_PORT, SMTP_STARTTLS, SMTP_USER,
+)
+from utils.mail_templates import ReminderRenderer
+from utils.reminders import run_reminders
+from utils.smtp_pool import SMTPPool, _is_transient
 
 # DB config
 DB_CONFIG = {
@@ -10,38 +19,124 @@ DB_CONFIG = {
     'database': 'isdb'
 }
 
-# Email setup
-yag = yagmail.SMTP('roynahra2004@gmail.com', 'vpzi utxt mnie cjni')
 
-def send_reminders():
-    target_date = (datetime.now() + timedelta(days=15)).date()
+def make_pool(size=SMTP_POOL_SIZE):
+    return SMTPPool(
+        SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD,
+        starttls=SMTP_STARTTLS, size=size, max_retries=SMTP_MAX_RETRIES,
+    )
+
+
+_renderer = None
+
+
+def get_renderer():
+    """The process-wide reminder renderer (template compiled once)."""
+    global _renderer
+    if _renderer is None:
+        _renderer = ReminderRenderer(PUBLIC_BASE_URL, MAIL_FROM)
+    return _renderer
+
+
+def build_reminder(row):
+    return get_renderer().render(row)
+
+
+def _report(message, error):
+    if error is None:
+        print(f"✅ Reminder sent to {message['To']}")
+    else:
+        print(f"❌ Reminder to {message['To']} failed: {error}")
+
+
+def render(rows):
+    """Pipeline stage: (row, message) for each candidate row."""
+    return get_renderer().render_batch(rows)
+
+
+def send(pool, rendered):
+    """Pipeline stage: send through the pool, yielding (row, error) as each completes."""
+    pending = {}
 
+    def messages():
+        for row, message in rendered:
+            pending[id(message)] = row
+            yield message
+
+    for message, error in pool.iter_results(messages()):
+        _report(message, error)
+        yield pending.pop(id(message)), error
+
+
+def send_reminders(pool=None, today=None):
+    """Run the reminder job once: everything due since the last watermark.
+
+    Candidates are read on a second connection through an unbuffered cursor
+    while ledger writes go through the first.
+    """
     conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute('''
-        SELECT plate_number, owner_name, model, next_oil_change_due, owner_email
-        FROM car_maintenance
-        WHERE next_oil_change_due = %s
-    ''', (target_date,))
-    
-    results = cursor.fetchall()
-    for row in results:
-        body = f"""
-    
-Dear {row['owner_name']},<br><br>
-
-Your vehicle ({row['model']}, Plate: {row['plate_number']}) is due for an oil change on {row['next_oil_change_due']}.<br>
-Please <a href="https/t2/appointment.html?plate={row['plate_number']}">click here to schedule your maintenance</a>.<br><br>
-
-Best regards,<br>
-Your Service Team
-        
-        """
-        yag.send(to=row['owner_email'], subject="⏰ Oil Change Reminder", contents=body)
-        print(f"✅ Reminder sent to {row['owner_email']}")
-
-    cursor.close()
-    conn.close()
+    read_conn = mysql.connector.connect(**DB_CONFIG)
+    own_pool = pool is None
+    pool = pool or make_pool()
+    try:
+        return run_reminders(
+            conn, read_conn, lambda rows: send(pool, render(rows)), today=today,
+            lead_days=REMINDER_LEAD_DAYS, batch_size=REMINDER_BATCH_SIZE,
+            max_attempts=REMINDER_MAX_ATTEMPTS, is_transient=_is_transient,
+        )
+    finally:
+        if own_pool:
+            pool.close()
+        read_conn.close()
+        conn.close()
+
+
+def notice_consumer(pool, renderer):
+    """Outbox consumer for appointment.* events: mail a notice when the event carries an email.
+
+    Events without a recipient are acknowledged without sending.
+    """
+
+    def consume(events):
+        pending = {}
+
+        def messages():
+            for event in events:
+                if not event.payload.get("email"):
+                    continue
+                message = renderer.render(event.topic, event.dedup_key, event.payload)
+                pending[id(message)] = event
+                yield message
+
+        skipped = [event for event in events if not event.payload.get("email")]
+        for event in skipped:
+            yield event, None
+        for message, error in pool.iter_results(messages()):
+            _report(message, error)
+            yield pending.pop(id(message)), error
+
+    return consume
+
+
+def run_scheduler(interval=REMINDER_INTERVAL):
+    """Long-running mode: run the job every ``interval`` seconds, surviving errors."""
+    while True:
+        try:
+            result = send_reminders()
+            if result is None:
+                print("Another scheduler is running; skipped")
+            else:
+                print(f"Reminders: {result.sent} sent, {result.failed} failed, covered up to {result.watermark}")
+        except mysql.connector.Error as err:
+            print(f"Reminder run failed: {err}")
+        time.sleep(interval)
+
 
 if __name__ == '__main__':
-    send_reminders()    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Send oil change reminders")
+    parser.add_argument("--loop", action="store_true", help="keep running every REMINDER_INTERVAL seconds")
+    args = parser.parse_args()
+    if args.loop:
+        run_scheduler()
+    else:
+        send_reminders()
@@ -0,0 +1,10 @@
+-- Daily booking counters maintained by the appointment routes.
+-- Dimension 'total' uses Dim_key '', 'service' uses the Service_ID and
+-- 'slot' uses the HH:MM start time.  Rebuild with: flask --app app stats rebuild
+CREATE TABLE IF NOT EXISTS booking_daily_summary (
+    Summary_date DATE NOT NULL,
+    Dimension ENUM('total', 'service', 'slot') NOT NULL,
+    Dim_key VARCHAR(16) NOT NULL DEFAULT '',
+    Bookings INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Summary_date, Dimension, Dim_key)
+) ENGINE=InnoDB;
@@ -0,0 +1,4 @@
+-- Change timestamp used for ETag/Last-Modified on the iCalendar feed.
+ALTER TABLE appointment
+    ADD COLUMN Updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_appointment_date (Date);
@@ -0,0 +1,3 @@
+-- Optimistic concurrency for PUT /appointments/<id>: every write bumps Version.
+ALTER TABLE appointment
+    ADD COLUMN Version INT NOT NULL DEFAULT 0;
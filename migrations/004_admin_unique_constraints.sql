@@ -0,0 +1,4 @@
+-- Signup relies on these for duplicate detection (single INSERT, no pre-check SELECTs).
+ALTER TABLE admin
+    ADD UNIQUE INDEX uq_admin_username (Username),
+    ADD UNIQUE INDEX uq_admin_email (Email);
@@ -0,0 +1,19 @@
+-- Reminder scheduler state, in the database that holds car_maintenance.
+-- reminder_watermark: last oil-change due date fully covered, per job.
+-- reminder_ledger: one row per reminder delivered, so re-runs never re-send.
+CREATE TABLE IF NOT EXISTS reminder_watermark (
+    job VARCHAR(32) NOT NULL PRIMARY KEY,
+    last_due DATE NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS reminder_ledger (
+    plate_number VARCHAR(20) NOT NULL,
+    due_date DATE NOT NULL,
+    sent_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (plate_number, due_date)
+) ENGINE=InnoDB;
+
+-- One streamed range scan over the due window, in (due date, plate) order
+ALTER TABLE car_maintenance
+    ADD INDEX idx_car_maintenance_due (next_oil_change_due, plate_number);
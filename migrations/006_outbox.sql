@@ -0,0 +1,18 @@
+-- Transactional outbox: events are inserted in the same transaction as the
+-- appointment change and delivered later by: flask --app app appointments dispatch-outbox
+-- Dedup_key makes enqueueing idempotent and is passed to consumers so they
+-- can drop the duplicates that at-least-once delivery may produce.
+CREATE TABLE IF NOT EXISTS outbox (
+    Outbox_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    Topic VARCHAR(64) NOT NULL,
+    Dedup_key VARCHAR(128) NOT NULL,
+    Payload JSON NOT NULL,
+    Status ENUM('pending', 'sent', 'dead') NOT NULL DEFAULT 'pending',
+    Attempts INT NOT NULL DEFAULT 0,
+    Available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Sent_at DATETIME NULL,
+    Last_error VARCHAR(255) NULL,
+    UNIQUE INDEX uq_outbox_dedup (Dedup_key),
+    INDEX idx_outbox_pending (Status, Available_at, Outbox_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,8 @@
+-- Failed reminders are ledgered too, so a dead address no longer holds the
+-- reminder watermark back forever:
+--   'retry'  transient SMTP failure, picked up again by the next run
+--   'failed' permanent failure (bounce) or REMINDER_MAX_ATTEMPTS reached
+ALTER TABLE reminder_ledger
+    ADD COLUMN status ENUM('sent', 'retry', 'failed') NOT NULL DEFAULT 'sent',
+    ADD COLUMN attempts INT NOT NULL DEFAULT 1,
+    ADD COLUMN last_error VARCHAR(255) NULL;
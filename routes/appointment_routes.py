@@ -1,11 +1,42 @@
-from flask import Blueprint, request, jsonify, session
-from datetime import datetime
+from flask import Blueprint, request, jsonify, session, current_app
+import click
+from datetime import date as date_cls, datetime, timedelta, timezone
+from hashlib import md5
 from mysql.connector import Error
+from werkzeug.http import is_resource_modified
 
 from utils.database import get_connection, _safe_close
-from utils.helper import serialize
+from utils.catalog import get_catalog_version, get_service_catalog
+from utils.icalendar import CALENDAR_FOOTER, CALENDAR_HEADER, render_vevent
+from utils.json_provider import compile_row_encoder, encode_rows
+from utils.outbox import enqueue
+from utils.rate_limit import enforce_rate_limit
+from utils.stats import apply_booking_delta, fetch_booking, slot_key
+from utils.tokens import has_query_token, is_authorized
 
 appointment_bp = Blueprint('appointments', __name__)
+appointment_bp.before_request(enforce_rate_limit)
+
+
+def _notify_email(data):
+    """Optional address for the outbox notice; (email, error message)."""
+    email = (data.get("email") or "").strip()
+    if email and ("@" not in email or len(email) > 254):
+        return None, "Invalid email"
+    return email or None, None
+
+
+def _record_event(cursor, topic, dedup_key, appointment_id, car_plate, date=None, time=None, service_ids=(), email=None):
+    """Queue an appointment event in the outbox, inside the caller's transaction."""
+    enqueue(cursor, topic, {
+        "appointment_id": appointment_id,
+        "car_plate": car_plate,
+        "date": str(date) if date else None,
+        "time": slot_key(time) if time else None,
+        "service_ids": list(service_ids),
+        "email": email,
+    }, dedup_key)
+
 
 @appointment_bp.route("/book", methods=["POST"])
 def book_appointment():
@@ -22,6 +53,10 @@ def book_appointment():
     if not isinstance(service_ids, list):
         return jsonify({"status": "error", "message": "service_ids must be a list"}), 400
 
+    email, email_error = _notify_email(data)
+    if email_error:
+        return jsonify({"status": "error", "message": email_error}), 400
+
     try:
         requested_dt = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
     except ValueError:
@@ -68,6 +103,11 @@ def book_appointment():
                 "INSERT INTO appointment_service (Appointment_id, Service_ID) VALUES (%s, %s)",
                 (appointment_id, sid),
             )
+        apply_booking_delta(cursor, date, time, service_ids, 1)
+        _record_event(
+            cursor, "appointment.booked", f"appointment.booked:{appointment_id}",
+            appointment_id, car_plate, date, time, service_ids, email,
+        )
 
         conn.commit()
         return jsonify(
@@ -83,6 +123,25 @@ def book_appointment():
     finally:
         _safe_close(cursor, conn)
 
+@appointment_bp.route("/services", methods=["GET"])
+def list_services():
+    try:
+        services = get_service_catalog()
+        version = get_catalog_version()
+    except Error as err:
+        return jsonify({"status": "error", "message": str(err)}), 500
+
+    response = jsonify({
+        "status": "success",
+        "version": version,
+        "services": [{"id": sid, "name": name} for sid, name in sorted(services.items())],
+    })
+    response.set_etag(version)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("SERVICES_MAX_AGE", 86400)
+    response.cache_control.stale_while_revalidate = current_app.config.get("SERVICES_MAX_AGE", 86400)
+    return response.make_conditional(request)
+
 @appointment_bp.route("/appointment/search", methods=["GET"])
 def search_appointments_by_plate():
     car_plate = request.args.get("car_plate")
@@ -107,10 +166,7 @@ def search_appointments_by_plate():
             """,
             (car_plate,),
         )
-        appointments = cursor.fetchall()
-        for appt in appointments:
-            for k, v in appt.items():
-                appt[k] = serialize(v)
+        appointments = encode_rows(cursor, cursor.fetchall())
         return jsonify({"status": "success", "appointments": appointments}), 200
     except Error as err:
         return jsonify({"status": "error", "message": str(err)}), 500
@@ -126,7 +182,7 @@ def get_appointment_by_id(appointment_id: int):
         cursor = conn.cursor(dictionary=True)
         cursor.execute(
             """
-            SELECT a.Appointment_id, a.Date, a.Time, a.Notes, a.Car_plate,
+            SELECT a.Appointment_id, a.Date, a.Time, a.Notes, a.Car_plate, a.Version,
                    GROUP_CONCAT(s.Service_Type) AS Services
             FROM appointment a
             LEFT JOIN appointment_service aps ON a.Appointment_id = aps.Appointment_id
@@ -139,14 +195,53 @@ def get_appointment_by_id(appointment_id: int):
         appointment = cursor.fetchone()
         if not appointment:
             return jsonify({"status": "error", "message": "Appointment not found"}), 404
-        for k, v in appointment.items():
-            appointment[k] = serialize(v)
+        appointment = compile_row_encoder(cursor.description)(appointment)
         return jsonify({"status": "success", "appointment": appointment}), 200
     except Error as err:
         return jsonify({"status": "error", "message": str(err)}), 500
     finally:
         _safe_close(cursor, conn)
 
+@appointment_bp.route("/appointments", methods=["GET"])
+def get_appointments_by_ids():
+    raw_ids = ",".join(request.args.getlist("ids"))
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw_ids.split(",") if part.strip()))
+    except ValueError:
+        return jsonify({"status": "error", "message": "ids must be integers"}), 400
+    if not ids:
+        return jsonify({"status": "error", "message": "Missing ids"}), 400
+    max_ids = current_app.config.get("MULTI_GET_MAX_IDS", 250)
+    if len(ids) > max_ids:
+        return jsonify({"status": "error", "message": f"At most {max_ids} ids per request"}), 400
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"""
+            SELECT a.Appointment_id, a.Date, a.Time, a.Notes, a.Car_plate, a.Version,
+                   GROUP_CONCAT(s.Service_Type) AS Services
+            FROM appointment a
+            LEFT JOIN appointment_service aps ON a.Appointment_id = aps.Appointment_id
+            LEFT JOIN service s ON aps.Service_ID = s.Service_ID
+            WHERE a.Appointment_id IN ({placeholders})
+            GROUP BY a.Appointment_id
+            """,
+            tuple(ids),
+        )
+        found = {row["Appointment_id"]: row for row in encode_rows(cursor, cursor.fetchall())}
+        appointments = {str(i): found.get(i) for i in ids}
+        missing = [i for i in ids if i not in found]
+        return jsonify({"status": "success", "appointments": appointments, "not_found": missing}), 200
+    except Error as err:
+        return jsonify({"status": "error", "message": str(err)}), 500
+    finally:
+        _safe_close(cursor, conn)
+
 @appointment_bp.route("/appointments/select", methods=["POST"])
 def select_appointment():
     if not session.get("logged_in"):
@@ -183,7 +278,7 @@ def select_appointment():
             return jsonify({"status": "error", "message": "Appointment not found"}), 404
 
         session['selected_appointment_id'] = appointment_id
-        session['selected_appointment'] = {k: serialize(v) for k, v in appointment.items()}
+        session['selected_appointment'] = compile_row_encoder(cursor.description)(appointment)
         
         return jsonify({
             "status": "success",
@@ -236,6 +331,10 @@ def update_selected_appointment():
     if not isinstance(service_ids, list):
         return jsonify({"status": "error", "message": "service_ids must be a list"}), 400
 
+    email, email_error = _notify_email(data)
+    if email_error:
+        return jsonify({"status": "error", "message": email_error}), 400
+
     conn = None
     cursor = None
     try:
@@ -243,8 +342,8 @@ def update_selected_appointment():
         cursor = conn.cursor()
         conn.start_transaction()
 
-        cursor.execute("SELECT 1 FROM appointment WHERE Appointment_id = %s", (appointment_id,))
-        if not cursor.fetchone():
+        previous = fetch_booking(cursor, appointment_id)
+        if not previous:
             conn.rollback()
             return jsonify({"status": "error", "message": "Appointment not found"}), 404
 
@@ -257,7 +356,8 @@ def update_selected_appointment():
             return jsonify({"status": "error", "message": "Time slot already booked"}), 409
 
         cursor.execute(
-            "UPDATE appointment SET Date = %s, Time = %s, Notes = %s WHERE Appointment_id = %s",
+            "UPDATE appointment SET Date = %s, Time = %s, Notes = %s, Updated_at = CURRENT_TIMESTAMP, "
+            "Version = Version + 1 WHERE Appointment_id = %s",
             (date, time, notes, appointment_id),
         )
 
@@ -275,6 +375,12 @@ def update_selected_appointment():
                     (appointment_id, sid),
                 )
 
+        apply_booking_delta(cursor, previous.date, previous.time, previous.service_ids, -1)
+        apply_booking_delta(cursor, date, time, service_ids, 1)
+        _record_event(
+            cursor, "appointment.updated", f"appointment.updated:{appointment_id}:{(previous.version or 0) + 1}",
+            appointment_id, previous.car_plate, date, time, service_ids, email,
+        )
         conn.commit()
 
         cursor = conn.cursor(dictionary=True)
@@ -293,8 +399,7 @@ def update_selected_appointment():
         updated = cursor.fetchone()
         if not updated:
             return jsonify({"status": "error", "message": "Appointment not found after update"}), 404
-        for k, v in updated.items():
-            updated[k] = serialize(v)
+        updated = compile_row_encoder(cursor.description)(updated)
         updated["Services"] = updated.get("Services") or ""
         return jsonify({"status": "success", "message": "Appointment updated", "appointment": updated}), 200
 
@@ -308,18 +413,147 @@ def update_selected_appointment():
     finally:
         _safe_close(cursor, conn)
 
+@appointment_bp.route("/appointments/<int:appointment_id>", methods=["PUT"])
+def update_appointment(appointment_id: int):
+    if not is_authorized("appointments:write"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    date = data.get("date")
+    time = data.get("time")
+    notes = data.get("notes", "")
+    service_ids = data.get("service_ids", [])
+
+    # Expected version from the body or an If-Match header (ETag is the version)
+    expected = data.get("version")
+    if expected is None and request.if_match:
+        expected = next(iter(request.if_match.as_set()), None)
+    try:
+        expected_version = int(expected)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Missing or invalid version"}), 428
+
+    if not date or not time:
+        return jsonify({"status": "error", "message": "Missing date or time"}), 400
+    try:
+        requested_dt = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid date/time format"}), 400
+    if requested_dt < datetime.now():
+        return jsonify({"status": "error", "message": "Cannot set appointment date/time in the past"}), 400
+    if not isinstance(service_ids, list):
+        return jsonify({"status": "error", "message": "service_ids must be a list"}), 400
+    email, email_error = _notify_email(data)
+    if email_error:
+        return jsonify({"status": "error", "message": email_error}), 400
+
+    conn = None
+    cursor = None
+    try:
+        catalog = get_service_catalog()
+        invalid = [sid for sid in service_ids if sid not in catalog]
+        if invalid:
+            return jsonify({"status": "error", "message": f"Invalid Service_ID(s): {invalid}"}), 400
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        conn.start_transaction()
+
+        previous = fetch_booking(cursor, appointment_id)
+        if not previous:
+            conn.rollback()
+            return jsonify({"status": "error", "message": "Appointment not found"}), 404
+        if previous.version != expected_version:
+            conn.rollback()
+            return jsonify({
+                "status": "error",
+                "message": "Appointment was modified by someone else",
+                "version": previous.version,
+            }), 409
+
+        cursor.execute(
+            "SELECT 1 FROM appointment WHERE Date = %s AND Time = %s AND Appointment_id != %s LIMIT 1",
+            (date, time, appointment_id),
+        )
+        if cursor.fetchone():
+            conn.rollback()
+            return jsonify({"status": "error", "message": "Time slot already booked"}), 409
+
+        cursor.execute(
+            "UPDATE appointment SET Date = %s, Time = %s, Notes = %s, Updated_at = CURRENT_TIMESTAMP, "
+            "Version = Version + 1 WHERE Appointment_id = %s AND Version = %s",
+            (date, time, notes, appointment_id, expected_version),
+        )
+        if cursor.rowcount != 1:
+            conn.rollback()
+            return jsonify({"status": "error", "message": "Appointment was modified by someone else"}), 409
+
+        cursor.execute("DELETE FROM appointment_service WHERE Appointment_id = %s", (appointment_id,))
+        if service_ids:
+            cursor.executemany(
+                "INSERT INTO appointment_service (Appointment_id, Service_ID) VALUES (%s, %s)",
+                [(appointment_id, sid) for sid in service_ids],
+            )
+        apply_booking_delta(cursor, previous.date, previous.time, previous.service_ids, -1)
+        apply_booking_delta(cursor, date, time, service_ids, 1)
+        _record_event(
+            cursor, "appointment.updated", f"appointment.updated:{appointment_id}:{expected_version + 1}",
+            appointment_id, previous.car_plate, date, time, service_ids, email,
+        )
+        conn.commit()
+
+        # Everything in the response is already known; no re-fetch needed
+        version = expected_version + 1
+        response = jsonify({
+            "status": "success",
+            "message": "Appointment updated",
+            "appointment": {
+                "Appointment_id": appointment_id,
+                "Date": date,
+                "Time": str(timedelta(hours=requested_dt.hour, minutes=requested_dt.minute)),
+                "Notes": notes,
+                "Car_plate": previous.car_plate,
+                "Version": version,
+                "Services": ",".join(catalog[sid] for sid in service_ids),
+            },
+        })
+        response.set_etag(str(version))
+        return response, 200
+
+    except Error as err:
+        if conn:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        return jsonify({"status": "error", "message": str(err)}), 500
+    finally:
+        _safe_close(cursor, conn)
+
 @appointment_bp.route("/appointments/<int:appointment_id>", methods=["DELETE"])
 def delete_appointment(appointment_id: int):
-    if not session.get("logged_in"):
+    if not is_authorized("appointments:write"):
         return jsonify({"status": "error", "message": "Unauthorized"}), 401
 
+    email, email_error = _notify_email(request.get_json(silent=True) or {})
+    if email_error:
+        return jsonify({"status": "error", "message": email_error}), 400
+
     conn = None
     cursor = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        conn.start_transaction()
+        previous = fetch_booking(cursor, appointment_id)
         cursor.execute("DELETE FROM appointment_service WHERE Appointment_id = %s", (appointment_id,))
         cursor.execute("DELETE FROM appointment WHERE Appointment_id = %s", (appointment_id,))
+        if previous:
+            apply_booking_delta(cursor, previous.date, previous.time, previous.service_ids, -1)
+            _record_event(
+                cursor, "appointment.deleted", f"appointment.deleted:{appointment_id}",
+                appointment_id, previous.car_plate, previous.date, previous.time, previous.service_ids, email,
+            )
         conn.commit()
         return jsonify({"status": "success", "message": "Appointment deleted"}), 200
     except Error as err:
@@ -344,4 +578,105 @@ def get_current_appointment():
     return jsonify({
         "status": "success",
         "appointment": appointment
-    })
\ No newline at end of file
+    })
+
+@appointment_bp.route("/appointments.ics", methods=["GET"])
+def appointments_calendar():
+    # Calendar apps cannot send cookies or headers: accept a calendar:read token in the URL
+    if not (is_authorized("calendar:read") or has_query_token("calendar:read")):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    today = date_cls.today()
+    try:
+        start = datetime.strptime(request.args["start"], "%Y-%m-%d").date() if request.args.get("start") else today - timedelta(days=7)
+        end = datetime.strptime(request.args["end"], "%Y-%m-%d").date() if request.args.get("end") else today + timedelta(days=60)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid date format"}), 400
+    if end < start or (end - start).days > current_app.config.get("ICS_MAX_DAYS", 366):
+        return jsonify({"status": "error", "message": "Invalid date range"}), 400
+
+    conn = None
+    cursor = None
+    streaming = False
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT MAX(Updated_at), COUNT(*) FROM appointment WHERE Date BETWEEN %s AND %s",
+            (start, end),
+        )
+        last_change, count = cursor.fetchone()
+        cursor.close()
+
+        # Deletes lower the count, inserts and updates move MAX(Updated_at)
+        last_modified = (last_change or datetime(1970, 1, 1)).replace(microsecond=0, tzinfo=timezone.utc)
+        etag = md5(f"{start}:{end}:{count}:{last_modified.isoformat()}".encode()).hexdigest()
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = current_app.response_class(status=304)
+        else:
+            services = get_service_catalog()
+            duration = timedelta(minutes=current_app.config.get("APPOINTMENT_DURATION_MINUTES", 60))
+            cursor = conn.cursor()  # unbuffered: rows are pulled as the response is written
+            cursor.execute(
+                """
+                SELECT a.Appointment_id, a.Date, a.Time, a.Notes, a.Car_plate, a.Updated_at,
+                       GROUP_CONCAT(aps.Service_ID ORDER BY aps.Service_ID) AS service_ids
+                FROM appointment a
+                LEFT JOIN appointment_service aps ON a.Appointment_id = aps.Appointment_id
+                WHERE a.Date BETWEEN %s AND %s
+                GROUP BY a.Appointment_id
+                ORDER BY a.Date, a.Time
+                """,
+                (start, end),
+            )
+            response = current_app.response_class(
+                _stream_calendar(cursor, services, duration),
+                mimetype="text/calendar",
+            )
+            # Runs when the server closes the response, also for HEAD or a
+            # client that disconnects before the body is iterated
+            response.call_on_close(lambda: _safe_close(cursor, conn))
+            streaming = True
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    except Error as err:
+        return jsonify({"status": "error", "message": str(err)}), 500
+    finally:
+        if not streaming:
+            _safe_close(cursor, conn)
+
+def _stream_calendar(cursor, services, duration):
+    yield CALENDAR_HEADER
+    for appointment_id, day, start, notes, car_plate, updated_at, service_ids in cursor:
+        if isinstance(service_ids, (bytes, bytearray)):
+            service_ids = service_ids.decode()
+        names = [services.get(int(sid), f"Service {sid}") for sid in service_ids.split(",")] if service_ids else []
+        yield render_vevent(appointment_id, day, start, car_plate, notes, names, updated_at or datetime.now(timezone.utc), duration)
+    yield CALENDAR_FOOTER
+
+
+@appointment_bp.cli.command("dispatch-outbox")
+@click.option("--once", is_flag=True, help="Drain what is due and exit instead of polling.")
+def dispatch_outbox_command(once):
+    """Deliver queued appointment events (confirmation emails)."""
+    from mail import make_pool, notice_consumer  # the mail script's SMTP settings
+    from utils.mail_templates import AppointmentNoticeRenderer  # email package: CLI only
+    from utils.outbox import OutboxDispatcher
+
+    config = current_app.config
+    renderer = AppointmentNoticeRenderer(config["PUBLIC_BASE_URL"], config["MAIL_FROM"], get_service_catalog())
+    pool = make_pool()
+    consume = notice_consumer(pool, renderer)
+    dispatcher = OutboxDispatcher(
+        get_connection,
+        {topic: consume for topic in AppointmentNoticeRenderer.SUBJECTS},
+        batch_size=config.get("OUTBOX_BATCH_SIZE", 100),
+        lease_seconds=config.get("OUTBOX_LEASE_SECONDS", 300),
+        max_attempts=config.get("OUTBOX_MAX_ATTEMPTS", 8),
+    )
+    try:
+        dispatcher.run(idle_sleep=config.get("OUTBOX_POLL_INTERVAL", 2.0), once=once, log=click.echo)
+    finally:
+        pool.close()
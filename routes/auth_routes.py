@@ -1,10 +1,39 @@
-from flask import Blueprint, request, jsonify, session
-from werkzeug.security import check_password_hash, generate_password_hash
-from mysql.connector import Error
+from flask import Blueprint, request, jsonify, session, current_app, g
+from mysql.connector import Error, IntegrityError, errorcode
+import click
 
+from utils.bloom import AccountFilters
 from utils.database import get_connection, _safe_close
+from utils.passwords import HasherBusy, get_password_hasher
+from utils.rate_limit import enforce_rate_limit
+from utils.tokens import InvalidToken, get_revocations, issue_token, token_secret, verify_token
 
 auth_bp = Blueprint('auth', __name__)
+auth_bp.before_request(enforce_rate_limit)
+
+def _busy_response():
+    response = jsonify({"status": "error", "message": "Server busy, please retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+def _duplicate_message(err):
+    if "uq_admin_email" in (err.msg or ""):
+        return "Email already registered"
+    return "Username already exists"
+
+@auth_bp.before_app_request
+def load_api_token():
+    auth = request.headers.get("Authorization", "")
+    if not auth.startswith("Bearer "):
+        return None
+    try:
+        claims = verify_token(token_secret(), auth[7:].strip())
+    except InvalidToken as err:
+        return jsonify({"status": "error", "message": str(err)}), 401
+    if claims["jti"] in get_revocations():
+        return jsonify({"status": "error", "message": "Token revoked"}), 401
+    g.api_token = claims
+    return None
 
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
@@ -21,26 +50,27 @@ def signup():
     conn = None
     cursor = None
     try:
+        # Hash before taking a connection so it is not held during the hash.
+        # A duplicate signup therefore costs a wasted hash: the price of the
+        # single-INSERT design, bounded by the auth.signup rate limit.
+        hashed = get_password_hasher().hash(password)
+
         conn = get_connection()
         cursor = conn.cursor()
-
-        cursor.execute("SELECT 1 FROM admin WHERE Username = %s", (username,))
-        if cursor.fetchone():
-            return jsonify({"status": "error", "message": "Username already exists"}), 409
-
-        cursor.execute("SELECT 1 FROM admin WHERE Email = %s", (email,))
-        if cursor.fetchone():
-            return jsonify({"status": "error", "message": "Email already registered"}), 409
-
-        hashed = generate_password_hash(password)
+        # Uniqueness is enforced by uq_admin_username / uq_admin_email
         cursor.execute(
             "INSERT INTO admin (Username, Email, Password) VALUES (%s, %s, %s)",
             (username, email, hashed),
         )
         conn.commit()
+        _account_filters().add(username, email)
 
         return jsonify({"status": "success", "message": "Account created"}), 201
 
+    except IntegrityError as err:
+        if err.errno == errorcode.ER_DUP_ENTRY:
+            return jsonify({"status": "error", "message": _duplicate_message(err)}), 409
+        return jsonify({"status": "error", "message": str(err)}), 500
     except Error as err:
         if conn:
             try:
@@ -48,6 +78,70 @@ def signup():
             except Exception:
                 pass
         return jsonify({"status": "error", "message": str(err)}), 500
+    except HasherBusy:
+        return _busy_response()
+    finally:
+        _safe_close(cursor, conn)
+
+def _load_admin_identities():
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM admin")
+        row_count = cursor.fetchone()[0]
+    except Exception:
+        _safe_close(cursor, conn)
+        raise
+
+    def rows():
+        stream = conn.cursor()  # unbuffered, so the table is never held in memory
+        try:
+            stream.execute("SELECT Username, Email FROM admin")
+            yield from stream
+        finally:
+            _safe_close(stream, conn)
+
+    cursor.close()
+    return row_count, rows()
+
+def _account_filters():
+    filters = current_app.extensions.get("account_filters")
+    if filters is None:
+        config = current_app.config
+        filters = current_app.extensions.setdefault("account_filters", AccountFilters(
+            _load_admin_identities,
+            capacity=config.get("SIGNUP_BLOOM_CAPACITY", 100000),
+            error_rate=config.get("SIGNUP_BLOOM_ERROR_RATE", 0.01),
+            rebuild_interval=config.get("SIGNUP_BLOOM_REBUILD_INTERVAL", 60),
+        ))
+    return filters
+
+@auth_bp.route("/signup/check", methods=["GET"])
+def check_availability():
+    fields = {field: (request.args.get(field) or "").strip() for field in ("username", "email")}
+    fields = {field: value for field, value in fields.items() if value}
+    if not fields:
+        return jsonify({"status": "error", "message": "Provide username and/or email"}), 400
+
+    conn = None
+    cursor = None
+    try:
+        filters = _account_filters()
+        result = {}
+        for field, value in fields.items():
+            if not filters.might_exist(field, value):
+                result[field] = {"available": True}
+                continue
+            # Possible false positive: the indexed lookup decides
+            if cursor is None:
+                conn = get_connection()
+                cursor = conn.cursor()
+            column = "Username" if field == "username" else "Email"
+            cursor.execute(f"SELECT 1 FROM admin WHERE {column} = %s LIMIT 1", (value,))
+            result[field] = {"available": cursor.fetchone() is None}
+        return jsonify({"status": "success", **result}), 200
+    except Error as err:
+        return jsonify({"status": "error", "message": str(err)}), 500
     finally:
         _safe_close(cursor, conn)
 
@@ -69,7 +163,10 @@ def login():
         row = cursor.fetchone()
         stored = row[0] if row else None
 
-        if stored and check_password_hash(stored, password):
+        hasher = get_password_hasher()
+        if stored and hasher.verify(stored, password):
+            if hasher.needs_rehash(stored):
+                _rehash_password(conn, cursor, username, stored, password)
             session.clear()
             session["logged_in"] = True
             session["username"] = username
@@ -80,9 +177,62 @@ def login():
 
     except Error as err:
         return jsonify({"status": "error", "message": str(err)}), 500
+    except HasherBusy:
+        return _busy_response()
     finally:
         _safe_close(cursor, conn)
 
+def _rehash_password(conn, cursor, username, stored, password):
+    """Upgrade a legacy or outdated hash to PASSWORD_HASH_METHOD; never fails the login."""
+    try:
+        new_hash = get_password_hasher().hash(password)
+        # Only replace the hash we verified, in case the password changed meanwhile
+        cursor.execute(
+            "UPDATE admin SET Password = %s WHERE Username = %s AND Password = %s",
+            (new_hash, username, stored),
+        )
+        conn.commit()
+    except (Error, HasherBusy) as err:
+        current_app.logger.warning("Password rehash for %s skipped: %s", username, err)
+
+@auth_bp.route("/auth/token", methods=["POST"])
+def create_api_token():
+    if not session.get("logged_in"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    allowed = current_app.config.get("API_TOKEN_SCOPES", [])
+    # Every scope only when none are asked for; an explicit [] is an error, not "all"
+    scopes = data.get("scopes", allowed)
+    if not isinstance(scopes, list) or not scopes or any(scope not in allowed for scope in scopes):
+        return jsonify({"status": "error", "message": f"scopes must be a non-empty subset of {allowed}"}), 400
+    try:
+        ttl = int(data.get("ttl", current_app.config.get("API_TOKEN_DEFAULT_TTL", 86400)))
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "ttl must be an integer"}), 400
+    if not 0 < ttl <= current_app.config.get("API_TOKEN_MAX_TTL", 30 * 86400):
+        return jsonify({"status": "error", "message": "ttl out of range"}), 400
+
+    subject = (data.get("client") or session.get("username") or "").strip()
+    token, claims = issue_token(token_secret(), subject, scopes, ttl)
+    return jsonify({"status": "success", "token": token, "expires": claims["exp"], "jti": claims["jti"],
+                    "scopes": claims["scp"]}), 201
+
+@auth_bp.route("/auth/token/revoke", methods=["POST"])
+def revoke_api_token():
+    if not session.get("logged_in"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    data = request.get_json() or {}
+    try:
+        claims = verify_token(token_secret(), data.get("token") or "")
+    except InvalidToken as err:
+        return jsonify({"status": "error", "message": str(err)}), 400
+    get_revocations().revoke(claims["jti"], claims["exp"])
+    return jsonify({"status": "success", "message": "Token revoked"}), 200
+
 @auth_bp.route("/logout", methods=["POST"])
 def logout():
     session.clear()
@@ -94,4 +244,29 @@ def auth_status():
         "status": "success",
         "logged_in": bool(session.get("logged_in")),
         "username": session.get("username")
-    })
\ No newline at end of file
+    })
+
+@auth_bp.cli.command("import-admins")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=1000, show_default=True, help="Rows per INSERT batch.")
+@click.option("--workers", default=None, type=int, help="Hashing processes (default: CPU count).")
+def import_admins_command(csv_path, batch_size, workers):
+    """Bulk-load staff accounts from a username,email,password CSV."""
+    from utils.admin_import import ImportRejected, import_admins, read_admin_csv  # pulls in multiprocessing
+
+    conn = get_connection()
+    try:
+        result = import_admins(
+            conn,
+            read_admin_csv(csv_path),
+            method=current_app.config.get("PASSWORD_HASH_METHOD", "scrypt"),
+            batch_size=batch_size,
+            workers=workers,
+        )
+    except ImportRejected as err:
+        raise click.ClickException(
+            f"Import stopped: {err}. Imported {err.result.inserted} admins before the failing batch."
+        )
+    finally:
+        _safe_close(None, conn)
+    click.echo(f"Imported {result.inserted} admins, skipped {result.skipped} (duplicate or invalid)")
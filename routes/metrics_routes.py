@@ -0,0 +1,17 @@
+from flask import Blueprint, current_app, jsonify
+
+from utils.metrics import get_request_metrics, render_prometheus
+from utils.tokens import is_authorized
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    if not is_authorized("metrics:read"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    metrics = get_request_metrics()
+    if metrics is None:
+        return jsonify({"status": "error", "message": "Metrics are disabled"}), 404
+    return current_app.response_class(render_prometheus(metrics.collect()), content_type=PROMETHEUS_CONTENT_TYPE)
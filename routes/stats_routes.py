@@ -0,0 +1,76 @@
+from flask import Blueprint, current_app, request, jsonify
+from datetime import date as date_cls, datetime, timedelta
+from mysql.connector import Error
+import click
+
+from utils.database import get_connection, _safe_close
+from utils.stats import SUMMARY_TABLE, rebuild_summary
+from utils.tokens import is_authorized
+
+stats_bp = Blueprint('stats', __name__)
+
+MAX_STATS_DAYS = 31
+
+@stats_bp.route("/stats", methods=["GET"])
+def get_stats():
+    if not is_authorized("stats:read"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+
+    try:
+        start = datetime.strptime(request.args["date"], "%Y-%m-%d").date() if request.args.get("date") else date_cls.today()
+        days = int(request.args.get("days", 1))
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid date or days"}), 400
+    if not 1 <= days <= MAX_STATS_DAYS:
+        return jsonify({"status": "error", "message": f"days must be between 1 and {MAX_STATS_DAYS}"}), 400
+    end = start + timedelta(days=days - 1)
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT Summary_date, Dimension, Dim_key, Bookings
+            FROM {SUMMARY_TABLE}
+            WHERE Summary_date BETWEEN %s AND %s AND Bookings > 0
+            """,
+            (start, end),
+        )
+        stats = {}
+        for i in range(days):
+            stats[(start + timedelta(days=i)).isoformat()] = {"total": 0, "services": {}, "slots": {}}
+        for summary_date, dimension, key, bookings in cursor.fetchall():
+            day = stats[str(summary_date)]
+            if dimension == "total":
+                day["total"] = bookings
+            elif dimension == "service":
+                day["services"][key] = bookings
+            else:
+                day["slots"][key] = bookings
+        return jsonify({"status": "success", "stats": stats}), 200
+    except Error as err:
+        return jsonify({"status": "error", "message": str(err)}), 500
+    finally:
+        _safe_close(cursor, conn)
+
+@stats_bp.route("/stats/compression", methods=["GET"])
+def get_compression_stats():
+    """Bytes saved versus compressor CPU time, per encoding, for this worker."""
+    if not is_authorized("stats:read"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    stats = current_app.extensions.get("compression_stats")
+    if stats is None:
+        return jsonify({"status": "error", "message": "Compression is disabled"}), 404
+    return jsonify({"status": "success", "compression": stats.snapshot()}), 200
+
+@stats_bp.cli.command("rebuild")
+def rebuild_stats_command():
+    """Backfill booking_daily_summary from the appointment tables."""
+    conn = get_connection()
+    try:
+        written = rebuild_summary(conn)
+    finally:
+        _safe_close(None, conn)
+    click.echo(f"Rebuilt {SUMMARY_TABLE}: {written} rows")
@@ -1,26 +1,77 @@
-from flask import Blueprint, render_template, redirect, session
+import os
+
+import click
+from flask import Blueprint, current_app, redirect, session
+from mysql.connector import Error
+
+from utils.assets import AssetStore, build_assets
+from utils.catalog import get_catalog_version, get_service_catalog
+from utils.page_cache import cached_page, get_page_cache
+from utils.static_pages import StaticPages, build_pages
 
 template_bp = Blueprint('templates', __name__)
 
+
+def _static_pages_dir(config):
+    return os.path.join(current_app.root_path, config.get("STATIC_PAGES_DIR", "build/pages"))
+
+
+def get_static_pages() -> StaticPages:
+    pages = current_app.extensions.get("static_pages")
+    if pages is None:
+        config = current_app.config
+        pages = current_app.extensions.setdefault("static_pages", StaticPages(
+            current_app.root_path,
+            _static_pages_dir(config),
+            config.get("STATIC_PAGES", []),
+            aliases=config.get("STATIC_PAGE_ALIASES"),
+            max_age=config.get("STATIC_PAGE_MAX_AGE", 31536000),
+            auto_reload=current_app.debug,
+        ))
+    return pages
+
+def get_asset_store() -> AssetStore:
+    store = current_app.extensions.get("asset_store")
+    if store is None:
+        asset_dir = os.path.join(current_app.root_path, current_app.config.get("ASSET_BUILD_DIR", "build"), "assets")
+        store = current_app.extensions.setdefault("asset_store", AssetStore(asset_dir))
+    return store
+
+def catalog_page(name):
+    """Serve a page containing the service grid, cached per service catalog version."""
+    cache = get_page_cache()
+    try:
+        services = get_service_catalog()
+        version = get_catalog_version()
+    except Error:
+        # Database down: serve the page with an empty grid until it is back
+        services, version = {}, "unavailable"
+
+    def context():
+        grid = cache.fragment("_service_grid.html", version, lambda: {"services": sorted(services.items())})
+        return {"service_grid": grid}
+
+    return cache.respond(name, version, context)
+
 @template_bp.route("/")
 def index():
     return redirect("/appointment.html")
 
 @template_bp.route("/login.html")
 def login_page():
-    return render_template("login.html")
+    return cached_page("login.html")
 
 @template_bp.route("/signup.html")
 def signup_page():
-    return render_template("signup.html")
+    return cached_page("signup.html")
 
 @template_bp.route("/appointment.html")
 def serve_form():
-    return render_template("appointment.html")
+    return catalog_page("appointment.html")
 
 @template_bp.route("/viewAppointment/search")
 def serve_view():
-    return render_template("viewAppointment.html")
+    return cached_page("viewAppointment.html")
 
 @template_bp.route("/updateAppointment.html")
 def serve_update():
@@ -28,4 +79,38 @@ def serve_update():
         return redirect("/login.html")
     if not session.get("selected_appointment"):
         return redirect("/viewAppointment/search")
-    return render_template("updateAppointment.html")
\ No newline at end of file
+    return catalog_page("updateAppointment.html")
+
+@template_bp.route("/<page>.html")
+def serve_static_page(page):
+    return get_static_pages().serve(f"{page}.html")
+
+@template_bp.route("/pages/<filename>")
+def serve_fingerprinted_page(filename):
+    return get_static_pages().serve_fingerprinted(filename)
+
+@template_bp.cli.command("build-pages")
+def build_pages_command():
+    """Fingerprint and precompress the static marketing pages."""
+    config = current_app.config
+    out_dir = _static_pages_dir(config)
+    manifest = build_pages(current_app.root_path, out_dir, config.get("STATIC_PAGES", []))
+    for name, entry in manifest.items():
+        sizes = ", ".join(f"{encoding} {variant['size']}" for encoding, variant in entry["variants"].items())
+        click.echo(f"{name} -> {entry['file']} ({sizes} bytes)")
+    click.echo(f"Wrote {len(manifest)} pages to {out_dir}")
+
+@template_bp.route("/assets/<filename>")
+def serve_asset(filename):
+    return get_asset_store().serve(filename)
+
+@template_bp.cli.command("build-assets")
+def build_assets_command():
+    """Move inline CSS/JS out of the templates into minified, content-hashed files."""
+    out_dir = os.path.join(current_app.root_path, current_app.config.get("ASSET_BUILD_DIR", "build"))
+    report = build_assets(os.path.join(current_app.root_path, current_app.template_folder), out_dir)
+    click.echo(f"{'template':<24} {'before':>8} {'1st visit':>10} {'repeat':>8}  (bytes, gzip)")
+    for name, row in report.items():
+        click.echo(f"{name:<24} {row['before_gzip']:>8} {row['first_visit_gzip']:>10} {row['repeat_visit_gzip']:>8}")
+    saved = sum(row["before_gzip"] - row["repeat_visit_gzip"] for row in report.values())
+    click.echo(f"Repeat views save {saved} bytes across {len(report)} templates; report in {out_dir}/report.json")
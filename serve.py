@@ -0,0 +1,121 @@
+"""Production entrypoint: create_app under gunicorn's prefork server.
+
+The app is created once in the master (preload) and workers are forked
+from it, so templates, the compiled JSON encoders and module code are
+shared copy-on-write instead of being rebuilt per worker. Connections and
+pools (MySQL, SQLite sessions, the password hashing pool) are opened
+lazily in each worker.
+
+Per-worker state is sized for prefork unless overridden in the
+environment: RATE_LIMIT_BACKEND defaults to sqlite (limits shared across
+workers) and HASH_POOL_WORKERS to 1 per worker.
+
+Usage: python serve.py            (sizing from the CPU count)
+       WEB_CONCURRENCY=4 SERVE_THREADS=8 python serve.py
+Development server with reloader and debugger: python run.py
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+import config
+
+THREADS_PER_WORKER = 4
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects taskset/cgroup cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        return os.cpu_count() or 1
+
+
+def worker_count(cpus: int | None = None) -> int:
+    """2 * CPUs + 1: while one worker waits on MySQL another can use the CPU."""
+    if config.SERVE_WORKERS > 0:
+        return config.SERVE_WORKERS
+    return 2 * (cpus or cpu_count()) + 1
+
+
+def thread_count() -> int:
+    return config.SERVE_THREADS if config.SERVE_THREADS > 0 else THREADS_PER_WORKER
+
+
+def server_options(cpus: int | None = None) -> dict:
+    return {
+        "bind": config.SERVE_BIND,
+        "workers": worker_count(cpus),
+        "threads": thread_count(),
+        "worker_class": "gthread",
+        "preload_app": True,
+        "keepalive": 5,
+        # Recycle workers now and then; jitter keeps them from restarting together
+        "max_requests": 10000,
+        "max_requests_jitter": 1000,
+        "accesslog": "-" if config.SERVE_ACCESS_LOG else None,
+        "when_ready": _freeze_heap,
+    }
+
+
+def _freeze_heap(server):
+    # Move the preloaded objects out of the GC's reach: collections in the
+    # workers would otherwise write to their headers and un-share the pages.
+    gc.freeze()
+
+
+def prefork_environment(environ=os.environ) -> str | None:
+    """Defaults for settings whose single-process values are wrong under prefork.
+
+    create_app reads config.py again, so these apply unless set explicitly:
+    no debug; rate limits shared by all workers instead of one bucket set per
+    worker (which would multiply every limit by the worker count); one
+    hashing process per worker, since the workers already cover the CPUs.
+    Returns the metrics directory when it was created here (to remove on exit).
+    """
+    environ.setdefault("APP_DEBUG", "0")
+    environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    environ.setdefault("HASH_POOL_WORKERS", "1")
+    # Workers publish metric snapshots here so /metrics on any worker covers all of them
+    if "METRICS_DIR" not in environ:
+        environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="metrics-")
+        return environ["METRICS_DIR"]
+    return None
+
+
+def _remove_on_exit(path: str):
+    def on_exit(server):
+        shutil.rmtree(path, ignore_errors=True)
+    return on_exit
+
+
+def main():
+    from gunicorn.app.base import BaseApplication
+
+    metrics_dir = prefork_environment()
+
+    from app import create_app
+
+    class Server(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return create_app()
+
+    options = server_options()
+    if metrics_dir:
+        options["on_exit"] = _remove_on_exit(metrics_dir)
+    print(f"Serving on http://{options['bind']} with {options['workers']} workers x {options['threads']} threads")
+    Server(options).run()
+
+
+if __name__ == "__main__":
+    main()
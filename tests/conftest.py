@@ -14,6 +14,7 @@ def app():
     app = create_app()
     app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False
+    app.config['HASH_POOL_WORKERS'] = 0
     return app
 
 @pytest.fixture
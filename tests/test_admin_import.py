@@ -0,0 +1,102 @@
+import pytest
+import json
+from unittest.mock import Mock, patch
+
+from mysql.connector import IntegrityError
+
+
+class TestSignupDuplicates:
+    """Test duplicate-key classification on signup."""
+
+    def test_single_insert(self, client, mock_db_success, sample_user_data):
+        """Signup issues exactly one statement."""
+        mock_conn, mock_cursor = mock_db_success
+
+        response = client.post('/signup', data=json.dumps(sample_user_data), content_type='application/json')
+
+        assert response.status_code == 201
+        assert mock_cursor.execute.call_count == 1
+        assert mock_cursor.execute.call_args[0][0].startswith("INSERT INTO admin")
+
+    def test_duplicate_email(self, client, mock_db_success, sample_user_data):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.execute.side_effect = IntegrityError(
+            msg="Duplicate entry 'test@example.com' for key 'admin.uq_admin_email'", errno=1062)
+
+        response = client.post('/signup', data=json.dumps(sample_user_data), content_type='application/json')
+
+        assert response.status_code == 409
+        assert json.loads(response.data)["message"] == "Email already registered"
+
+    def test_other_integrity_errors(self, client, mock_db_success, sample_user_data):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.execute.side_effect = IntegrityError(msg="Column cannot be null", errno=1048)
+
+        response = client.post('/signup', data=json.dumps(sample_user_data), content_type='application/json')
+
+        assert response.status_code == 500
+
+
+class TestBulkImport:
+    """Test the bulk admin import."""
+
+    def test_read_admin_csv(self, tmp_path):
+        from utils.admin_import import read_admin_csv
+
+        path = tmp_path / "staff.csv"
+        path.write_text("username,email,password\nann,ann@x.com,secret1\n,bad@x.com,secret1\nbob,bob@x.com,123\n")
+
+        assert list(read_admin_csv(str(path))) == [("ann", "ann@x.com", "secret1"), None, None]
+
+    def test_import_batches(self):
+        """Rows are hashed and inserted in batches; ignored rows count as skipped."""
+        from utils.admin_import import import_admins
+
+        conn = Mock()
+        cursor = conn.cursor.return_value
+        cursor.rowcount = 2
+        cursor.fetchall.return_value = [("Warning", 1062, "Duplicate entry 'u3' for key 'admin.uq_admin_username'")]
+        rows = [("u1", "e1", "secret1"), ("u2", "e2", "secret2"), None, ("u3", "e3", "secret3")]
+
+        result = import_admins(conn, rows, method="pbkdf2:sha256:1000", batch_size=3, workers=1)
+
+        assert cursor.executemany.call_count == 2
+        first_batch = cursor.executemany.call_args_list[0][0][1]
+        assert [r[0] for r in first_batch] == ["u1", "u2"]
+        assert first_batch[0][2].startswith("pbkdf2:sha256:1000$")
+        assert conn.commit.call_count == 2
+        assert result.inserted == 3
+        assert result.skipped == 1
+
+    def test_other_warnings_reject_the_batch(self):
+        """Truncation or NOT NULL warnings from INSERT IGNORE are not silently skipped."""
+        from utils.admin_import import ImportRejected, import_admins
+
+        conn = Mock()
+        cursor = conn.cursor.return_value
+        cursor.rowcount = 1
+        cursor.fetchall.side_effect = [
+            [],
+            [("Warning", 1265, "Data truncated for column 'Email' at row 1")],
+        ]
+        rows = [("u1", "e1", "secret1"), ("u2", "e2" * 200, "secret2")]
+
+        with pytest.raises(ImportRejected) as excinfo:
+            import_admins(conn, rows, method="pbkdf2:sha256:1000", batch_size=1, workers=1)
+
+        assert "Data truncated" in str(excinfo.value)
+        assert excinfo.value.result.inserted == 1
+        assert conn.commit.call_count == 1
+        conn.rollback.assert_called_once()
+
+    def test_cli_command(self, app, tmp_path):
+        from utils.admin_import import ImportResult
+
+        path = tmp_path / "staff.csv"
+        path.write_text("username,email,password\n")
+        with patch('routes.auth_routes.get_connection'), \
+             patch('utils.admin_import.import_admins', return_value=ImportResult(3, 1)) as run:
+            result = app.test_cli_runner().invoke(args=["auth", "import-admins", str(path)])
+
+        run.assert_called_once()
+        assert "Imported 3 admins, skipped 1" in result.output
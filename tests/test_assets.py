@@ -0,0 +1,117 @@
+import os
+import time
+import pytest
+from jinja2 import Environment
+
+
+class TestMinify:
+    """Test the CSS/JS minifiers used by the asset build."""
+
+    def test_css(self):
+        from utils.assets import minify_css
+
+        css = """
+        /* header */
+        .card  >  h2 { color : red;  margin: 0 auto; }
+        a :hover { x: 1 }
+        """
+        assert minify_css(css) == ".card>h2{color :red;margin:0 auto}a :hover{x:1}"
+
+    def test_js_keeps_statements_and_template_literals(self):
+        from utils.assets import minify_js
+
+        js = """
+            // comment
+            const a = 1;
+
+            const html = `
+              <li>${a}</li>
+            `;
+            if (a) {
+                go();
+            }
+        """
+        assert minify_js(js) == "const a = 1;\nconst html = `\n              <li>${a}</li>\n            `;\nif (a) {\ngo();\n}"
+
+
+class TestExtractAssets:
+    """Test moving inline blocks into hashed files."""
+
+    def test_rewrites_inline_blocks(self):
+        from utils.assets import extract_assets
+
+        html, assets = extract_assets("<style>p { x: 1 }</style><p></p><script>\n  run();\n</script>")
+
+        css_name, js_name = [name for name, _ in assets]
+        assert html == f'<link rel="stylesheet" href="/assets/{css_name}"><p></p><script src="/assets/{js_name}"></script>'
+        assert assets[1][1] == "run();"
+
+    def test_identical_blocks_share_a_file(self):
+        from utils.assets import extract_assets
+
+        _, first = extract_assets("<style>p { x: 1 }</style>")
+        _, second = extract_assets("<style>\np {x:1}\n</style>")
+
+        assert first[0][0] == second[0][0]
+
+    def test_leaves_external_and_templated_blocks(self):
+        from utils.assets import extract_assets
+
+        source = '<script src="/x.js"></script><script>var n = {{ n }};</script><script type="application/json">{}</script>'
+        html, assets = extract_assets(source)
+
+        assert html == source
+        assert assets == []
+
+
+class TestBuildAssets:
+    """Test the build output and how the app picks it up."""
+
+    def make_templates(self, tmp_path):
+        source = tmp_path / "templates"
+        source.mkdir()
+        (source / "page.html").write_text("<html><style>body { margin: 0; }</style><script>go();</script></html>")
+        (source / "_partial.html").write_text("<style>p{}</style>")
+        return source
+
+    def test_build_writes_templates_assets_and_report(self, tmp_path):
+        from utils.assets import build_assets
+
+        source = self.make_templates(tmp_path)
+        report = build_assets(str(source), str(tmp_path / "build"))
+
+        assert list(report) == ["page.html"]
+        built = (tmp_path / "build" / "templates" / "page.html").read_text()
+        assert "<style>" not in built and "/assets/" in built
+        assert len(os.listdir(tmp_path / "build" / "assets")) >= 5  # 2 assets + gzip variants + manifest
+        assert set(report["page.html"]) >= {"before_gzip", "first_visit_gzip", "repeat_visit_gzip"}
+
+    def test_loader_falls_back_to_edited_source(self, tmp_path):
+        from utils.assets import BuiltTemplateLoader, build_assets
+
+        source = self.make_templates(tmp_path)
+        build_assets(str(source), str(tmp_path / "build"))
+        env = Environment(loader=BuiltTemplateLoader(str(source), str(tmp_path / "build" / "templates")))
+
+        assert "/assets/" in env.loader.get_source(env, "page.html")[0]
+
+        (source / "page.html").write_text("<html><style>edited</style></html>")
+        future = time.time() + 5
+        os.utime(source / "page.html", (future, future))
+        assert env.loader.get_source(env, "page.html")[0] == "<html><style>edited</style></html>"
+
+    def test_assets_route(self, app, tmp_path):
+        from utils.assets import build_assets
+
+        build_assets(str(self.make_templates(tmp_path)), str(tmp_path / "build"))
+        app.config['ASSET_BUILD_DIR'] = str(tmp_path / "build")
+        client = app.test_client()
+        html = (tmp_path / "build" / "templates" / "page.html").read_text()
+        css_url = html.split('href="')[1].split('"')[0]
+
+        response = client.get(css_url)
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/css"
+        assert "immutable" in response.headers["Cache-Control"]
+        assert client.get('/assets/000000000000.css').status_code == 404
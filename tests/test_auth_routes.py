@@ -24,15 +24,18 @@ class TestAuthRoutes:
         """Test signup with existing username."""
         mock_conn, mock_cursor = mock_db_success
         
-        # Mock: username already exists
-        mock_cursor.fetchone.return_value = (1,)  # Username exists
+        # Mock: the unique index on Username rejects the insert
+        from mysql.connector import IntegrityError
+        mock_cursor.execute.side_effect = IntegrityError(
+            msg="Duplicate entry 'testuser' for key 'admin.uq_admin_username'", errno=1062)
         
         response = client.post('/signup', 
                              data=json.dumps(sample_user_data),
                              content_type='application/json')
         
-        # Should return conflict or error
-        assert response.status_code in [409, 500]
+        # Should return conflict
+        assert response.status_code == 409
+        assert json.loads(response.data)["message"] == "Username already exists"
 
     def test_signup_missing_fields(self, client):
         """Test signup with missing required fields."""
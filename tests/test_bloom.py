@@ -0,0 +1,158 @@
+import pytest
+import json
+import os
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from mysql.connector import Error
+
+
+class TestBloomFilter:
+    """Test the Bloom filter."""
+
+    def test_no_false_negatives(self):
+        from utils.bloom import BloomFilter
+
+        bloom = BloomFilter(1000, 0.01)
+        items = [f"user{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        from utils.bloom import BloomFilter
+
+        bloom = BloomFilter(2000, 0.01)
+        for i in range(2000):
+            bloom.add(f"user{i}")
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+
+        assert false_positives / 10000 < 0.03
+        assert bloom.expected_error_rate() == pytest.approx(0.01, rel=0.2)
+
+
+class TestAccountFilters:
+    """Test the admin username/email filters."""
+
+    def test_case_insensitive_and_add(self):
+        from utils.bloom import AccountFilters
+
+        filters = AccountFilters(lambda: (1, iter([("Alice", "alice@x.com")])), capacity=100)
+        filters.rebuild()
+
+        assert filters.might_exist("username", "alice") is True
+        assert filters.might_exist("email", " ALICE@x.com") is True
+        filters.add("bob", "bob@x.com")
+        assert filters.might_exist("username", "BOB") is True
+
+    def test_unbuilt_filters_defer_to_database(self):
+        from utils.bloom import AccountFilters
+
+        release = threading.Event()
+
+        def loader():
+            release.wait(5)
+            return 0, iter([])
+
+        filters = AccountFilters(loader, capacity=10)
+        try:
+            assert filters.might_exist("username", "anyone") is True
+        finally:
+            release.set()
+
+    def test_builds_and_refreshes_in_background(self):
+        from utils.bloom import AccountFilters
+
+        rows = [("dave", "dave@x.com")]
+        loader = Mock(side_effect=lambda: (len(rows), iter(list(rows))))
+        filters = AccountFilters(loader, capacity=10, rebuild_interval=0)
+
+        filters.might_exist("username", "dave")
+        wait_for(lambda: filters.might_exist("username", "dave"))
+        # Another worker signs up "erin": picked up by the next refresh
+        rows.append(("erin", "erin@x.com"))
+        wait_for(lambda: filters.might_exist("username", "erin"))
+
+        assert loader.call_count >= 2
+
+    def test_no_refresh_within_interval(self):
+        from utils.bloom import AccountFilters
+
+        loader = Mock(return_value=(0, iter([])))
+        filters = AccountFilters(loader, capacity=10, rebuild_interval=3600)
+        filters.might_exist("username", "a")
+        wait_for(lambda: filters._filters is not None and not filters._rebuilding)
+
+        filters.might_exist("username", "a")
+
+        assert loader.call_count == 1
+
+    def test_failed_rebuild_is_retried(self):
+        from utils.bloom import AccountFilters
+
+        loader = Mock(side_effect=Error("down"))
+        filters = AccountFilters(loader, capacity=10, rebuild_interval=0)
+        filters.might_exist("username", "a")
+        wait_for(lambda: not filters._rebuilding)
+        filters.might_exist("username", "a")
+        wait_for(lambda: loader.call_count >= 2)
+
+        assert loader.call_count >= 2
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.01)
+
+
+class TestAvailabilityRoute:
+    """Test GET /signup/check."""
+
+    @staticmethod
+    def _filters():
+        from utils.bloom import AccountFilters
+
+        filters = AccountFilters(lambda: (1, iter([("taken", "t@x.com")])), rebuild_interval=3600)
+        filters.rebuild()
+        filters._last_rebuild = time.monotonic()
+        return filters
+
+    def test_definitely_available_skips_database(self, app, client):
+        app.extensions["account_filters"] = self._filters()
+        with patch('routes.auth_routes.get_connection') as get_conn:
+            response = client.get('/signup/check?username=newuser&email=new@x.com')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["username"] == {"available": True}
+        assert data["email"] == {"available": True}
+        get_conn.assert_not_called()
+
+    def test_possible_match_is_confirmed_in_database(self, app, client, mock_db_success):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (1,)
+        app.extensions["account_filters"] = self._filters()
+
+        response = client.get('/signup/check?username=Taken')
+
+        assert json.loads(response.data)["username"] == {"available": False}
+        assert "email" not in json.loads(response.data)
+
+    def test_requires_a_field(self, client):
+        assert client.get('/signup/check').status_code == 400
+
+    def test_signup_updates_filters(self, app, client, mock_db_success, sample_user_data):
+        filters = self._filters()
+        app.extensions["account_filters"] = filters
+
+        client.post('/signup', data=json.dumps(sample_user_data), content_type='application/json')
+
+        assert filters.might_exist("username", sample_user_data["username"]) is True
+
+    def test_signup_form_uses_the_check(self, app):
+        with open(os.path.join(app.root_path, "templates", "signup.html"), encoding="utf-8") as fh:
+            assert "/signup/check?" in fh.read()
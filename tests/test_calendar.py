@@ -0,0 +1,142 @@
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
+
+
+class TestICalendarRendering:
+    """Test the iCalendar helpers."""
+
+    def test_escape_text(self):
+        from utils.icalendar import escape_text
+
+        assert escape_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+    def test_fold_long_lines(self):
+        """Lines are folded at 75 octets without splitting UTF-8 characters."""
+        from utils.icalendar import fold_line
+
+        folded = fold_line("DESCRIPTION:" + "é" * 80)
+        for part in folded.split("\r\n")[:-1]:
+            assert len(part.encode("utf-8")) <= 75
+        assert folded.replace("\r\n ", "").rstrip("\r\n") == "DESCRIPTION:" + "é" * 80
+
+    def test_render_vevent(self):
+        from utils.icalendar import render_vevent
+
+        event = render_vevent(5, date(2025, 2, 3), timedelta(hours=9), "ABC123", "Call first",
+                              ["Oil Change", "Brakes"], datetime(2025, 1, 1, 12, 0), timedelta(hours=1))
+
+        assert "UID:appointment-5@isd2\r\n" in event
+        assert "DTSTART:20250203T090000\r\n" in event
+        assert "DTEND:20250203T100000\r\n" in event
+        assert "SUMMARY:ABC123: Oil Change\\, Brakes\r\n" in event
+
+
+class TestCalendarFeed:
+    """Test the /appointments.ics endpoint."""
+
+    @pytest.fixture
+    def feed_db(self):
+        mock_conn = Mock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchone.return_value = (datetime(2025, 1, 10, 8, 30), 1)
+        mock_cursor.__iter__ = Mock(return_value=iter([
+            (7, date(2025, 1, 15), timedelta(hours=10), None, "XYZ789", datetime(2025, 1, 10, 8, 30), "1,2"),
+        ]))
+        with patch('routes.appointment_routes.get_connection', return_value=mock_conn), \
+             patch('routes.appointment_routes.get_service_catalog', return_value={1: "Oil Change", 2: "Tires"}):
+            yield mock_conn, mock_cursor
+
+    def test_streams_events(self, auth_client, feed_db):
+        mock_conn, mock_cursor = feed_db
+        response = auth_client.get('/appointments.ics?start=2025-01-01&end=2025-01-31')
+
+        body = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert response.mimetype == "text/calendar"
+        assert body.startswith("BEGIN:VCALENDAR\r\n")
+        assert "SUMMARY:XYZ789: Oil Change\\, Tires" in body
+        assert body.endswith("END:VCALENDAR\r\n")
+        assert response.headers["ETag"]
+        response.close()  # what the server does once the body is written
+        mock_conn.close.assert_called()
+
+    def test_head_closes_the_connection(self, auth_client, feed_db):
+        """HEAD never iterates the body, so cleanup cannot live in the generator."""
+        mock_conn, mock_cursor = feed_db
+        response = auth_client.head('/appointments.ics?start=2025-01-01&end=2025-01-31')
+
+        assert response.status_code == 200
+        assert response.get_data() == b""
+        response.close()
+        mock_conn.close.assert_called_once()
+
+    def test_conditional_request_returns_304(self, auth_client, feed_db):
+        """A client presenting the current ETag gets an empty 304."""
+        mock_conn, mock_cursor = feed_db
+        first = auth_client.get('/appointments.ics?start=2025-01-01&end=2025-01-31')
+        etag = first.headers["ETag"]
+
+        response = auth_client.get('/appointments.ics?start=2025-01-01&end=2025-01-31',
+                                   headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.get_data() == b""
+
+    def test_if_modified_since(self, auth_client, feed_db):
+        response = auth_client.get('/appointments.ics?start=2025-01-01&end=2025-01-31',
+                                   headers={"If-Modified-Since": "Fri, 10 Jan 2025 08:30:00 GMT"})
+        assert response.status_code == 304
+
+    def test_requires_credentials(self, client, feed_db):
+        assert client.get('/appointments.ics').status_code == 401
+
+    def test_calendar_token_in_query_string(self, app, client, feed_db):
+        from utils.tokens import get_revocations, issue_token, token_secret
+
+        with app.app_context():
+            token, claims = issue_token(token_secret(), "calendar", ["calendar:read"], 3600)
+            other, _ = issue_token(token_secret(), "stats", ["stats:read"], 3600)
+
+        assert client.get(f'/appointments.ics?token={token}').status_code == 200
+        assert client.get(f'/appointments.ics?token={other}').status_code == 401
+        assert client.get('/appointments.ics?token=v1.bad.token').status_code == 401
+
+        with app.app_context():
+            get_revocations().revoke(claims["jti"], claims["exp"])
+        assert client.get(f'/appointments.ics?token={token}').status_code == 401
+
+    def test_invalid_range(self, auth_client):
+        assert auth_client.get('/appointments.ics?start=bad').status_code == 400
+        assert auth_client.get('/appointments.ics?start=2025-02-01&end=2025-01-01').status_code == 400
+
+
+class TestServiceCatalog:
+    """Test the cached service catalog."""
+
+    def test_catalog_is_cached(self):
+        from utils import catalog
+
+        catalog.invalidate_service_catalog()
+        with patch('utils.catalog._load_services', return_value={1: "Oil Change"}) as load:
+            assert catalog.get_service_catalog() == {1: "Oil Change"}
+            assert catalog.get_service_catalog() == {1: "Oil Change"}
+        load.assert_called_once()
+        catalog.invalidate_service_catalog()
+
+    def test_version_follows_content(self):
+        from utils import catalog
+
+        catalog.invalidate_service_catalog()
+        with patch('utils.catalog._load_services', return_value={1: "Oil Change"}):
+            first = catalog.get_catalog_version()
+        catalog.invalidate_service_catalog()
+        with patch('utils.catalog._load_services', return_value={1: "Oil Change"}):
+            same = catalog.get_catalog_version()
+        catalog.invalidate_service_catalog()
+        with patch('utils.catalog._load_services', return_value={1: "Oil Change", 2: "Tires"}):
+            changed = catalog.get_catalog_version()
+        catalog.invalidate_service_catalog()
+
+        assert first == same
+        assert changed != first
@@ -0,0 +1,126 @@
+import gzip
+import zlib
+import pytest
+from flask import Flask, Response, jsonify
+from werkzeug.http import is_resource_modified
+
+from utils.compression import CompressionMiddleware
+
+
+@pytest.fixture
+def mini_app():
+    app = Flask(__name__)
+
+    @app.route("/big")
+    def big():
+        return jsonify({"items": [{"plate": f"ABC{i:04d}", "service": "Oil change"} for i in range(200)]})
+
+    @app.route("/small")
+    def small():
+        return jsonify({"status": "success"})
+
+    @app.route("/png")
+    def png():
+        return Response(b"\x89PNG" + b"\0" * 4000, mimetype="image/png")
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            for i in range(500):
+                yield f"BEGIN:VEVENT\r\nUID:{i}@shop\r\nEND:VEVENT\r\n"
+        response = Response(generate(), mimetype="text/calendar")
+        response.set_etag("calendar-v1")
+        return response
+
+    @app.route("/encoded")
+    def encoded():
+        response = Response(gzip.compress(b"x" * 4000), mimetype="text/html")
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=500)
+    return app
+
+
+class TestCompressionMiddleware:
+    """Test negotiation, skip rules and counters of the compression middleware."""
+
+    def test_compresses_json(self, mini_app):
+        client = mini_app.test_client()
+        plain = client.get("/big")
+
+        response = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert int(response.headers["Content-Length"]) == len(response.data) < len(plain.data)
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_without_accept_encoding_is_untouched(self, mini_app):
+        response = mini_app.test_client().get("/big")
+
+        assert "Content-Encoding" not in response.headers
+        assert response.is_json
+
+    @pytest.mark.parametrize("path, reason", [("/small", "small"), ("/png", "type"), ("/encoded", "encoded")])
+    def test_skips(self, mini_app, path, reason):
+        client = mini_app.test_client()
+        plain = client.get(path)
+
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        assert response.data == plain.data
+        assert mini_app.wsgi_app.stats.snapshot()["skipped"] == {reason: 1}
+
+    def test_streamed_response_is_compressed_incrementally(self, mini_app):
+        client = mini_app.test_client()
+        plain = client.get("/stream")
+
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"}, buffered=False)
+        chunks = list(response.response)
+        response.close()
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert zlib.decompress(b"".join(chunks), 31) == plain.data
+        assert response.headers["ETag"] == 'W/"calendar-v1"'
+
+    def test_weak_etag_still_revalidates(self, mini_app):
+        client = mini_app.test_client()
+        etag = client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+        assert not is_resource_modified({"HTTP_IF_NONE_MATCH": etag}, etag="calendar-v1")
+
+    def test_counters(self, mini_app):
+        client = mini_app.test_client()
+        client.get("/big", headers={"Accept-Encoding": "gzip"})
+        client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        counters = mini_app.wsgi_app.stats.snapshot()["encodings"]["gzip"]
+
+        assert counters["responses"] == 2
+        assert counters["bytes_saved"] == counters["bytes_in"] - counters["bytes_out"] > 0
+        assert counters["cpu_ms"] >= 0
+
+
+class TestAppCompression:
+    """Test the middleware as installed by create_app."""
+
+    def test_precompressed_pages_pass_through(self, client):
+        plain = client.get('/appointment.html')
+
+        response = client.get('/appointment.html', headers={"Accept-Encoding": "gzip"})
+
+        assert gzip.decompress(response.data) == plain.data
+        assert not response.headers["ETag"].startswith("W/")
+
+    def test_stats_endpoint(self, auth_client):
+        auth_client.get('/appointment.html', headers={"Accept-Encoding": "gzip"})
+
+        response = auth_client.get('/stats/compression')
+
+        assert response.status_code == 200
+        assert response.get_json()["compression"]["skipped"]["encoded"] == 1
+
+    def test_stats_endpoint_requires_auth(self, client):
+        assert client.get('/stats/compression').status_code == 401
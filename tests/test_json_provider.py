@@ -0,0 +1,99 @@
+import pytest
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from mysql.connector import FieldType
+
+DESCRIPTION = [
+    ("Appointment_id", FieldType.LONG, None, None, None, None, 0, 0),
+    ("Date", FieldType.DATE, None, None, None, None, 1, 0),
+    ("Time", FieldType.TIME, None, None, None, None, 1, 0),
+    ("Created", FieldType.DATETIME, None, None, None, None, 1, 0),
+    ("Notes", FieldType.VAR_STRING, None, None, None, None, 1, 0),
+]
+
+
+class TestRowEncoder:
+    """Test the compiled row encoder."""
+
+    def test_encodes_temporal_columns(self):
+        """DATE, TIME and DATETIME columns become strings in one pass."""
+        from utils.json_provider import compile_row_encoder
+
+        encode = compile_row_encoder(DESCRIPTION)
+        row = encode((7, date(2025, 3, 1), timedelta(hours=9, minutes=30), datetime(2025, 1, 2, 8, 0), "hi"))
+
+        assert row == {
+            "Appointment_id": 7,
+            "Date": "2025-03-01",
+            "Time": "9:30:00",
+            "Created": "2025-01-02 08:00:00",
+            "Notes": "hi",
+        }
+
+    def test_encodes_dictionary_rows_and_nulls(self):
+        """Dictionary-cursor rows and NULL values are handled."""
+        from utils.json_provider import compile_row_encoder
+
+        encode = compile_row_encoder(DESCRIPTION)
+        source = {"Appointment_id": 1, "Date": None, "Time": timedelta(hours=10), "Created": None, "Notes": None}
+        row = encode(source)
+
+        assert row["Date"] is None
+        assert row["Time"] == "10:00:00"
+        assert source["Time"] == timedelta(hours=10)  # input untouched
+        assert encode(None) is None
+
+    def test_matches_serialize_for_time(self):
+        """TIME output stays identical to utils.helper.serialize."""
+        from utils.helper import serialize
+        from utils.json_provider import compile_row_encoder
+
+        delta = timedelta(hours=14, minutes=5)
+        encode = compile_row_encoder(DESCRIPTION)
+        assert encode((1, None, delta, None, ""))["Time"] == serialize(delta)
+
+    def test_no_description(self):
+        """A cursor without a result description yields plain dicts."""
+        from utils.json_provider import compile_row_encoder, encode_rows
+
+        assert compile_row_encoder(None)({"a": 1}) == {"a": 1}
+        assert encode_rows(object(), []) == []
+
+
+class TestFastJSONProvider:
+    """Test the Flask JSON provider."""
+
+    def test_app_uses_fast_provider(self, app):
+        """create_app installs the provider."""
+        from utils.json_provider import FastJSONProvider
+
+        assert isinstance(app.json, FastJSONProvider)
+
+    def test_round_trip(self, app):
+        """dumps/loads round-trip and dates keep Flask's format."""
+        payload = {"b": 1, "a": [1, 2, {"c": None}], "d": date(2025, 1, 1)}
+        with app.app_context():
+            text = app.json.dumps(payload)
+            loaded = app.json.loads(text)
+
+        assert loaded["a"] == [1, 2, {"c": None}]
+        assert loaded["d"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    def test_response_body(self, app):
+        """jsonify goes through the provider and produces valid JSON."""
+        from flask import jsonify
+
+        with app.app_context():
+            response = jsonify({"status": "success", "big": 2 ** 70})
+
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == {"status": "success", "big": 2 ** 70}
+
+    def test_stdlib_fallback(self, app):
+        """Without orjson the provider falls back to the stdlib encoder."""
+        with patch("utils.json_provider.orjson", None), app.app_context():
+            body = app.json.response({"x": 1}).get_data()
+
+        assert json.loads(body) == {"x": 1}
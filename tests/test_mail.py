@@ -0,0 +1,174 @@
+import pytest
+from datetime import date
+from email.header import decode_header, make_header
+from email.message import EmailMessage
+from unittest.mock import patch
+
+from tests.smtp_standin import SMTPStandIn
+from utils.mail_templates import ReminderRenderer, get_environment
+
+
+def make_message(i):
+    message = EmailMessage()
+    message["Subject"] = "Reminder"
+    message["From"] = "shop@example.com"
+    message["To"] = f"owner{i}@example.com"
+    message.set_content("Hello")
+    return message
+
+
+@pytest.fixture
+def smtp_server():
+    with SMTPStandIn() as server:
+        yield server
+
+
+def make_pool(server, **kwargs):
+    from utils.smtp_pool import SMTPPool
+
+    options = dict(starttls=False, size=2, backoff=0.01)
+    options.update(kwargs)
+    return SMTPPool("127.0.0.1", server.port, **options)
+
+
+class TestSMTPPool:
+    """Test the persistent SMTP connection pool."""
+
+    def test_dispatch_reuses_connections(self, smtp_server):
+        pool = make_pool(smtp_server)
+        try:
+            result = pool.dispatch(make_message(i) for i in range(20))
+        finally:
+            pool.close()
+
+        assert result == (20, 0)
+        assert len(smtp_server.messages) == 20
+        assert smtp_server.connections <= 2
+
+    def test_transient_failures_are_retried(self, smtp_server):
+        smtp_server.fail_next = 2
+        pool = make_pool(smtp_server, size=1)
+        try:
+            pool.send(make_message(1))
+        finally:
+            pool.close()
+
+        assert len(smtp_server.messages) == 1
+
+    def test_permanent_failures_are_reported(self, smtp_server):
+        smtp_server.fail_next = 1
+        smtp_server.fail_code = 550
+        outcomes = []
+        pool = make_pool(smtp_server, size=1)
+        try:
+            result = pool.dispatch([make_message(1), make_message(2)],
+                                   on_result=lambda message, error: outcomes.append(error))
+        finally:
+            pool.close()
+
+        assert result == (1, 1)
+        assert sum(error is not None for error in outcomes) == 1
+
+    def test_reconnects_after_disconnect(self, smtp_server):
+        smtp_server.disconnect_next = 1
+        pool = make_pool(smtp_server, size=1)
+        try:
+            pool.send(make_message(1))
+        finally:
+            pool.close()
+
+        assert len(smtp_server.messages) == 1
+        assert smtp_server.connections == 2
+
+    def test_iter_results_consumes_lazily(self, smtp_server):
+        produced = []
+
+        def messages():
+            for i in range(20):
+                produced.append(i)
+                yield make_message(i)
+
+        pool = make_pool(smtp_server)
+        try:
+            results = pool.iter_results(messages())
+            next(results)
+            assert len(produced) <= 5
+            assert len(list(results)) == 19
+        finally:
+            pool.close()
+
+    def test_connections_are_recycled(self, smtp_server):
+        pool = make_pool(smtp_server, size=1, max_messages_per_connection=3)
+        try:
+            pool.dispatch(make_message(i) for i in range(7))
+        finally:
+            pool.close()
+
+        assert smtp_server.connections == 3
+
+
+class TestSendReminders:
+    """Test the mail render/send pipeline stages against the stand-in server."""
+
+    def test_send_stage_yields_row_outcomes(self, smtp_server):
+        import mail
+
+        rows = [{"plate_number": f"P{i}", "owner_name": "Sam", "model": "Civic",
+                 "next_oil_change_due": date(2030, 1, 1), "owner_email": f"o{i}@example.com"} for i in range(5)]
+        smtp_server.fail_next = 1
+        smtp_server.fail_code = 550
+        pool = make_pool(smtp_server)
+        try:
+            with patch('mail._renderer', ReminderRenderer("http://shop.test", "shop@example.com")):
+                outcomes = list(mail.send(pool, mail.render(iter(rows))))
+        finally:
+            pool.close()
+
+        assert sorted(row["plate_number"] for row, _ in outcomes) == [f"P{i}" for i in range(5)]
+        assert sum(error is None for _, error in outcomes) == 4
+        assert len(smtp_server.messages) == 4
+
+
+class TestReminderRenderer:
+    """Test rendering reminders from the precompiled email template."""
+
+    ROW = {"plate_number": "B12345", "owner_name": "Sam <Lee>", "model": "Civic",
+           "next_oil_change_due": date(2030, 1, 25), "owner_email": "sam@example.com"}
+
+    def test_booking_link_points_at_appointment_page(self):
+        renderer = ReminderRenderer("https://garage.example.com/", "shop@example.com")
+
+        body = renderer.render(self.ROW).get_payload(decode=True).decode()
+
+        assert 'href="https://garage.example.com/appointment.html?plate=B12345"' in body
+        assert "https/t2" not in body
+
+    def test_fields_are_escaped(self):
+        body = ReminderRenderer("http://shop.test", "shop@example.com").render_body(self.ROW)
+
+        assert "Sam &lt;Lee&gt;" in body
+        assert "2030-01-25" in body
+
+    def test_headers(self):
+        message = ReminderRenderer("http://shop.test", "shop@example.com").render(self.ROW)
+
+        assert message["To"] == "sam@example.com"
+        assert message["From"] == "shop@example.com"
+        assert "Oil Change Reminder" in str(make_header(decode_header(message["Subject"])))
+
+    def test_template_compiled_once(self):
+        first = ReminderRenderer("http://shop.test", "a@example.com")
+        second = ReminderRenderer("http://shop.test", "b@example.com")
+
+        assert first.template is second.template
+        assert get_environment() is get_environment()
+
+    def test_render_batch_is_lazy(self):
+        renderer = ReminderRenderer("http://shop.test", "shop@example.com")
+        rows = iter([self.ROW, dict(self.ROW, plate_number="C1")])
+
+        batch = renderer.render_batch(rows)
+        row, message = next(batch)
+
+        assert row["plate_number"] == "B12345"
+        assert next(rows)["plate_number"] == "C1"
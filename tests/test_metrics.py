@@ -0,0 +1,124 @@
+import json
+import os
+import pytest
+
+from utils.metrics import (
+    BUCKETS, MAX_US, LatencyHistogram, RequestMetrics, bucket_index, bucket_upper, merge_snapshots,
+    render_prometheus,
+)
+
+
+class TestLatencyHistogram:
+    """Test the fixed-memory HDR-style histogram."""
+
+    @pytest.mark.parametrize("us", [0, 1, 31, 32, 33, 63, 64, 999, 1000, 123456, 10 ** 7, MAX_US])
+    def test_bucket_bounds(self, us):
+        index = bucket_index(us)
+        upper = bucket_upper(index)
+
+        assert index < BUCKETS
+        assert us <= upper
+        assert upper - us <= us / 16
+        assert index == 0 or bucket_upper(index - 1) < us
+
+    def test_quantiles(self):
+        hist = LatencyHistogram()
+        for us in range(1, 1001):
+            hist.record(us * 100)  # 0.1 ms .. 100 ms
+
+        assert 50000 <= hist.quantile(0.5) <= 50000 * 1.0625
+        assert 99000 <= hist.quantile(0.99) <= 99000 * 1.0625
+        assert hist.count == 1000
+
+    def test_le_counts_are_cumulative(self):
+        hist = LatencyHistogram()
+        for us in (200, 800, 3000, 40000, 20 * 10 ** 6):
+            hist.record(us)
+
+        counts = hist.le_counts()
+
+        assert counts == sorted(counts)
+        assert counts[0] == 1  # <= 0.5 ms
+        assert counts[-2] == 4  # <= 10 s
+        assert counts[-1] == 5  # +Inf
+
+    def test_le_bounds_are_exact(self):
+        """A value just above a bound is not counted under it, even inside the same HDR bucket."""
+        hist = LatencyHistogram()
+        hist.record(500)
+        hist.record(501)  # same 480-511 us bucket as 500
+
+        counts = hist.le_counts()
+
+        assert bucket_index(500) == bucket_index(501)
+        assert counts[0] == 1  # <= 0.5 ms
+        assert counts[1] == 2  # <= 1 ms
+
+    def test_round_trip(self):
+        hist = LatencyHistogram()
+        hist.record(1234)
+
+        copy = LatencyHistogram.from_dict(json.loads(json.dumps(hist.to_dict())))
+
+        assert copy.counts == hist.counts
+        assert copy.le_counts() == hist.le_counts()
+        assert (copy.count, copy.sum_us) == (1, 1234)
+
+
+class TestRequestMetrics:
+    """Test request instrumentation installed by create_app."""
+
+    def test_records_routes_and_statuses(self, app, client):
+        client.get('/login.html')
+        client.get('/login.html')
+        client.get('/no-such-page')
+
+        merged = merge_snapshots([app.extensions["request_metrics"].snapshot()])
+
+        assert merged["routes"][("templates", "templates.login_page")].count == 2
+        assert merged["requests"][("templates", "templates.login_page", "GET", 200)] == 2
+        assert merged["requests"][("", "unmatched", "GET", 404)] == 1
+        assert merged["in_flight"] == {"templates": 0, "": 0}
+
+    def test_metrics_endpoint(self, app, auth_client):
+        auth_client.get('/login.html')
+
+        response = auth_client.get('/metrics')
+        text = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert 'http_request_duration_seconds_count{blueprint="templates",route="templates.login_page"} 1' in text
+        assert 'http_requests_total{blueprint="templates",route="templates.login_page",method="GET",status="200"} 1' in text
+        assert 'http_requests_in_flight{blueprint="metrics"} 1' in text  # the scrape itself
+
+    def test_metrics_requires_auth(self, client):
+        assert client.get('/metrics').status_code == 401
+
+    def test_merges_worker_snapshots(self, tmp_path):
+        other, exited = RequestMetrics(), RequestMetrics()
+        for metrics in (other, exited):
+            metrics.start("appointments")
+            metrics.finish("appointments", "appointments.book", "POST", 201, 5000)
+        other.start("appointments")  # still in flight
+        (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(other.snapshot()))
+        (tmp_path / "999999999.json").write_text(json.dumps(exited.snapshot()))
+
+        metrics = RequestMetrics(str(tmp_path))
+        merged = metrics.collect()
+
+        assert merged["requests"][("appointments", "appointments.book", "POST", 201)] == 2
+        assert merged["in_flight"]["appointments"] == 1
+        # The exited worker's totals now live in this worker's snapshot
+        assert not (tmp_path / "999999999.json").exists()
+        assert json.loads((tmp_path / f"{os.getpid()}.json").read_text())["requests"][0][-1] == 1
+
+    def test_escapes_label_values(self):
+        metrics = RequestMetrics()
+        metrics.start("bp")
+        metrics.finish("bp", 'we"ird\\route', "GET", 200, 10)
+
+        text = render_prometheus(metrics.collect())
+
+        assert 'route="we\\"ird\\\\route"' in text
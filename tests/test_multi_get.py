@@ -0,0 +1,39 @@
+import pytest
+import json
+from datetime import date, timedelta
+
+from mysql.connector import FieldType
+
+
+class TestMultiGet:
+    """Test GET /appointments?ids=..."""
+
+    def test_resolves_ids_in_one_query(self, client, mock_db_success):
+        """Found and missing IDs are both reported, keyed by ID."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.description = [
+            ("Appointment_id", FieldType.LONG), ("Date", FieldType.DATE), ("Time", FieldType.TIME),
+            ("Notes", FieldType.VAR_STRING), ("Car_plate", FieldType.VAR_STRING), ("Services", FieldType.BLOB),
+        ]
+        mock_cursor.fetchall.return_value = [
+            {"Appointment_id": 3, "Date": date(2025, 1, 2), "Time": timedelta(hours=9),
+             "Notes": "", "Car_plate": "AAA111", "Services": "Oil Change"},
+        ]
+
+        response = client.get('/appointments?ids=3,4&ids=3')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["appointments"]["3"]["Date"] == "2025-01-02"
+        assert data["appointments"]["4"] is None
+        assert data["not_found"] == [4]
+        assert mock_cursor.execute.call_count == 1
+        assert mock_cursor.execute.call_args[0][1] == (3, 4)
+
+    def test_rejects_bad_input(self, client):
+        assert client.get('/appointments').status_code == 400
+        assert client.get('/appointments?ids=1,x').status_code == 400
+
+    def test_rejects_too_many_ids(self, client, app):
+        ids = ",".join(str(i) for i in range(app.config["MULTI_GET_MAX_IDS"] + 1))
+        assert client.get(f'/appointments?ids={ids}').status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+FUTURE = (datetime.now() + timedelta(days=5)).strftime('%Y-%m-%d')
+CATALOG = {1: "Oil Change", 2: "Tire Rotation"}
+
+
+@pytest.fixture
+def catalog():
+    with patch('routes.appointment_routes.get_service_catalog', return_value=CATALOG):
+        yield
+
+
+class TestDirectUpdate:
+    """Test PUT /appointments/<id> with version checks."""
+
+    def test_requires_login(self, client):
+        response = client.put('/appointments/1', data=json.dumps({"version": 0}), content_type='application/json')
+        assert response.status_code == 401
+
+    def test_requires_version(self, auth_client):
+        data = {"date": FUTURE, "time": "10:00", "service_ids": [1]}
+        response = auth_client.put('/appointments/1', data=json.dumps(data), content_type='application/json')
+        assert response.status_code == 428
+
+    def test_successful_update(self, auth_client, mock_db_success, catalog):
+        """A matching version is swapped in one transaction, without re-fetching."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.side_effect = [(date(2030, 1, 1), timedelta(hours=9), "ABC123", 3), None]
+        mock_cursor.fetchall.return_value = [(1,)]
+        mock_cursor.rowcount = 1
+        data = {"date": FUTURE, "time": "14:30", "service_ids": [1, 2], "notes": "n", "version": 3}
+
+        response = auth_client.put('/appointments/7', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 200
+        body = json.loads(response.data)
+        assert body["appointment"]["Version"] == 4
+        assert body["appointment"]["Services"] == "Oil Change,Tire Rotation"
+        assert body["appointment"]["Car_plate"] == "ABC123"
+        assert response.headers["ETag"] == '"4"'
+        update_sql, update_params = [c[0] for c in mock_cursor.execute.call_args_list if "UPDATE appointment" in c[0][0]][0]
+        assert "Version = %s" in update_sql
+        assert update_params[-1] == 3
+        mock_conn.commit.assert_called_once()
+
+    def test_stale_version_conflicts(self, auth_client, mock_db_success, catalog):
+        """A second editor holding an old version gets a 409 with the current version."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (date(2030, 1, 1), timedelta(hours=9), "ABC123", 5)
+        data = {"date": FUTURE, "time": "14:30", "service_ids": [1], "version": 4}
+
+        response = auth_client.put('/appointments/7', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 409
+        assert json.loads(response.data)["version"] == 5
+        mock_conn.rollback.assert_called()
+        mock_conn.commit.assert_not_called()
+
+    def test_if_match_header(self, auth_client, mock_db_success, catalog):
+        """The expected version may also be sent as If-Match."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = None
+        data = {"date": FUTURE, "time": "14:30", "service_ids": [1]}
+
+        response = auth_client.put('/appointments/7', data=json.dumps(data), content_type='application/json',
+                                   headers={"If-Match": '"2"'})
+
+        assert response.status_code == 404
+
+    def test_invalid_service(self, auth_client, mock_db_success, catalog):
+        data = {"date": FUTURE, "time": "14:30", "service_ids": [99], "version": 0}
+        response = auth_client.put('/appointments/7', data=json.dumps(data), content_type='application/json')
+        assert response.status_code == 400
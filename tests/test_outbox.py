@@ -0,0 +1,175 @@
+import pytest
+import json
+from email import message_from_bytes
+from datetime import date, timedelta
+from unittest.mock import MagicMock, Mock, patch
+
+from utils.outbox import OutboxDispatcher, OutboxEvent
+
+
+def event(i, topic="appointment.booked", email="sam@example.com", attempts=1):
+    return OutboxEvent(i, topic, f"{topic}:{i}", {"appointment_id": i, "car_plate": "B123",
+                                                   "date": "2030-01-25", "time": "10:00",
+                                                   "service_ids": [1], "email": email}, attempts)
+
+
+def outbox_writes(mock_cursor):
+    return [c for c in mock_cursor.execute.call_args_list if "INSERT IGNORE INTO outbox" in c[0][0]]
+
+
+class TestOutboxWrites:
+    """Test that appointment writes queue an event in the same transaction."""
+
+    def test_book_enqueues_event(self, client, mock_db_success, sample_appointment_data):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.side_effect = [None, (1,)]
+        mock_cursor.fetchall.return_value = [(1,), (2,)]
+        mock_cursor.lastrowid = 42
+        data = dict(sample_appointment_data, date=(date.today() + timedelta(days=3)).isoformat(),
+                    email="sam@example.com")
+
+        response = client.post('/book', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 201
+        (sql, params), = [c[0] for c in outbox_writes(mock_cursor)]
+        assert params[0] == "appointment.booked"
+        assert params[1] == "appointment.booked:42"
+        assert json.loads(params[2])["email"] == "sam@example.com"
+        mock_conn.commit.assert_called_once()
+
+    def test_book_rejects_invalid_email(self, client, sample_appointment_data):
+        data = dict(sample_appointment_data, email="not-an-address")
+
+        response = client.post('/book', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+
+    def test_delete_enqueues_event(self, auth_client, mock_db_success):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (date(2030, 5, 1), timedelta(hours=11), "ABC123", 3)
+        mock_cursor.fetchall.return_value = [(4,)]
+
+        response = auth_client.delete('/appointments/7')
+
+        assert response.status_code == 200
+        (sql, params), = [c[0] for c in outbox_writes(mock_cursor)]
+        assert params[1] == "appointment.deleted:7"
+        assert json.loads(params[2])["time"] == "11:00"
+
+    def test_update_dedup_key_carries_version(self, auth_client, mock_db_success):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.side_effect = [(date(2030, 5, 1), timedelta(hours=11), "ABC123", 3), (0,), None]
+        mock_cursor.fetchall.return_value = [(1,)]
+        data = {"date": (date.today() + timedelta(days=3)).isoformat(), "time": "10:00", "service_ids": [1]}
+
+        auth_client.put('/appointments/update', data=json.dumps(data), content_type='application/json')
+
+        (sql, params), = [c[0] for c in outbox_writes(mock_cursor)]
+        assert params[1] == "appointment.updated:1:4"
+
+
+class TestOutboxDispatcher:
+    """Test batch delivery, retries and dead-lettering."""
+
+    def run(self, events, consumers, **kwargs):
+        dispatcher = OutboxDispatcher(Mock(), consumers, **kwargs)
+        conn = MagicMock()
+        with patch("utils.outbox.claim_batch", return_value=events), \
+                patch("utils.outbox.mark_sent") as mark_sent, \
+                patch("utils.outbox.mark_failed") as mark_failed:
+            stats = dispatcher.run_once(conn)
+        conn.commit.assert_called_once()
+        return stats, mark_sent, mark_failed
+
+    def test_acknowledges_delivered_events(self):
+        consumer = lambda events: ((e, None) for e in events)
+
+        stats, mark_sent, mark_failed = self.run([event(1), event(2)], {"appointment.booked": consumer})
+
+        assert stats == (2, 0, 0)
+        assert mark_sent.call_args[0][1] == [1, 2]
+        mark_failed.assert_not_called()
+
+    def test_failures_are_retried_then_dead(self):
+        consumer = lambda events: ((e, RuntimeError("smtp down")) for e in events)
+
+        stats, _, mark_failed = self.run([event(1, attempts=1), event(2, attempts=3)],
+                                         {"appointment.booked": consumer}, max_attempts=3, backoff=10)
+
+        assert stats == (0, 1, 1)
+        assert [c[0][3] for c in mark_failed.call_args_list] == [10, None]
+
+    def test_events_without_consumer_are_acknowledged(self):
+        stats, mark_sent, _ = self.run([event(1, topic="appointment.deleted")], {})
+
+        assert stats.sent == 1
+
+    def test_database_errors_reconnect_instead_of_exiting(self):
+        from mysql.connector import Error
+
+        first, second = MagicMock(), MagicMock()
+        connect = Mock(side_effect=[first, second])
+        dispatcher = OutboxDispatcher(connect, {})
+        logged = []
+
+        with patch.object(dispatcher, "run_once", side_effect=[Error("Lost connection"), KeyboardInterrupt]), \
+                patch("utils.outbox.time.sleep") as sleep:
+            with pytest.raises(KeyboardInterrupt):
+                dispatcher.run(log=logged.append, error_sleep=7)
+
+        assert connect.call_count == 2
+        first.close.assert_called_once()
+        second.close.assert_called_once()
+        sleep.assert_called_once_with(7)
+        assert "Lost connection" in logged[0]
+
+    def test_once_propagates_errors(self):
+        from mysql.connector import Error
+
+        dispatcher = OutboxDispatcher(Mock(return_value=MagicMock()), {})
+
+        with patch.object(dispatcher, "run_once", side_effect=Error("Lost connection")):
+            with pytest.raises(Error):
+                dispatcher.run(once=True)
+
+    def test_backoff_is_capped(self):
+        dispatcher = OutboxDispatcher(Mock(), {}, max_attempts=20, backoff=30, max_backoff=600)
+
+        assert dispatcher.retry_delay(1) == 30
+        assert dispatcher.retry_delay(2) == 60
+        assert dispatcher.retry_delay(10) == 600
+        assert dispatcher.retry_delay(20) is None
+
+
+class TestNoticeConsumer:
+    """Test the mail consumer for appointment events."""
+
+    def test_sends_only_events_with_email(self):
+        from tests.smtp_standin import SMTPStandIn
+        from utils.mail_templates import AppointmentNoticeRenderer
+        from utils.smtp_pool import SMTPPool
+        import mail
+
+        renderer = AppointmentNoticeRenderer("http://shop.test", "shop@example.com", {1: "Oil Change"})
+        with SMTPStandIn() as server:
+            pool = SMTPPool("127.0.0.1", server.port, starttls=False, size=2)
+            try:
+                results = list(mail.notice_consumer(pool, renderer)([event(1), event(2, email=None)]))
+            finally:
+                pool.close()
+
+        assert sorted(e.id for e, error in results if error is None) == [1, 2]
+        assert len(server.messages) == 1
+        sent = message_from_bytes(server.messages[0])
+        assert "Oil Change" in sent.get_payload(decode=True).decode()
+        assert sent["Message-ID"] == renderer.message_id("appointment.booked:1")
+
+    def test_message_id_is_stable_per_dedup_key(self):
+        from utils.mail_templates import AppointmentNoticeRenderer
+
+        renderer = AppointmentNoticeRenderer("https://garage.example.com", "shop@example.com")
+        first = renderer.render("appointment.booked", "appointment.booked:1", event(1).payload)
+        again = renderer.render("appointment.booked", "appointment.booked:1", event(1).payload)
+
+        assert first["Message-ID"] == again["Message-ID"]
+        assert first["Message-ID"].endswith("@garage.example.com>")
@@ -0,0 +1,173 @@
+import gzip
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+
+class TestRenderedPageCache:
+    """Test the rendered-output cache for context-free templates."""
+
+    def test_renders_once(self, client):
+        with patch('utils.page_cache.render_template', return_value="<html>login</html>") as render:
+            first = client.get('/login.html')
+            second = client.get('/login.html')
+
+        assert render.call_count == 1
+        assert first.data == second.data == b"<html>login</html>"
+
+    def test_conditional_request_skips_jinja(self, client):
+        etag = client.get('/signup.html').headers["ETag"]
+
+        with patch('utils.page_cache.render_template') as render:
+            response = client.get('/signup.html', headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        render.assert_not_called()
+
+    def test_serves_precompressed_variant(self, client):
+        plain = client.get('/appointment.html')
+
+        response = client.get('/appointment.html', headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.data) == plain.data
+        assert response.headers["ETag"] != plain.headers["ETag"]
+        assert "Accept-Encoding" in response.headers["Vary"]
+
+    def test_concurrent_misses_render_once(self, app):
+        from utils.page_cache import RenderedPageCache
+
+        cache = RenderedPageCache()
+
+        def slow_render(*args, **kwargs):
+            time.sleep(0.05)
+            return "<html>slow</html>"
+
+        def fetch():
+            with app.test_request_context():
+                cache.get("login.html")
+
+        with patch('utils.page_cache.render_template', side_effect=slow_render) as render:
+            threads = [threading.Thread(target=fetch) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert render.call_count == 1
+
+    def test_compresses_at_middleware_threshold(self, client):
+        body = "x" * 505  # between the old 500 (middleware) and 512 (cache) thresholds
+        with patch('utils.page_cache.render_template', return_value=body):
+            response = client.get('/login.html', headers={"Accept-Encoding": "gzip"})
+            etag = response.headers["ETag"]
+            revalidated = client.get('/login.html', headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert not etag.startswith("W/")
+        assert revalidated.status_code == 304
+
+    def test_weak_etag_revalidates(self, client):
+        etag = client.get('/signup.html').headers["ETag"]
+
+        response = client.get('/signup.html', headers={"If-None-Match": "W/" + etag})
+
+        assert response.status_code == 304
+
+    def test_template_change_invalidates_in_dev_mode(self, app, tmp_path):
+        from utils.page_cache import RenderedPageCache
+
+        app.jinja_loader.searchpath.insert(0, str(tmp_path))
+        page = tmp_path / "probe.html"
+        page.write_text("<p>one</p>")
+        cache = RenderedPageCache(auto_reload=True)
+
+        with app.test_request_context():
+            assert cache.get("probe.html").variants["identity"] == b"<p>one</p>"
+            page.write_text("<p>two</p>")
+            future = time.time() + 5
+            os.utime(page, (future, future))
+            assert cache.get("probe.html").variants["identity"] == b"<p>two</p>"
+
+    def test_no_reload_outside_dev_mode(self, app, tmp_path):
+        from utils.page_cache import RenderedPageCache
+
+        app.jinja_loader.searchpath.insert(0, str(tmp_path))
+        page = tmp_path / "probe.html"
+        page.write_text("<p>one</p>")
+        cache = RenderedPageCache(auto_reload=False)
+
+        with app.test_request_context():
+            cache.get("probe.html")
+            page.write_text("<p>two</p>")
+            assert cache.get("probe.html").variants["identity"] == b"<p>one</p>"
+
+
+class TestCatalogPages:
+    """Test the service grid rendered from the service catalog."""
+
+    def get(self, client, url, services, version, **kwargs):
+        with patch('routes.template_routes.get_service_catalog', return_value=services), \
+                patch('routes.template_routes.get_catalog_version', return_value=version):
+            return client.get(url, **kwargs)
+
+    def test_grid_lists_catalog_services(self, client):
+        response = self.get(client, '/appointment.html', {1: "Oil Change", 7: "Wheel <Alignment>"}, "v1")
+
+        assert b'data-id="7">Wheel &lt;Alignment&gt;</div>' in response.data
+        assert b'data-id="4"' not in response.data
+
+    def test_catalog_change_rerenders_page(self, client):
+        first = self.get(client, '/appointment.html', {1: "Oil Change"}, "v1")
+        same = self.get(client, '/appointment.html', {1: "Oil Change"}, "v1")
+        changed = self.get(client, '/appointment.html', {1: "Oil Change", 2: "Detailing"}, "v2")
+
+        assert first.headers["ETag"] == same.headers["ETag"]
+        assert changed.headers["ETag"] != first.headers["ETag"]
+        assert b"Detailing" in changed.data
+
+    def test_unchanged_catalog_skips_rendering(self, client):
+        self.get(client, '/appointment.html', {1: "Oil Change"}, "v1")
+
+        with patch('utils.page_cache.render_template') as render:
+            response = self.get(client, '/appointment.html', {1: "Oil Change"}, "v1")
+
+        assert response.status_code == 200
+        render.assert_not_called()
+
+    def test_update_page_uses_same_grid(self, auth_client):
+        response = self.get(auth_client, '/updateAppointment.html', {3: "Brake Inspection"}, "v1")
+
+        assert b'data-id="3">Brake Inspection</div>' in response.data
+
+    def test_database_down_serves_empty_grid(self, client):
+        from mysql.connector import Error
+
+        with patch('routes.template_routes.get_service_catalog', side_effect=Error("down")):
+            response = client.get('/appointment.html')
+
+        assert response.status_code == 200
+        assert b'class="service-item"' not in response.data
+
+
+class TestServicesEndpoint:
+    """Test GET /services."""
+
+    def test_lists_services_with_cache_headers(self, client):
+        with patch('routes.appointment_routes.get_service_catalog', return_value={2: "Tire Rotation", 1: "Oil Change"}), \
+                patch('routes.appointment_routes.get_catalog_version', return_value="abc123"):
+            response = client.get('/services')
+
+        assert response.status_code == 200
+        assert response.get_json()["services"] == [{"id": 1, "name": "Oil Change"}, {"id": 2, "name": "Tire Rotation"}]
+        assert response.headers["ETag"] == '"abc123"'
+        assert "max-age=86400" in response.headers["Cache-Control"]
+
+    def test_revalidation(self, client):
+        with patch('routes.appointment_routes.get_service_catalog', return_value={1: "Oil Change"}), \
+                patch('routes.appointment_routes.get_catalog_version', return_value="abc123"):
+            response = client.get('/services', headers={"If-None-Match": '"abc123"'})
+
+        assert response.status_code == 304
@@ -0,0 +1,210 @@
+import pytest
+import json
+import os
+import threading
+from unittest.mock import Mock, patch
+from werkzeug.security import generate_password_hash
+
+
+class TestPasswordHasher:
+    """Test the pooled password hasher."""
+
+    def test_inline_hash_and_verify(self):
+        from utils.passwords import PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=0)
+        hashed = hasher.hash("secret123")
+
+        assert hashed.startswith("pbkdf2:sha256:1000$")
+        assert hasher.verify(hashed, "secret123") is True
+        assert hasher.verify(hashed, "wrong") is False
+        assert hasher.verify(None, "secret123") is False
+
+    def test_process_pool(self):
+        """Hashing in a worker process gives the same results."""
+        from utils.passwords import PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, max_pending=2)
+        try:
+            hashed = hasher.hash("secret123")
+            assert hasher.verify(hashed, "secret123") is True
+        finally:
+            hasher.shutdown()
+
+    def test_broken_pool_is_replaced(self):
+        """A pool whose worker process died is discarded and the job retried once."""
+        from concurrent.futures.process import BrokenProcessPool
+        from utils.passwords import PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, max_pending=2)
+        broken = Mock()
+        broken.submit.side_effect = BrokenProcessPool("A child process terminated abruptly")
+        hasher._pool, hasher._pool_pid = broken, os.getpid()
+        try:
+            hashed = hasher.hash("secret123")
+
+            assert hasher.verify(hashed, "secret123") is True
+            broken.shutdown.assert_called_once()
+            assert hasher._pool is not broken
+        finally:
+            hasher.shutdown()
+
+    def test_queue_depth_limit(self):
+        """Work beyond max_pending is rejected instead of queued."""
+        from utils.passwords import HasherBusy, PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, max_pending=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        class BlockingPool:
+            def submit(self, fn, *args):
+                started.set()
+                release.wait(5)
+                return type("Done", (), {"result": lambda self: "ok"})()
+
+        with patch.object(hasher, "_executor", return_value=BlockingPool()):
+            worker = threading.Thread(target=hasher.hash, args=("a",))
+            worker.start()
+            started.wait(5)
+            with pytest.raises(HasherBusy):
+                hasher.hash("b")
+            release.set()
+            worker.join()
+
+    def test_hasher_uses_config(self, app):
+        from utils.passwords import get_password_hasher
+
+        app.config['PASSWORD_HASH_METHOD'] = "pbkdf2:sha256:1000"
+        with app.app_context():
+            hasher = get_password_hasher()
+            assert hasher is get_password_hasher()
+            assert hasher.hash("x").startswith("pbkdf2:sha256:1000$")
+
+
+class TestAuthRoutesUseHasher:
+    """Test that the auth routes go through the hasher."""
+
+    def test_login_busy_returns_503(self, client, mock_db_success):
+        from utils.passwords import HasherBusy
+
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (generate_password_hash("testpass123"),)
+        with patch('utils.passwords.PasswordHasher.verify', side_effect=HasherBusy()):
+            response = client.post('/login', data=json.dumps({"username": "u", "password": "testpass123"}),
+                                   content_type='application/json')
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_login_verifies_through_hasher(self, client, mock_db_success):
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (generate_password_hash("testpass123"),)
+
+        response = client.post('/login', data=json.dumps({"username": "u", "password": "testpass123"}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+
+
+def legacy_sha1(password):
+    import hashlib
+    return hashlib.sha1(password.encode()).hexdigest()
+
+
+def legacy_scrypt(password, n=1024, r=4, p=1):
+    """Same format as appointment.py's generate_scrypt_hash (small n to keep tests fast)."""
+    import hashlib
+    import os
+    salt = os.urandom(16).hex()
+    digest = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p).hex()
+    return f"scrypt:{n}:{r}:{p}${salt}${digest}"
+
+
+def legacy_sha256(password):
+    import hashlib
+    return f"sha256$0011223344556677$" + hashlib.sha256(password.encode()).hexdigest()
+
+
+class TestLegacyFormats:
+    """Test detection and verification of every stored password format."""
+
+    @pytest.mark.parametrize("make,scheme", [
+        (legacy_sha1, "sha1"),
+        (legacy_sha256, "legacy-sha256"),
+        (legacy_scrypt, "legacy-scrypt"),
+        (lambda pw: generate_password_hash(pw, "scrypt:1024:8:1"), "scrypt"),
+        (lambda pw: generate_password_hash(pw, "pbkdf2:sha256:1000"), "pbkdf2"),
+    ])
+    def test_identify_and_verify(self, make, scheme):
+        from utils.passwords import identify_scheme, verify_any
+
+        stored = make("secret123")
+        assert identify_scheme(stored) == scheme
+        assert verify_any(stored, "secret123") is True
+        assert verify_any(stored, "wrong") is False
+
+    def test_unknown_and_malformed(self):
+        from utils.passwords import verify_any
+
+        assert verify_any("md5$abc", "x") is False
+        assert verify_any("scrypt:1:2$zz$zz", "x") is False
+
+    def test_needs_rehash(self):
+        from utils.passwords import PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=0)
+        assert hasher.needs_rehash(legacy_sha1("a")) is True
+        assert hasher.needs_rehash(generate_password_hash("a", "pbkdf2:sha256:2000")) is True
+        assert hasher.needs_rehash(hasher.hash("a")) is False
+
+    def test_short_method_names_are_expanded(self):
+        """A short config value like 'pbkdf2' must not cause a rehash on every login."""
+        from utils.passwords import PasswordHasher
+
+        hasher = PasswordHasher("pbkdf2", workers=0)
+        assert hasher.needs_rehash(generate_password_hash("a", "pbkdf2")) is False
+
+
+class TestRehashOnLogin:
+    """Test transparent upgrade of legacy hashes at login."""
+
+    def test_legacy_hash_is_upgraded(self, app, client, mock_db_success):
+        app.config['PASSWORD_HASH_METHOD'] = "pbkdf2:sha256:1000"
+        mock_conn, mock_cursor = mock_db_success
+        stored = legacy_sha1("testpass123")
+        mock_cursor.fetchone.return_value = (stored,)
+
+        response = client.post('/login', data=json.dumps({"username": "u", "password": "testpass123"}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        sql, params = mock_cursor.execute.call_args[0]
+        assert sql.startswith("UPDATE admin SET Password")
+        assert params[0].startswith("pbkdf2:sha256:1000$")
+        assert params[1:] == ("u", stored)
+        mock_conn.commit.assert_called_once()
+
+    def test_current_hash_is_left_alone(self, app, client, mock_db_success):
+        app.config['PASSWORD_HASH_METHOD'] = "pbkdf2:sha256:1000"
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (generate_password_hash("testpass123", "pbkdf2:sha256:1000"),)
+
+        response = client.post('/login', data=json.dumps({"username": "u", "password": "testpass123"}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        assert mock_cursor.execute.call_count == 1
+
+    def test_rehash_failure_does_not_fail_login(self, app, client, mock_db_success):
+        from mysql.connector import Error
+
+        app.config['PASSWORD_HASH_METHOD'] = "pbkdf2:sha256:1000"
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (legacy_sha1("testpass123"),)
+        mock_cursor.execute.side_effect = [None, Error("lock wait timeout")]
+
+        response = client.post('/login', data=json.dumps({"username": "u", "password": "testpass123"}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
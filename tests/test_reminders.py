@@ -0,0 +1,184 @@
+import pytest
+import smtplib
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from utils import reminders
+from utils.reminders import due_window, run_reminders
+from utils.smtp_pool import _is_transient
+
+TODAY = date(2030, 1, 10)
+
+
+class FakeStore:
+    """In-memory stand-in for car_maintenance, the ledger and the watermark."""
+
+    def __init__(self, cars, watermark=None):
+        self.cars = sorted(cars, key=lambda r: (r["next_oil_change_due"], r["plate_number"]))
+        self.ledger = {}  # (plate, due) -> (status, attempts)
+        self.watermark = watermark
+        self.flushes = []
+        self.read = 0
+
+    def stream(self, cursor, start, end):
+        for r in self.cars:
+            status, attempts = self.ledger.get((r["plate_number"], r["next_oil_change_due"]), (None, 0))
+            if start <= r["next_oil_change_due"] <= end and status in (None, "retry"):
+                self.read += 1
+                yield dict(r, attempts=attempts)
+
+    def record(self, cursor, rows):
+        self.flushes.append(len(rows))
+        for r in rows:
+            self.ledger[(r["plate_number"], r["next_oil_change_due"])] = ("sent", 1)
+
+    def record_failed(self, cursor, failures):
+        for r, status, attempts, error in failures:
+            self.ledger[(r["plate_number"], r["next_oil_change_due"])] = (status, attempts)
+
+    def save(self, cursor, last_due, job):
+        self.watermark = last_due
+
+    def run(self, deliver, today=TODAY, batch_size=2, **kwargs):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = {"acquired": 1}
+        with patch.object(reminders, "stream_due", self.stream), \
+                patch.object(reminders, "record_sent", self.record), \
+                patch.object(reminders, "record_failed", self.record_failed), \
+                patch.object(reminders, "save_watermark", self.save), \
+                patch.object(reminders, "load_watermark", lambda cursor, job: self.watermark):
+            return run_reminders(conn, MagicMock(), deliver, today=today, lead_days=15, batch_size=batch_size,
+                                 **kwargs)
+
+
+def car(plate, due):
+    return {"plate_number": plate, "owner_name": "Sam", "model": "Civic",
+            "next_oil_change_due": due, "owner_email": f"{plate}@example.com"}
+
+
+def send_all(sent, fail=(), error=RuntimeError("rejected")):
+    def deliver(rows):
+        for r in rows:
+            if r["plate_number"] in fail:
+                yield r, error
+            else:
+                sent.append(r["plate_number"])
+                yield r, None
+    return deliver
+
+
+class TestDueWindow:
+    """Test the due-date window computation."""
+
+    def test_first_run_covers_only_target_date(self):
+        assert due_window(None, TODAY, 15) == (date(2030, 1, 25), date(2030, 1, 25))
+
+    def test_catch_up_after_downtime(self):
+        assert due_window(date(2030, 1, 20), TODAY, 15) == (date(2030, 1, 21), date(2030, 1, 25))
+
+
+class TestRunReminders:
+    """Test the watermark/ledger driven reminder run."""
+
+    def test_catches_up_missed_days_in_batches(self):
+        store = FakeStore([car(f"P{i}", date(2030, 1, 21 + i)) for i in range(5)], watermark=date(2030, 1, 20))
+        sent = []
+
+        result = store.run(send_all(sent))
+
+        assert sent == ["P0", "P1", "P2", "P3", "P4"]
+        assert result.sent == 5 and result.failed == 0
+        assert store.watermark == date(2030, 1, 25)
+        assert store.flushes == [2, 2, 1]
+
+    def test_rerun_is_idempotent(self):
+        store = FakeStore([car("P1", date(2030, 1, 25))])
+        sent = []
+
+        store.run(send_all(sent))
+        store.run(send_all(sent))
+        store.watermark = None  # even with the watermark lost, the ledger prevents a resend
+        store.run(send_all(sent))
+
+        assert sent == ["P1"]
+
+    def test_failed_rows_hold_back_watermark(self):
+        store = FakeStore([car("P1", date(2030, 1, 22)), car("P2", date(2030, 1, 24))], watermark=date(2030, 1, 20))
+
+        result = store.run(send_all([], fail={"P2"}))
+        assert result.failed == 1
+        assert store.watermark == date(2030, 1, 23)
+
+        sent = []
+        store.run(send_all(sent))
+        assert sent == ["P2"]
+        assert store.watermark == date(2030, 1, 25)
+
+    def test_permanent_failure_does_not_pin_watermark(self):
+        store = FakeStore([car("P1", date(2030, 1, 22)), car("P2", date(2030, 1, 24))], watermark=date(2030, 1, 20))
+        bounce = smtplib.SMTPRecipientsRefused({"P2@example.com": (550, b"No such user")})
+
+        result = store.run(send_all([], fail={"P2"}, error=bounce), is_transient=_is_transient)
+
+        assert result.failed == 1
+        assert store.watermark == date(2030, 1, 25)
+        assert store.ledger[("P2", date(2030, 1, 24))] == ("failed", 1)
+        sent = []
+        store.run(send_all(sent))
+        assert sent == []
+
+    def test_transient_failures_give_up_after_max_attempts(self):
+        store = FakeStore([car("P1", date(2030, 1, 24))], watermark=date(2030, 1, 20))
+        attempts = []
+
+        def deliver(rows):
+            for r in rows:
+                attempts.append(r["attempts"])
+                yield r, ConnectionError("timed out")
+
+        for _ in range(4):
+            store.run(deliver, max_attempts=3)
+
+        assert attempts == [0, 1, 2]
+        assert store.ledger[("P1", date(2030, 1, 24))] == ("failed", 3)
+        assert store.watermark == date(2030, 1, 25)
+
+    def test_records_while_streaming(self):
+        store = FakeStore([car(f"P{i}", date(2030, 1, 25)) for i in range(6)])
+        seen = []
+
+        def deliver(rows):
+            for r in rows:
+                seen.append((store.read, len(store.ledger)))
+                yield r, None
+
+        store.run(deliver)
+
+        # rows are pulled one at a time and ledger batches land mid-stream
+        assert [read for read, _ in seen] == [1, 2, 3, 4, 5, 6]
+        assert seen[-1][1] == 4
+
+    def test_records_delivered_rows_when_the_run_fails(self):
+        store = FakeStore([car(f"P{i}", date(2030, 1, 25)) for i in range(3)])
+        sent = []
+
+        def deliver(rows):
+            for r in rows:
+                if r["plate_number"] == "P2":
+                    raise ConnectionError("SMTP went away")
+                sent.append(r["plate_number"])
+                yield r, None
+
+        with pytest.raises(ConnectionError):
+            store.run(deliver, batch_size=10)
+        store.run(send_all(sent))
+
+        assert sent == ["P0", "P1", "P2"]
+
+    def test_skips_when_lock_is_held(self):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = {"acquired": 0}
+        deliver = MagicMock()
+
+        assert run_reminders(conn, MagicMock(), deliver, today=TODAY) is None
+        deliver.assert_not_called()
@@ -0,0 +1,80 @@
+import gc
+import os
+from unittest.mock import patch
+
+import serve
+
+
+class TestServeSizing:
+    """Test worker/thread sizing of the production entrypoint."""
+
+    def test_workers_from_cpu_count(self):
+        with patch.object(serve.config, "SERVE_WORKERS", 0):
+            assert serve.worker_count(cpus=1) == 3
+            assert serve.worker_count(cpus=8) == 17
+
+    def test_explicit_counts_win(self):
+        with patch.object(serve.config, "SERVE_WORKERS", 4), patch.object(serve.config, "SERVE_THREADS", 16):
+            options = serve.server_options(cpus=8)
+
+        assert options["workers"] == 4
+        assert options["threads"] == 16
+
+    def test_preloads_before_fork(self):
+        options = serve.server_options(cpus=2)
+
+        assert options["preload_app"] is True
+        assert options["worker_class"] == "gthread"
+
+    def test_ready_hook_freezes_heap(self):
+        try:
+            serve.server_options()["when_ready"](None)
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+    def test_prefork_environment_defaults(self, tmp_path):
+        environ = {"METRICS_DIR": str(tmp_path)}
+        assert serve.prefork_environment(environ) is None  # given, so not ours to remove
+
+        assert environ["RATE_LIMIT_BACKEND"] == "sqlite"
+        assert environ["HASH_POOL_WORKERS"] == "1"
+        assert environ["APP_DEBUG"] == "0"
+        assert environ["METRICS_DIR"] == str(tmp_path)
+
+    def test_created_metrics_dir_is_removed_on_exit(self):
+        environ = {}
+        created = serve.prefork_environment(environ)
+
+        assert created == environ["METRICS_DIR"] and os.path.isdir(created)
+        serve._remove_on_exit(created)(None)
+        assert not os.path.exists(created)
+
+    def test_prefork_environment_keeps_explicit_settings(self, tmp_path):
+        environ = {"RATE_LIMIT_BACKEND": "memory", "HASH_POOL_WORKERS": "0", "METRICS_DIR": str(tmp_path)}
+        serve.prefork_environment(environ)
+
+        assert environ["RATE_LIMIT_BACKEND"] == "memory"
+        assert environ["HASH_POOL_WORKERS"] == "0"
+
+
+class TestSQLiteSessionsAfterFork:
+    """A preloaded SQLite session connection is not reused by forked workers."""
+
+    def test_reconnects_in_child_process(self, tmp_path):
+        from utils.session_store import SQLiteBackend
+
+        backend = SQLiteBackend(str(tmp_path / "sessions.db"))
+        parent = backend._conn()
+
+        with patch("utils.session_store.os.getpid", return_value=-1):
+            assert backend._conn() is not parent
+
+    def test_rate_limit_store_reconnects_in_child_process(self, tmp_path):
+        from utils.rate_limit import SQLiteBucketStore
+
+        store = SQLiteBucketStore(str(tmp_path / "limits.db"))
+        parent = store._conn()
+
+        with patch("utils.rate_limit.os.getpid", return_value=-1):
+            assert store._conn() is not parent
@@ -0,0 +1,123 @@
+import pytest
+import json
+import time
+from unittest.mock import patch
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def server_session_app(request, tmp_path):
+    """App using a server-side session backend."""
+    from app import create_app
+    from utils.session_store import make_session_interface
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SESSION_BACKEND'] = request.param
+    app.config['SESSION_SQLITE_PATH'] = str(tmp_path / "sessions.db")
+    app.session_interface = make_session_interface(app.config)
+    return app
+
+
+class TestBackends:
+    """Test the session storage backends."""
+
+    def test_memory_lru_eviction(self):
+        from utils.session_store import MemoryBackend
+
+        backend = MemoryBackend(max_entries=2)
+        future = time.time() + 60
+        backend.set("a", "1", future)
+        backend.set("b", "2", future)
+        backend.get("a")
+        backend.set("c", "3", future)
+
+        assert backend.get("a") == "1"
+        assert backend.get("b") is None
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        from utils.session_store import MemoryBackend, SQLiteBackend
+
+        for backend in (MemoryBackend(), SQLiteBackend(str(tmp_path / "s.db"))):
+            backend.set("old", "x", time.time() - 1)
+            assert backend.get("old") is None
+            backend.delete("old")
+
+    def test_unknown_backend(self):
+        from utils.session_store import make_session_interface
+
+        assert make_session_interface({"SESSION_BACKEND": "cookie"}) is None
+        with pytest.raises(ValueError):
+            make_session_interface({"SESSION_BACKEND": "redis"})
+
+
+class TestServerSideSessions:
+    """Test the session interface end to end."""
+
+    def test_cookie_only_carries_id(self, server_session_app):
+        client = server_session_app.test_client()
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+            session['selected_appointment'] = {'Appointment_id': 1, 'Services': 'Oil Change,' * 50}
+
+        cookie = client.get_cookie(server_session_app.config['SESSION_COOKIE_NAME'])
+        assert len(cookie.value) < 64
+
+        response = client.get('/appointments/current')
+        assert response.status_code == 200
+        assert json.loads(response.data)['appointment']['Appointment_id'] == 1
+
+    def test_read_only_request_does_not_write(self, server_session_app):
+        client = server_session_app.test_client()
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+
+        backend = server_session_app.session_interface.backend
+        with patch.object(backend, 'set', wraps=backend.set) as write:
+            client.get('/auth/status')
+        write.assert_not_called()
+
+    def test_refreshed_cookie_extends_stored_expiry(self, server_session_app):
+        """The server copy is touched as the cookie is refreshed, so it never expires first."""
+        client = server_session_app.test_client()
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+            session.permanent = True
+        interface = server_session_app.session_interface
+        backend = interface.backend
+        sid = client.get_cookie(server_session_app.config['SESSION_COOKIE_NAME']).value
+        stored = backend.load(sid)[1]
+
+        with patch.object(backend, 'touch', wraps=backend.touch) as touch:
+            client.get('/auth/status')  # within the interval: nothing to do
+            touch.assert_not_called()
+
+            later = time.time() + interface.touch_interval + 1
+            with patch('utils.session_store.time.time', return_value=later):
+                client.get('/auth/status')
+            touch.assert_called_once()
+
+        assert backend.load(sid)[1] > stored
+        assert backend.get(sid) is not None
+
+    def test_clear_rotates_session_id(self, server_session_app):
+        client = server_session_app.test_client()
+        name = server_session_app.config['SESSION_COOKIE_NAME']
+        with client.session_transaction() as session:
+            session['username'] = 'before'
+        old_sid = client.get_cookie(name).value
+
+        with client.session_transaction() as session:
+            session.clear()
+            session['username'] = 'after'
+
+        assert client.get_cookie(name).value != old_sid
+        assert server_session_app.session_interface.backend.get(old_sid) is None
+
+    def test_logout_removes_session(self, server_session_app):
+        client = server_session_app.test_client()
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+
+        client.post('/logout')
+        status = json.loads(client.get('/auth/status').data)
+        assert status['logged_in'] is False
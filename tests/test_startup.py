@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+from benchmarks.bench_startup import environment_key, load_budget
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Needed only by CLI commands or on first use, never by create_app
+DEFERRED = ("multiprocessing", "concurrent.futures.process", "email.mime.text", "utils.admin_import",
+            "utils.mail_templates", "smtplib")
+
+
+def imported_by_create_app():
+    probe = "import json, sys; from app import create_app; create_app(); print(json.dumps(sorted(sys.modules)))"
+    before = subprocess.run([sys.executable, "-c", "import json, sys; print(json.dumps(sorted(sys.modules)))"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    after = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(after.stdout.splitlines()[-1])) - set(json.loads(before.stdout.splitlines()[-1]))
+
+
+class TestStartupBudget:
+    """Cold-start import guard (timing is checked by benchmarks/bench_startup.py)."""
+
+    def test_create_app_defers_heavy_modules(self):
+        modules = imported_by_create_app()
+
+        assert not [name for name in DEFERRED if name in modules]
+
+    def test_import_count_within_budget(self):
+        budget = load_budget()
+        if budget is None:
+            pytest.skip(f"no startup budget recorded for {environment_key()}")
+
+        assert len(imported_by_create_app()) <= budget["max_imports"]
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+import pytest
+
+
+@pytest.fixture
+def pages_app(app, tmp_path):
+    app.config['STATIC_PAGES_DIR'] = str(tmp_path)
+    return app
+
+
+class TestBuildPages:
+    """Test the build step that fingerprints and precompresses pages."""
+
+    def test_writes_variants_and_manifest(self, tmp_path):
+        from utils.static_pages import build_pages
+
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "a.html").write_text("<h1>" + "hello " * 200 + "</h1>")
+        out = tmp_path / "out"
+
+        manifest = build_pages(str(source), str(out), ["a.html"])
+
+        entry = manifest["a.html"]
+        assert entry["file"].startswith("a.") and entry["file"].endswith(".html")
+        assert gzip.decompress((out / entry["variants"]["gzip"]["file"]).read_bytes()) == (source / "a.html").read_bytes()
+        assert entry["variants"]["gzip"]["size"] < entry["variants"]["identity"]["size"]
+        assert json.loads((out / "manifest.json").read_text()) == manifest
+
+    def test_fingerprint_follows_content(self, tmp_path):
+        from utils.static_pages import build_pages
+
+        (tmp_path / "a.html").write_text("one")
+        first = build_pages(str(tmp_path), str(tmp_path / "out"), ["a.html"])["a.html"]["file"]
+        (tmp_path / "a.html").write_text("two")
+        second = build_pages(str(tmp_path), str(tmp_path / "out"), ["a.html"])["a.html"]["file"]
+
+        assert first != second
+
+    def test_write_atomic_leaves_no_temp_files(self, tmp_path):
+        from utils.static_pages import _write_atomic
+
+        _write_atomic(str(tmp_path / "a.txt"), b"one")
+        _write_atomic(str(tmp_path / "a.txt"), b"two")
+
+        assert os.listdir(tmp_path) == ["a.txt"]
+        assert (tmp_path / "a.txt").read_bytes() == b"two"
+
+
+class TestStaticPageRoutes:
+    """Test serving the prebuilt pages."""
+
+    def test_serves_gzip_variant(self, pages_app):
+        client = pages_app.test_client()
+
+        response = client.get('/auto.html', headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert b"<html" in gzip.decompress(response.data).lower()
+
+    def test_identity_when_not_accepted(self, pages_app):
+        with open(os.path.join(pages_app.root_path, "tires.html"), "rb") as fh:
+            expected = fh.read()
+
+        response = pages_app.test_client().get('/tires.html')
+
+        assert response.headers.get("Content-Encoding") is None
+        assert response.data == expected
+
+    def test_revalidation_returns_304(self, pages_app):
+        client = pages_app.test_client()
+        etag = client.get('/store.html').headers["ETag"]
+
+        response = client.get('/store.html', headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_fingerprinted_url_is_immutable(self, pages_app):
+        from routes.template_routes import get_static_pages
+
+        with pages_app.test_request_context():
+            url = get_static_pages().url_for("offers.html")
+
+        response = pages_app.test_client().get(url)
+
+        assert response.status_code == 200
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_careers_alias_and_unknown_page(self, pages_app):
+        client = pages_app.test_client()
+
+        assert client.get('/careers.html').status_code == 200
+        assert client.get('/missing.html').status_code == 404
+        assert client.get('/pages/auto.000000000000.html').status_code == 404
+
+    def test_unbuilt_pages_are_503_outside_debug(self, pages_app, caplog):
+        from routes.template_routes import build_pages_command
+
+        pages_app.debug = False
+        client = pages_app.test_client()
+
+        assert client.get('/auto.html').status_code == 503
+        assert not os.listdir(pages_app.config['STATIC_PAGES_DIR'])
+        assert "build-pages" in caplog.text
+
+        pages_app.test_cli_runner().invoke(build_pages_command)
+        assert client.get('/auto.html').status_code == 200
@@ -0,0 +1,109 @@
+import pytest
+import json
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+
+class TestSummaryHelpers:
+    """Test the booking summary helpers."""
+
+    def test_slot_key_normalizes_times(self):
+        """Both MySQL timedeltas and request strings map to HH:MM."""
+        from utils.stats import slot_key
+
+        assert slot_key(timedelta(hours=9, minutes=5)) == "09:05"
+        assert slot_key("9:30") == "09:30"
+        assert slot_key("14:00:00") == "14:00"
+
+    def test_summary_deltas(self):
+        """A booking touches the total, its slot and each service."""
+        from utils.stats import summary_deltas
+
+        rows = summary_deltas("2025-01-01", "10:00", [1, 3], -1)
+        assert rows == [
+            ("2025-01-01", "total", "", -1),
+            ("2025-01-01", "slot", "10:00", -1),
+            ("2025-01-01", "service", "1", -1),
+            ("2025-01-01", "service", "3", -1),
+        ]
+
+    def test_rebuild_rolls_back_on_error(self):
+        """A failed rebuild leaves the old summary in place."""
+        from utils.stats import rebuild_summary
+
+        conn = Mock()
+        conn.cursor.return_value.execute.side_effect = [None, Exception("boom")]
+        with pytest.raises(Exception):
+            rebuild_summary(conn)
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+
+class TestSummaryMaintenance:
+    """Test that writes update the summary in the same transaction."""
+
+    def test_book_applies_delta(self, client, mock_db_success, sample_appointment_data):
+        """Booking increments the counters before commit."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.side_effect = [None, (1,)]
+        mock_cursor.fetchall.return_value = [(1,), (2,)]
+        data = dict(sample_appointment_data, date=(date.today() + timedelta(days=3)).isoformat())
+
+        response = client.post('/book', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 201
+        params = mock_cursor.executemany.call_args[0][1]
+        assert (data["date"], "total", "", 1) in params
+        assert (data["date"], "service", "2", 1) in params
+        mock_conn.commit.assert_called_once()
+
+    def test_delete_applies_negative_delta(self, auth_client, mock_db_success):
+        """Deleting decrements the counters of the removed booking."""
+        mock_conn, mock_cursor = mock_db_success
+        mock_cursor.fetchone.return_value = (date(2025, 5, 1), timedelta(hours=11), "ABC123", 0)
+        mock_cursor.fetchall.return_value = [(4,)]
+
+        response = auth_client.delete('/appointments/1')
+
+        assert response.status_code == 200
+        params = mock_cursor.executemany.call_args[0][1]
+        assert (date(2025, 5, 1), "slot", "11:00", -1) in params
+        assert (date(2025, 5, 1), "service", "4", -1) in params
+
+
+class TestStatsRoute:
+    """Test the /stats endpoint."""
+
+    def test_requires_login(self, client):
+        response = client.get('/stats')
+        assert response.status_code == 401
+
+    def test_invalid_range(self, auth_client):
+        assert auth_client.get('/stats?date=nope').status_code == 400
+        assert auth_client.get('/stats?days=90').status_code == 400
+
+    def test_groups_summary_rows(self, auth_client):
+        """Summary rows are folded into per-day totals, services and slots."""
+        mock_conn = Mock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            (date(2025, 1, 1), "total", "", 3),
+            (date(2025, 1, 1), "service", "1", 2),
+            (date(2025, 1, 1), "slot", "10:00", 1),
+        ]
+        with patch('routes.stats_routes.get_connection', return_value=mock_conn):
+            response = auth_client.get('/stats?date=2025-01-01&days=2')
+
+        assert response.status_code == 200
+        stats = json.loads(response.data)["stats"]
+        assert stats["2025-01-01"] == {"total": 3, "services": {"1": 2}, "slots": {"10:00": 1}}
+        assert stats["2025-01-02"]["total"] == 0
+
+    def test_rebuild_command(self, app):
+        """The CLI command delegates to rebuild_summary."""
+        with patch('routes.stats_routes.get_connection'), \
+             patch('routes.stats_routes.rebuild_summary', return_value=12) as rebuild:
+            result = app.test_cli_runner().invoke(args=["stats", "rebuild"])
+
+        rebuild.assert_called_once()
+        assert "12 rows" in result.output
@@ -0,0 +1,110 @@
+import pytest
+import json
+import time
+
+
+class TestTokenSigning:
+    """Test issuing and verifying signed tokens."""
+
+    def test_round_trip(self):
+        from utils.tokens import issue_token, verify_token
+
+        token, claims = issue_token(b"k", "dispatch", ["stats:read", "stats:read"], ttl=60)
+
+        assert token.startswith("v1.")
+        assert verify_token(b"k", token) == claims
+        assert claims["scp"] == ["stats:read"]
+
+    @pytest.mark.parametrize("mutate", [
+        lambda t: t[:-2] + ("AA" if not t.endswith("AA") else "BB"),
+        lambda t: "v2" + t[2:],
+        lambda t: "garbage",
+    ])
+    def test_tampered_tokens(self, mutate):
+        from utils.tokens import InvalidToken, issue_token, verify_token
+
+        token, _ = issue_token(b"k", "dispatch", [], ttl=60)
+        with pytest.raises(InvalidToken):
+            verify_token(b"k", mutate(token))
+
+    @pytest.mark.parametrize("token", ["v1.\u00e9.\u00e9", "v1.abc.\u00e9", None])
+    def test_non_ascii_tokens(self, token):
+        from utils.tokens import InvalidToken, verify_token
+
+        with pytest.raises(InvalidToken):
+            verify_token(b"k", token)
+
+    def test_wrong_secret_and_expiry(self):
+        from utils.tokens import InvalidToken, issue_token, verify_token
+
+        token, _ = issue_token(b"k", "dispatch", [], ttl=60, now=1000)
+        with pytest.raises(InvalidToken):
+            verify_token(b"other", token, now=1000)
+        with pytest.raises(InvalidToken):
+            verify_token(b"k", token, now=1061)
+
+    def test_revocation_set_prunes_expired(self):
+        from utils.tokens import RevocationSet
+
+        revoked = RevocationSet()
+        revoked.revoke("old", time.time() - 1)
+        revoked.revoke("new", time.time() + 60)
+
+        assert "new" in revoked
+        assert "old" not in revoked
+
+
+class TestTokenRoutes:
+    """Test bearer tokens on the HTTP API."""
+
+    def _token(self, auth_client, scopes):
+        response = auth_client.post('/auth/token', data=json.dumps({"scopes": scopes, "client": "dispatch"}),
+                                    content_type='application/json')
+        assert response.status_code == 201
+        return json.loads(response.data)["token"]
+
+    def test_issue_requires_login(self, client):
+        assert client.post('/auth/token', data=json.dumps({}), content_type='application/json').status_code == 401
+
+    def test_issue_rejects_unknown_scope(self, auth_client):
+        response = auth_client.post('/auth/token', data=json.dumps({"scopes": ["admin"]}),
+                                    content_type='application/json')
+        assert response.status_code == 400
+
+    def test_issue_rejects_empty_scopes(self, auth_client):
+        response = auth_client.post('/auth/token', data=json.dumps({"scopes": []}),
+                                    content_type='application/json')
+        assert response.status_code == 400
+
+    def test_issue_defaults_to_all_scopes(self, app, auth_client):
+        response = auth_client.post('/auth/token', data=json.dumps({}), content_type='application/json')
+        assert json.loads(response.data)["scopes"] == sorted(app.config["API_TOKEN_SCOPES"])
+
+    def test_bearer_token_authorizes_scope(self, app, auth_client, mock_db_success):
+        token = self._token(auth_client, ["appointments:write"])
+        client = app.test_client()
+
+        response = client.delete('/appointments/1', headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+        response = client.get('/stats', headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+    def test_invalid_bearer_token(self, client):
+        response = client.delete('/appointments/1', headers={"Authorization": "Bearer v1.abc.def"})
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize("token", ["v1.\u00e9.\u00e9", "v1.abc.\u00e9"])
+    def test_non_ascii_bearer_token(self, client, token):
+        response = client.get('/metrics', headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+    def test_revoked_token(self, app, auth_client, mock_db_success):
+        token = self._token(auth_client, ["appointments:write"])
+        response = auth_client.post('/auth/token/revoke', data=json.dumps({"token": token}),
+                                    content_type='application/json')
+        assert response.status_code == 200
+
+        response = app.test_client().delete('/appointments/1', headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+        assert json.loads(response.data)["message"] == "Token revoked"
@@ -0,0 +1,90 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, NamedTuple
+
+from mysql.connector import errorcode
+from werkzeug.security import generate_password_hash
+
+# SHOW WARNINGS lists at most max_error_count (default 1024) entries per statement
+MAX_BATCH_SIZE = 1000
+
+
+class ImportResult(NamedTuple):
+    inserted: int
+    skipped: int
+
+
+class ImportRejected(Exception):
+    """A row failed for another reason than a duplicate account; its batch was rolled back."""
+
+    def __init__(self, message: str, result: ImportResult):
+        super().__init__(message)
+        self.result = result  # batches committed before the failing one
+
+
+def read_admin_csv(path: str) -> Iterator[tuple]:
+    """Yield (username, email, password) rows; rows missing a field are yielded as None."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            username = (row.get("username") or "").strip()
+            email = (row.get("email") or "").strip()
+            password = row.get("password") or ""
+            if not username or not email or len(password) < 6:
+                yield None
+            else:
+                yield username, email, password
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_admins(conn, rows: Iterable, method: str, batch_size: int = 1000, workers: int | None = None) -> ImportResult:
+    """Insert admin accounts in batches, hashing passwords on every core.
+
+    Each batch is hashed with ProcessPoolExecutor.map and written with one
+    multi-row INSERT IGNORE, so existing usernames/emails (caught by the
+    unique indexes) are skipped instead of aborting the import. IGNORE also
+    turns truncation and NOT NULL errors into warnings, so any warning other
+    than a duplicate key rolls the batch back and raises ImportRejected.
+    """
+    hash_one = partial(generate_password_hash, method=method)
+    batch_size = min(batch_size, MAX_BATCH_SIZE)
+    workers = workers or os.cpu_count() or 1
+    inserted = skipped = 0
+    cursor = conn.cursor()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in _batches(rows, batch_size):
+                valid = [row for row in batch if row is not None]
+                skipped += len(batch) - len(valid)
+                if not valid:
+                    continue
+                chunksize = max(1, len(valid) // (workers * 4))
+                hashes = pool.map(hash_one, [row[2] for row in valid], chunksize=chunksize)
+                cursor.executemany(
+                    "INSERT IGNORE INTO admin (Username, Email, Password) VALUES (%s, %s, %s)",
+                    [(row[0], row[1], hashed) for row, hashed in zip(valid, hashes)],
+                )
+                cursor.execute("SHOW WARNINGS")
+                problems = [w for w in cursor.fetchall() if w[1] != errorcode.ER_DUP_ENTRY]
+                if problems:
+                    conn.rollback()
+                    raise ImportRejected(f"{problems[0][2]} (code {problems[0][1]})",
+                                         ImportResult(inserted, skipped))
+                conn.commit()
+                written = min(max(cursor.rowcount, 0), len(valid))
+                inserted += written
+                skipped += len(valid) - written
+    finally:
+        cursor.close()
+    return ImportResult(inserted, skipped)
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from flask import abort
+from jinja2 import FileSystemLoader, TemplateNotFound
+
+from utils.compression import compress
+from utils.static_pages import _write_atomic, send_variant, write_variants
+
+ASSET_MANIFEST = "manifest.json"
+REPORT_NAME = "report.json"
+
+# Inline blocks only: <script src=...> and blocks with Jinja markup stay in the page
+_INLINE_BLOCK = re.compile(r"<(style|script)(\s[^>]*)?>(.*?)</\1>", re.S | re.I)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*")
+# Space before ':' is significant in selectors ("a :hover"), after it is not
+_CSS_COLON = re.compile(r":\s+")
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace; CSS has no whitespace-sensitive tokens outside strings."""
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    css = _CSS_PUNCT.sub(r"\1", css)
+    css = _CSS_COLON.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """Conservative minification: indentation, blank lines and whole-line // comments.
+
+    Statements are never joined (no ASI hazards) and lines inside multi-line
+    template literals are kept verbatim.
+    """
+    out = []
+    in_template = False
+    for line in js.splitlines():
+        if in_template:
+            out.append(line)
+        else:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("//"):
+                continue
+            out.append(stripped)
+        if (line.count("`") - line.count("\\`")) % 2:
+            in_template = not in_template
+    return "\n".join(out)
+
+
+def extract_assets(html: str) -> tuple[str, list[tuple[str, str]]]:
+    """Replace inline <style>/<script> blocks with references to hashed files.
+
+    Returns the rewritten HTML and a list of (filename, minified content).
+    Identical blocks on different pages hash to the same file, so they are
+    downloaded once and shared from the browser cache.
+    """
+    assets = []
+
+    def replace(match):
+        tag, attrs, body = match.group(1).lower(), match.group(2) or "", match.group(3)
+        if "{{" in body or "{%" in body or "src=" in attrs.lower() or not body.strip():
+            return match.group(0)
+        if tag == "script" and "type=" in attrs.lower() and "javascript" not in attrs.lower():
+            return match.group(0)  # JSON/template blocks, not code
+        content = minify_css(body) if tag == "style" else minify_js(body)
+        ext = "css" if tag == "style" else "js"
+        filename = f"{hashlib.sha256(content.encode()).hexdigest()[:12]}.{ext}"
+        assets.append((filename, content))
+        if tag == "style":
+            return f'<link rel="stylesheet" href="/assets/{filename}">'
+        return f'<script src="/assets/{filename}"></script>'
+
+    return _INLINE_BLOCK.sub(replace, html), assets
+
+
+def build_assets(template_dir: str, out_dir: str) -> dict:
+    """Extract and minify inline CSS/JS from every template; returns the size report.
+
+    Writes rewritten templates to ``out_dir/templates`` and precompressed
+    assets to ``out_dir/assets``. Run at build time:
+    flask --app app templates build-assets
+    """
+    template_out = os.path.join(out_dir, "templates")
+    asset_out = os.path.join(out_dir, "assets")
+    os.makedirs(template_out, exist_ok=True)
+    os.makedirs(asset_out, exist_ok=True)
+
+    manifest, report = {}, {}
+    for name in sorted(os.listdir(template_dir)):
+        if not name.endswith(".html") or name.startswith("_"):
+            continue  # partials are rendered inside pages
+        with open(os.path.join(template_dir, name), encoding="utf-8") as fh:
+            source = fh.read()
+        html, assets = extract_assets(source)
+        _write_atomic(os.path.join(template_out, name), html.encode("utf-8"))
+        for filename, content in assets:
+            if filename not in manifest:
+                manifest[filename] = {
+                    "file": filename,
+                    "etag": filename.split(".")[0],
+                    "variants": write_variants(asset_out, filename, content.encode("utf-8")),
+                }
+        report[name] = _page_report(source, html, [manifest[f] for f, _ in assets])
+
+    _write_atomic(os.path.join(asset_out, ASSET_MANIFEST), json.dumps(manifest, indent=2).encode())
+    _write_atomic(os.path.join(out_dir, REPORT_NAME), json.dumps(report, indent=2).encode())
+    return report
+
+
+def _page_report(source: str, html: str, assets: list[dict]) -> dict:
+    def gz(text):
+        return len(compress(text.encode("utf-8"), "gzip"))
+
+    asset_gz = sum(entry["variants"]["gzip"]["size"] for entry in assets)
+    return {
+        "inline_bytes": len(source.encode("utf-8")),
+        "page_bytes": len(html.encode("utf-8")),
+        "asset_bytes": sum(entry["variants"]["identity"]["size"] for entry in assets),
+        # Transfer sizes with gzip: before, every view carried the inline blocks;
+        # now the first view also fetches the assets and repeat views only the page.
+        "before_gzip": gz(source),
+        "first_visit_gzip": gz(html) + asset_gz,
+        "repeat_visit_gzip": gz(html),
+    }
+
+
+class BuiltTemplateLoader(FileSystemLoader):
+    """Template loader that prefers the asset-build output of a template.
+
+    The built copy is used only while it is at least as new as its source,
+    so an edited template falls back to the source (inline CSS/JS) until
+    the next build instead of serving stale markup.
+    """
+
+    def __init__(self, searchpath, build_dir: str):
+        super().__init__(searchpath)
+        self.build_dir = build_dir
+        self._built = FileSystemLoader(build_dir)
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        try:
+            if os.path.getmtime(os.path.join(self.build_dir, template)) >= os.path.getmtime(filename):
+                built_source, built_filename, built_uptodate = self._built.get_source(environment, template)
+                return built_source, built_filename, lambda: built_uptodate() and uptodate()
+        except (OSError, TemplateNotFound):
+            pass
+        return source, filename, uptodate
+
+
+def install_built_templates(app) -> None:
+    """Make ``app`` render asset-build output for templates that have it."""
+    build_dir = os.path.join(app.root_path, app.config.get("ASSET_BUILD_DIR", "build"), "templates")
+    app.jinja_loader = BuiltTemplateLoader(os.path.join(app.root_path, app.template_folder), build_dir)
+
+
+class AssetStore:
+    """Serves built assets: content-hashed, so cached as immutable."""
+
+    def __init__(self, asset_dir: str, max_age: int = 31536000):
+        self.asset_dir = asset_dir
+        self.max_age = max_age
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            with self._lock:
+                path = os.path.join(self.asset_dir, ASSET_MANIFEST)
+                if not os.path.exists(path):
+                    return {}  # not built (yet); pages still carry their inline blocks
+                with open(path, encoding="utf-8") as fh:
+                    self._manifest = json.load(fh)
+        return self._manifest
+
+    def serve(self, filename: str):
+        entry = self.manifest().get(filename)
+        if entry is None:
+            abort(404)
+        mimetype = "text/css" if filename.endswith(".css") else "text/javascript"
+        return send_variant(self.asset_dir, entry, mimetype, self.max_age)
@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over a blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    def expected_error_rate(self) -> float:
+        """False-positive probability for the current number of items."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class AccountFilters:
+    """Username/email Bloom filters over the admin table.
+
+    A miss means "definitely available"; a hit must be confirmed against the
+    database, which (through its unique indexes) stays authoritative and
+    still rejects a duplicate at signup. Each worker refreshes its own
+    filters on a background thread every ``rebuild_interval`` seconds, so an
+    account created by another worker or the bulk import can read as
+    available until the next refresh. Until the first build completes every
+    value is reported as a possible match.
+    """
+
+    def __init__(self, loader, capacity=100000, error_rate=0.01, rebuild_interval=60):
+        self.loader = loader
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._filters = None
+        self._rebuilding = False
+        self._last_rebuild = None
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        # The admin columns use a case-insensitive collation
+        return value.strip().lower()
+
+    def _build(self):
+        # loader() -> (row_count, iterable of (username, email)); rows are streamed
+        row_count, rows = self.loader()
+        capacity = max(self.capacity, 2 * row_count)
+        usernames = BloomFilter(capacity, self.error_rate)
+        emails = BloomFilter(capacity, self.error_rate)
+        for username, email in rows:
+            if username:
+                usernames.add(self.normalize(username))
+            if email:
+                emails.add(self.normalize(email))
+        return {"username": usernames, "email": emails}
+
+    def rebuild(self) -> None:
+        """Build the filters from the admin table on the calling thread."""
+        filters = self._build()
+        with self._lock:
+            self._filters = filters
+
+    def _rebuild_due(self, filters) -> bool:
+        if filters is None or filters["username"].count > filters["username"].capacity:
+            return True
+        return time.monotonic() - self._last_rebuild >= self.rebuild_interval
+
+    def _rebuild_in_background(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._rebuilding or (
+                self._last_rebuild is not None and now - self._last_rebuild < self.rebuild_interval
+            ):
+                return
+            self._rebuilding = True
+            self._last_rebuild = now
+        threading.Thread(target=self._background_rebuild, name="account-filters", daemon=True).start()
+
+    def _background_rebuild(self) -> None:
+        try:
+            self.rebuild()
+        except Exception as err:
+            logger.warning("Account filter rebuild failed: %s", err)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def might_exist(self, field: str, value: str) -> bool:
+        filters = self._filters
+        if self._last_rebuild is None or self._rebuild_due(filters):
+            self._rebuild_in_background()
+        if filters is None:
+            return True  # not built yet: let the database decide
+        return self.normalize(value) in filters[field]
+
+    def add(self, username: str, email: str) -> None:
+        """Record an account this worker created; other workers see it on their next refresh."""
+        with self._lock:
+            if self._filters is not None:
+                self._filters["username"].add(self.normalize(username))
+                self._filters["email"].add(self.normalize(email))
@@ -0,0 +1,63 @@
+import hashlib
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from utils.database import get_connection, _safe_close
+
+_DEFAULT_TTL = 300
+
+_lock = threading.Lock()
+_services: dict[int, str] | None = None
+_version = ""
+_loaded_at = 0.0
+
+
+def _ttl() -> float:
+    if has_app_context():
+        return current_app.config.get("SERVICE_CATALOG_TTL", _DEFAULT_TTL)
+    return _DEFAULT_TTL
+
+
+def _load_services() -> dict[int, str]:
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT Service_ID, Service_Type FROM service ORDER BY Service_ID")
+        return {row[0]: row[1] for row in cursor.fetchall()}
+    finally:
+        _safe_close(cursor, conn)
+
+
+def _fingerprint(services: dict[int, str]) -> str:
+    return hashlib.sha256(repr(sorted(services.items())).encode()).hexdigest()[:12]
+
+
+def get_service_catalog() -> dict[int, str]:
+    """Return {Service_ID: Service_Type}, re-reading the service table at most once per TTL."""
+    global _services, _version, _loaded_at
+    services = _services
+    if services is not None and time.monotonic() - _loaded_at < _ttl():
+        return services
+    with _lock:
+        if _services is None or time.monotonic() - _loaded_at >= _ttl():
+            _services = _load_services()
+            _version = _fingerprint(_services)
+            _loaded_at = time.monotonic()
+        return _services
+
+
+def get_catalog_version() -> str:
+    """Content hash of the current catalog; changes only when the service table does."""
+    get_service_catalog()
+    return _version
+
+
+def invalidate_service_catalog() -> None:
+    """Force the next get_service_catalog() call to reload."""
+    global _services
+    with _lock:
+        _services = None
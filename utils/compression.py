@@ -0,0 +1,254 @@
+import gzip
+import threading
+import time
+import zlib
+
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip is always available
+    brotli = None
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Best ratio: only used for content compressed once and served many times
+_MAX_LEVEL = {"br": 11, "gzip": 9}
+
+
+def compress(data: bytes, encoding: str, level: int | None = None) -> bytes:
+    """Compress ``data``; gzip output is deterministic (mtime 0) so ETags stay stable."""
+    if level is None:
+        level = _MAX_LEVEL[encoding]
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate(accept_encodings, available) -> str | None:
+    """Best encoding in ``available`` that the client accepts (werkzeug MIMEAccept-like), or None."""
+    for encoding in ENCODINGS:
+        if encoding in available and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+# Formats that are already compressed (images, archives, fonts) fall outside this list
+COMPRESSIBLE_TYPES = frozenset({
+    "application/javascript", "application/json", "application/xml",
+    "image/svg+xml", "text/calendar", "text/css", "text/csv", "text/html",
+    "text/javascript", "text/plain", "text/xml",
+})
+
+# Responses with a Content-Length up to this size are compressed in one piece
+# and keep an exact Content-Length; larger or streamed bodies are compressed
+# chunk by chunk as the application yields them.
+BUFFER_LIMIT = 1024 * 1024
+
+
+class _StreamCompressor:
+    """Incremental compressor with the same output format as ``compress``."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=level)
+            self._compress, self._finish = self._obj.process, self._obj.finish
+        elif encoding == "gzip":
+            # wbits 31: gzip container; zlib writes mtime 0 like compress()
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._compress, self._finish = self._obj.compress, self._obj.flush
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionStats:
+    """Bytes in/out and CPU time per encoding, plus why responses were skipped.
+
+    CPU is thread time spent inside the compressor, so it is the cost this
+    worker paid for the bytes saved; compare ``cpu_us_per_kib_saved`` across
+    levels when tuning COMPRESSION_LEVEL / COMPRESSION_BR_QUALITY.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings = {}
+        self._skipped = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu: float) -> None:
+        with self._lock:
+            counters = self._encodings.get(encoding)
+            if counters is None:
+                counters = self._encodings[encoding] = [0, 0, 0, 0.0]
+            counters[0] += 1
+            counters[1] += bytes_in
+            counters[2] += bytes_out
+            counters[3] += cpu
+
+    def skip(self, reason: str) -> None:
+        with self._lock:
+            self._skipped[reason] = self._skipped.get(reason, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            encodings = {name: list(counters) for name, counters in self._encodings.items()}
+            skipped = dict(self._skipped)
+        report = {}
+        for name, (responses, bytes_in, bytes_out, cpu) in encodings.items():
+            saved = bytes_in - bytes_out
+            report[name] = {
+                "responses": responses,
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "bytes_saved": saved,
+                "ratio": round(bytes_out / bytes_in, 4) if bytes_in else None,
+                "cpu_ms": round(cpu * 1000, 3),
+                "cpu_us_per_kib_saved": round(cpu * 1e6 / (saved / 1024), 2) if saved > 0 else None,
+            }
+        return {"encodings": report, "skipped": skipped}
+
+
+class CompressionMiddleware:
+    """WSGI middleware compressing dynamic responses (gzip, or br when available).
+
+    Skipped: clients that accept neither encoding, HEAD and range requests,
+    bodiless statuses, bodies known to be under ``min_size``, non-text types
+    and responses that already carry a Content-Encoding (the precompressed
+    static pages, page cache and assets). Strong ETags are weakened, since
+    the compressed bytes differ from what the application tagged; weak
+    comparison keeps If-None-Match revalidation working.
+    """
+
+    def __init__(self, app, min_size: int = 500, level: int = 6, br_quality: int = 4,
+                 types=COMPRESSIBLE_TYPES, stats: CompressionStats | None = None):
+        self.app = app
+        self.min_size = min_size
+        self.levels = {"gzip": level, "br": br_quality}
+        self.types = types
+        self.stats = stats if stats is not None else CompressionStats()
+
+    def __call__(self, environ, start_response):
+        accept = environ.get("HTTP_ACCEPT_ENCODING")
+        if not accept:
+            return self.app(environ, start_response)
+        if environ.get("REQUEST_METHOD") == "HEAD" or "HTTP_RANGE" in environ:
+            self.stats.skip("method")
+            return self.app(environ, start_response)
+        encoding = negotiate(parse_accept_header(accept), ENCODINGS)
+        if encoding is None:
+            self.stats.skip("not_accepted")
+            return self.app(environ, start_response)
+
+        state = {}
+
+        def _start_response(status, headers, exc_info=None):
+            reason, length = self._check(status, headers)
+            if reason is not None:
+                if reason != "status":
+                    self.stats.skip(reason)
+                return start_response(status, headers, exc_info)
+            headers = self._rewrite_headers(headers, encoding)
+            if length is not None and length <= BUFFER_LIMIT:
+                # Deferred until the compressed length is known
+                state["buffered"] = (status, headers, exc_info)
+                return _no_write
+            state["streamed"] = True
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, _start_response)
+        if "buffered" in state:
+            status, headers, exc_info = state["buffered"]
+            try:
+                body = b"".join(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+            started = time.thread_time()
+            data = compress(body, encoding, self.levels[encoding])
+            self.stats.record(encoding, len(body), len(data), time.thread_time() - started)
+            headers.append(("Content-Length", str(len(data))))
+            start_response(status, headers, exc_info)
+            return [data]
+        if "streamed" in state:
+            return ClosingIterator(self._stream(app_iter, encoding), getattr(app_iter, "close", None))
+        return app_iter
+
+    def _check(self, status: str, headers) -> tuple[str | None, int | None]:
+        """Reason to leave the response alone (None to compress) and its Content-Length."""
+        code = int(status[:3])
+        if code < 200 or code in (204, 304):
+            return "status", None
+        content_type = length = None
+        for name, value in headers:
+            name = name.lower()
+            if name == "content-encoding":
+                return "encoded", None
+            if name == "content-type":
+                content_type = value.split(";", 1)[0].strip().lower()
+            elif name == "content-length":
+                length = int(value)
+            elif name == "cache-control" and "no-transform" in value.lower():
+                return "no_transform", None
+        if content_type not in self.types:
+            return "type", None
+        if length is not None and length < self.min_size:
+            return "small", None
+        return None, length
+
+    @staticmethod
+    def _rewrite_headers(headers, encoding: str) -> list:
+        rewritten = []
+        vary = None
+        for name, value in headers:
+            lower = name.lower()
+            if lower in ("content-length", "accept-ranges"):
+                continue
+            if lower == "etag" and not value.startswith("W/"):
+                value = "W/" + value
+            elif lower == "vary":
+                vary = value
+                continue
+            rewritten.append((name, value))
+        if vary is None:
+            vary = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+            vary = f"{vary}, Accept-Encoding"
+        rewritten.append(("Vary", vary))
+        rewritten.append(("Content-Encoding", encoding))
+        return rewritten
+
+    def _stream(self, app_iter, encoding: str):
+        compressor = _StreamCompressor(encoding, self.levels[encoding])
+        bytes_in = bytes_out = 0
+        cpu = 0.0
+        try:
+            for chunk in app_iter:
+                if not chunk:
+                    continue
+                started = time.thread_time()
+                data = compressor.compress(chunk)
+                cpu += time.thread_time() - started
+                bytes_in += len(chunk)
+                if data:
+                    bytes_out += len(data)
+                    yield data
+            started = time.thread_time()
+            data = compressor.finish()
+            cpu += time.thread_time() - started
+            bytes_out += len(data)
+            yield data
+        finally:
+            self.stats.record(encoding, bytes_in, bytes_out, cpu)
+
+
+def _no_write(data):
+    raise RuntimeError("write() is not supported for responses compressed by CompressionMiddleware")
@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+CRLF = "\r\n"
+
+CALENDAR_HEADER = CRLF.join([
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//ISD2//Appointment Schedule//EN",
+    "CALSCALE:GREGORIAN",
+    "X-WR-CALNAME:Shop schedule",
+]) + CRLF
+CALENDAR_FOOTER = "END:VCALENDAR" + CRLF
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line to 75 octets, continuation lines start with a space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + CRLF
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # do not split a multi-byte UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return (CRLF + " ").join(parts) + CRLF
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def render_vevent(
+    appointment_id: int,
+    day: date,
+    start: timedelta,
+    car_plate: str,
+    notes: str | None,
+    services: Iterable[str],
+    stamp: datetime,
+    duration: timedelta,
+) -> str:
+    """Render one appointment as a VEVENT block (floating local start time)."""
+    starts_at = datetime.combine(day, datetime.min.time()) + start
+    services = list(services)
+    summary = f"{car_plate}: {', '.join(services)}" if services else car_plate
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:appointment-{appointment_id}@isd2",
+        f"DTSTAMP:{format_datetime(stamp)}Z",
+        f"DTSTART:{format_datetime(starts_at)}",
+        f"DTEND:{format_datetime(starts_at + duration)}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if notes:
+        lines.append(f"DESCRIPTION:{escape_text(notes)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
@@ -0,0 +1,106 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+from mysql.connector import FieldType
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# MySQL column types that come back from the driver as date/datetime/timedelta
+_TEMPORAL_TYPES = {
+    FieldType.DATE: "date",
+    FieldType.NEWDATE: "date",
+    FieldType.DATETIME: "datetime",
+    FieldType.TIMESTAMP: "datetime",
+    FieldType.TIME: "time",
+}
+
+
+def _encode_temporal(val: Any) -> Any:
+    # date must be checked after datetime, which is a subclass of it
+    if isinstance(val, datetime):
+        return str(val)
+    if isinstance(val, date):
+        return val.isoformat()
+    if isinstance(val, timedelta):
+        return str(val)
+    return val
+
+
+def compile_row_encoder(description: Sequence | None) -> Callable[[Any], dict]:
+    """Build a row -> JSON-ready dict converter from cursor.description.
+
+    The column types are inspected once per query, so encoding a row only
+    touches the DATE/TIME/DATETIME columns instead of isinstance-checking
+    every field.  Accepts both tuple rows and dictionary-cursor rows.
+    """
+    if not description:
+        return lambda row: dict(row) if row is not None else None
+
+    names = tuple(col[0] for col in description)
+    temporal = tuple(name for name, col in zip(names, description) if col[1] in _TEMPORAL_TYPES)
+
+    def encode(row):
+        if row is None:
+            return None
+        out = dict(row) if isinstance(row, dict) else dict(zip(names, row))
+        for name in temporal:
+            val = out[name]
+            if val is not None:
+                out[name] = _encode_temporal(val)
+        return out
+
+    return encode
+
+
+def encode_rows(cursor, rows) -> list[dict]:
+    """Encode every row of a result set with a single compiled encoder."""
+    if not rows:
+        return []
+    encode = compile_row_encoder(cursor.description)
+    return [encode(row) for row in rows]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson when installed, stdlib json otherwise.
+
+    Output matches DefaultJSONProvider: dates are still routed through
+    ``default`` and keys are sorted when ``sort_keys`` is set.
+    """
+
+    def _orjson_options(self, indent: bool) -> int:
+        opts = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        if indent:
+            opts |= orjson.OPT_INDENT_2
+        return opts
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except TypeError:
+                # e.g. integers wider than 64 bits; let the stdlib handle it
+                pass
+        kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+        return super().dumps(obj, **kwargs).encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = bool(self.compact is False or (self.compact is None and self._app.debug))
+        body = self.dumps_bytes(obj, indent=indent)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,123 @@
+import hashlib
+import os
+from email.header import Header
+from email.mime.text import MIMEText
+from functools import lru_cache
+from typing import Iterable, Iterator
+from urllib.parse import urlencode, urlsplit
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email")
+
+
+@lru_cache(maxsize=None)
+def get_environment(template_dir: str = EMAIL_TEMPLATE_DIR) -> Environment:
+    """One Jinja environment per process; templates are compiled on first use and kept.
+
+    ``auto_reload`` is off so cached templates are never re-stat'ed while a
+    batch is rendering.
+    """
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+class ReminderRenderer:
+    """Renders oil change reminders from the precompiled template.
+
+    Everything that is the same for every message (encoded subject, sender,
+    signature, booking page URL) is computed once here; per message only
+    the row fields are rendered. Messages are built as compat32 MIMEText,
+    which is several times cheaper to construct and serialize than
+    EmailMessage with the default policy.
+    """
+
+    TEMPLATE = "oil_change_reminder.html"
+    SUBJECT = "⏰ Oil Change Reminder"
+
+    def __init__(self, base_url: str, sender: str, signature: str = "Your Service Team",
+                 environment: Environment | None = None):
+        environment = environment or get_environment()
+        self.template = environment.get_template(self.TEMPLATE)
+        self.sender = sender
+        self.subject = Header(self.SUBJECT, "utf-8").encode()
+        self.booking_url = base_url.rstrip("/") + "/appointment.html"
+        self.static = {"signature": signature}
+
+    def booking_link(self, plate_number: str) -> str:
+        return f"{self.booking_url}?{urlencode({'plate': plate_number})}"
+
+    def render_body(self, row: dict) -> str:
+        return self.template.render(
+            self.static,
+            owner_name=row["owner_name"],
+            model=row["model"],
+            plate_number=row["plate_number"],
+            due_date=row["next_oil_change_due"],
+            booking_link=self.booking_link(row["plate_number"]),
+        )
+
+    def render(self, row: dict) -> MIMEText:
+        message = MIMEText(self.render_body(row), "html", "utf-8")
+        message["Subject"] = self.subject
+        message["From"] = self.sender
+        message["To"] = row["owner_email"]
+        return message
+
+    def render_batch(self, rows: Iterable[dict]) -> Iterator[tuple[dict, MIMEText]]:
+        """Lazily yield (row, message) for each row."""
+        render = self.render
+        for row in rows:
+            yield row, render(row)
+
+
+class AppointmentNoticeRenderer:
+    """Renders booking/update/cancellation notices for outbox events.
+
+    The Message-ID is derived from the event's dedup key, so a notice
+    delivered twice (the outbox is at-least-once) carries the same ID and
+    can be recognized as a duplicate downstream.
+    """
+
+    TEMPLATE = "appointment_notice.html"
+    SUBJECTS = {
+        "appointment.booked": "Appointment confirmed",
+        "appointment.updated": "Appointment changed",
+        "appointment.deleted": "Appointment cancelled",
+    }
+
+    def __init__(self, base_url: str, sender: str, service_names: dict | None = None,
+                 signature: str = "Your Service Team", environment: Environment | None = None):
+        environment = environment or get_environment()
+        self.template = environment.get_template(self.TEMPLATE)
+        self.sender = sender
+        self.service_names = service_names or {}
+        self.base_url = base_url.rstrip("/")
+        self.domain = urlsplit(self.base_url).hostname or "localhost"
+        self.subjects = {topic: Header(subject, "utf-8").encode() for topic, subject in self.SUBJECTS.items()}
+        self.static = {"signature": signature}
+
+    def message_id(self, dedup_key: str) -> str:
+        return f"<{hashlib.sha256(dedup_key.encode()).hexdigest()[:32]}@{self.domain}>"
+
+    def render(self, topic: str, dedup_key: str, payload: dict) -> MIMEText:
+        body = self.template.render(
+            self.static,
+            topic=topic,
+            appointment_id=payload.get("appointment_id"),
+            car_plate=payload.get("car_plate"),
+            date=payload.get("date"),
+            time=payload.get("time"),
+            services=[self.service_names.get(sid, f"Service {sid}") for sid in payload.get("service_ids") or []],
+            view_link=f"{self.base_url}/viewAppointment/search",
+        )
+        message = MIMEText(body, "html", "utf-8")
+        message["Subject"] = self.subjects[topic]
+        message["From"] = self.sender
+        message["To"] = payload["email"]
+        message["Message-ID"] = self.message_id(dedup_key)
+        return message
@@ -0,0 +1,364 @@
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from flask import current_app, request
+
+from utils.static_pages import _write_atomic
+
+# Log-linear buckets: values below 2 * 2**SUB_BITS microseconds are exact, above
+# that every power of two is split into 2**SUB_BITS linear sub-buckets, so a
+# value is never more than 1/16 (6.25%) below its bucket's upper bound.
+SUB_BITS = 4
+_SUB = 1 << SUB_BITS
+_EXACT = 2 * _SUB
+MAX_US = (1 << 27) - 1  # ~134 s; anything slower lands in the top bucket
+
+# Exported Prometheus buckets (seconds): the client-library defaults plus sub-5 ms ones
+LE_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def bucket_index(us: int) -> int:
+    if us < _EXACT:
+        return us
+    shift = us.bit_length() - SUB_BITS - 1
+    return ((shift + 1) << SUB_BITS) + (us >> shift) - _SUB
+
+
+def bucket_upper(index: int) -> int:
+    """Largest value (us) counted in bucket ``index``."""
+    if index < _EXACT:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return ((index - ((shift + 1) << SUB_BITS) + _SUB + 1) << shift) - 1
+
+
+BUCKETS = bucket_index(MAX_US) + 1
+# The decimal LE_BOUNDS do not fall on the binary bucket edges (500 us sits
+# inside 480-511), so exported buckets are counted separately and exactly
+_LE_US = tuple(round(le * 1e6) for le in LE_BOUNDS)
+
+
+class LatencyHistogram:
+    """Fixed-memory (BUCKETS counters) HDR-style histogram of microsecond durations.
+
+    Quantiles come from the HDR buckets; the Prometheus ``le`` buckets have
+    their own counters (``le``, one per LE_BOUNDS plus +Inf) so they are exact.
+    """
+
+    __slots__ = ("counts", "le", "count", "sum_us")
+
+    def __init__(self):
+        self.counts = array("Q", [0]) * BUCKETS
+        self.le = array("Q", [0]) * (len(LE_BOUNDS) + 1)
+        self.count = 0
+        self.sum_us = 0
+
+    def record(self, us: int) -> None:
+        self.counts[bucket_index(min(max(us, 0), MAX_US))] += 1
+        self.le[bisect_left(_LE_US, us)] += 1
+        self.count += 1
+        self.sum_us += us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        counts = self.counts
+        for index, n in enumerate(other.counts):
+            if n:
+                counts[index] += n
+        le = self.le
+        for index, n in enumerate(other.le):
+            le[index] += n
+        self.count += other.count
+        self.sum_us += other.sum_us
+
+    def quantile(self, q: float) -> int:
+        """Upper bound (us) of the bucket holding the q-th quantile; 0 when empty."""
+        if not self.count:
+            return 0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return bucket_upper(index)
+        return MAX_US
+
+    def le_counts(self) -> list[int]:
+        """Cumulative counts for LE_BOUNDS followed by +Inf."""
+        slots = list(self.le)
+        for i in range(1, len(slots)):
+            slots[i] += slots[i - 1]
+        return slots
+
+    def to_dict(self) -> dict:
+        return {"c": {i: n for i, n in enumerate(self.counts) if n}, "le": list(self.le), "n": self.count,
+                "s": self.sum_us}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        hist = cls()
+        for index, n in data["c"].items():
+            hist.counts[int(index)] = n
+        hist.le = array("Q", data["le"])
+        hist.count = data["n"]
+        hist.sum_us = data["s"]
+        return hist
+
+
+class RequestMetrics:
+    """Latency histograms, status counts and in-flight gauges for one process.
+
+    Each request costs two short critical sections. With ``directory`` set,
+    the process writes a snapshot there every ``flush_interval`` seconds and
+    the /metrics output merges the snapshots of every worker, so a scrape
+    landing on any prefork worker sees the whole server. Snapshots of
+    workers that have exited are folded into the scraping worker's own
+    totals, keeping counters monotonic and the directory small.
+    """
+
+    def __init__(self, directory: str = "", flush_interval: float = 5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._routes = {}  # (blueprint, route) -> LatencyHistogram
+        self._requests = {}  # (blueprint, route, method, status) -> count
+        self._in_flight = {}  # blueprint -> requests in progress
+        self._flushed_at = time.monotonic()
+
+    def start(self, blueprint: str) -> None:
+        with self._lock:
+            self._in_flight[blueprint] = self._in_flight.get(blueprint, 0) + 1
+
+    def finish(self, blueprint: str, route: str, method: str, status: int, us: int) -> None:
+        key = (blueprint, route)
+        with self._lock:
+            self._in_flight[blueprint] -= 1
+            hist = self._routes.get(key)
+            if hist is None:
+                hist = self._routes[key] = LatencyHistogram()
+            hist.record(us)
+            key = (blueprint, route, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+        if self.directory and time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush(blocking=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "routes": [[bp, route, hist.to_dict()] for (bp, route), hist in self._routes.items()],
+                "requests": [[*key, n] for key, n in self._requests.items()],
+                "in_flight": dict(self._in_flight),
+            }
+
+    def flush(self, blocking: bool = True) -> None:
+        # One writer per process: the snapshot file (and its .tmp) is per pid
+        if not self._flush_lock.acquire(blocking):
+            return
+        try:
+            self._flushed_at = time.monotonic()
+            path = os.path.join(self.directory, f"{os.getpid()}.json")
+            _write_atomic(path, json.dumps(self.snapshot(), separators=(",", ":")).encode())
+        finally:
+            self._flush_lock.release()
+
+    def _absorb(self, snapshot: dict) -> None:
+        """Add an exited worker's totals to ours (its in-flight requests are gone)."""
+        with self._lock:
+            for bp, route, data in snapshot["routes"]:
+                hist = self._routes.get((bp, route))
+                if hist is None:
+                    hist = self._routes[(bp, route)] = LatencyHistogram()
+                hist.merge(LatencyHistogram.from_dict(data))
+            for *key, n in snapshot["requests"]:
+                key = tuple(key)
+                self._requests[key] = self._requests.get(key, 0) + n
+
+    def collect(self) -> dict:
+        """Snapshots of every worker (this one live), merged."""
+        snapshots = []
+        if self.directory:
+            own = f"{os.getpid()}.json"
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json") or not name[:-5].isdigit() or name == own:
+                    continue
+                path = os.path.join(self.directory, name)
+                if _pid_alive(int(name[:-5])):
+                    snapshot = _read_snapshot(path)
+                    if snapshot is not None:
+                        snapshots.append(snapshot)
+                    continue
+                claimed = f"{path}.{os.getpid()}"
+                try:
+                    os.rename(path, claimed)  # only one worker absorbs a given file
+                except OSError:
+                    continue
+                snapshot = _read_snapshot(claimed)
+                if snapshot is not None:
+                    self._absorb(snapshot)
+                os.unlink(claimed)
+            self.flush()  # the absorbed totals must outlive this worker too
+        snapshots.append(self.snapshot())
+        return merge_snapshots(snapshots)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshot(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Combine worker snapshots into histograms, counters and gauges keyed by labels."""
+    routes, requests, in_flight = {}, {}, {}
+    for snapshot in snapshots:
+        for bp, route, data in snapshot["routes"]:
+            hist = routes.get((bp, route))
+            if hist is None:
+                hist = routes[(bp, route)] = LatencyHistogram()
+            hist.merge(LatencyHistogram.from_dict(data))
+        for *key, n in snapshot["requests"]:
+            key = tuple(key)
+            requests[key] = requests.get(key, 0) + n
+        for bp, n in snapshot["in_flight"].items():
+            in_flight[bp] = in_flight.get(bp, 0) + n
+    return {"routes": routes, "requests": requests, "in_flight": in_flight}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(name: str, series: dict, label_names: tuple) -> list[str]:
+    lines = []
+    les = [repr(le) for le in LE_BOUNDS] + ["+Inf"]
+    for key, hist in sorted(series.items()):
+        labels = _labels(**dict(zip(label_names, key)))
+        for le, n in zip(les, hist.le_counts()):
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+        lines.append(f"{name}_sum{{{labels}}} {hist.sum_us / 1e6}")
+        lines.append(f"{name}_count{{{labels}}} {hist.count}")
+    return lines
+
+
+def _quantile_lines(name: str, series: dict, label_names: tuple) -> list[str]:
+    lines = []
+    for key, hist in sorted(series.items()):
+        labels = _labels(**dict(zip(label_names, key)))
+        for q in QUANTILES:
+            lines.append(f'{name}{{{labels},quantile="{q}"}} {hist.quantile(q) / 1e6}')
+    return lines
+
+
+def render_prometheus(merged: dict) -> str:
+    """Prometheus text exposition format (0.0.4) of merged metrics."""
+    routes = merged["routes"]
+    blueprints = {}
+    for (bp, _), hist in routes.items():
+        total = blueprints.get((bp,))
+        if total is None:
+            total = blueprints[(bp,)] = LatencyHistogram()
+        total.merge(hist)
+
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+        *_histogram_lines("http_request_duration_seconds", routes, ("blueprint", "route")),
+        "# HELP http_request_duration_quantile_seconds Latency quantiles by route (HDR buckets, <=6.25% high).",
+        "# TYPE http_request_duration_quantile_seconds gauge",
+        *_quantile_lines("http_request_duration_quantile_seconds", routes, ("blueprint", "route")),
+        "# HELP http_blueprint_request_duration_seconds Request latency by blueprint.",
+        "# TYPE http_blueprint_request_duration_seconds histogram",
+        *_histogram_lines("http_blueprint_request_duration_seconds", blueprints, ("blueprint",)),
+        "# HELP http_blueprint_request_duration_quantile_seconds Latency quantiles by blueprint.",
+        "# TYPE http_blueprint_request_duration_quantile_seconds gauge",
+        *_quantile_lines("http_blueprint_request_duration_quantile_seconds", blueprints, ("blueprint",)),
+        "# HELP http_requests_total Requests by route, method and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (bp, route, method, status), n in sorted(merged["requests"].items()):
+        lines.append(f"http_requests_total{{{_labels(blueprint=bp, route=route, method=method, status=status)}}} {n}")
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being handled, by blueprint.",
+        "# TYPE http_requests_in_flight gauge",
+    ]
+    for bp, n in sorted(merged["in_flight"].items()):
+        lines.append(f"http_requests_in_flight{{{_labels(blueprint=bp)}}} {n}")
+    return "\n".join(lines) + "\n"
+
+
+UNROUTED = ("", "unmatched")
+
+
+class MetricsMiddleware:
+    """Times each request at the WSGI layer, up to the start of the response.
+
+    Timing here instead of in Flask hooks avoids two more hooks and their
+    context-local lookups per request; only the route labels come from a
+    before_request hook, which passes them on in the WSGI environ. The body
+    iterable is returned untouched so file wrappers keep their sendfile
+    path; for streamed responses (the iCalendar feed) the time to the
+    first byte is what gets recorded.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        status = ["500"]
+
+        def _start_response(status_line, headers, exc_info=None):
+            status[0] = status_line
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            return self.app(environ, _start_response)
+        finally:
+            labels = environ.get("metrics.labels")
+            if labels is not None:  # None: failed before the app's hooks ran
+                self.metrics.finish(labels[0], labels[1], environ["REQUEST_METHOD"], int(status[0][:3]),
+                                    int((time.perf_counter() - started) * 1e6))
+
+
+def install_metrics(app) -> RequestMetrics:
+    """Time every request of ``app``; call before registering blueprints so
+    requests rejected by their before-request handlers are counted too."""
+    metrics = RequestMetrics(app.config.get("METRICS_DIR", ""), app.config.get("METRICS_FLUSH_INTERVAL", 5.0))
+    app.extensions["request_metrics"] = metrics
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+
+    @app.before_request
+    def _label_request():
+        req = request._get_current_object()
+        # Endpoint names, never paths: label cardinality stays bounded by the URL map
+        labels = (req.blueprint or "", req.endpoint) if req.endpoint else UNROUTED
+        req.environ["metrics.labels"] = labels
+        metrics.start(labels[0])
+
+    return metrics
+
+
+def get_request_metrics() -> RequestMetrics | None:
+    return current_app.extensions.get("request_metrics")
@@ -0,0 +1,230 @@
+import json
+import time
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+
+OUTBOX_TABLE = "outbox"
+
+
+class OutboxEvent(NamedTuple):
+    id: int
+    topic: str
+    dedup_key: str
+    payload: dict
+    attempts: int
+
+
+class DispatchStats(NamedTuple):
+    sent: int
+    retried: int
+    dead: int
+
+
+def enqueue(cursor, topic: str, payload: dict, dedup_key: str) -> None:
+    """Record an event on the caller's cursor, inside the caller's transaction.
+
+    The event becomes visible to the dispatcher only if that transaction
+    commits. A second enqueue with the same ``dedup_key`` is ignored.
+    """
+    cursor.execute(
+        f"INSERT IGNORE INTO {OUTBOX_TABLE} (Topic, Dedup_key, Payload) VALUES (%s, %s, %s)",
+        (topic, dedup_key, json.dumps(payload, default=str)),
+    )
+
+
+def claim_batch(conn, limit: int, lease_seconds: int) -> list[OutboxEvent]:
+    """Take up to ``limit`` due events and lease them for ``lease_seconds``.
+
+    SKIP LOCKED lets several dispatchers drain the table without blocking
+    each other. Leasing (moving Available_at forward) instead of deleting
+    is what makes delivery at-least-once: if this dispatcher dies before
+    acknowledging, the events become due again when the lease runs out.
+    """
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(
+            f"""
+            SELECT Outbox_id, Topic, Dedup_key, Payload, Attempts
+            FROM {OUTBOX_TABLE}
+            WHERE Status = 'pending' AND Available_at <= CURRENT_TIMESTAMP
+            ORDER BY Outbox_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            (limit,),
+        )
+        rows = cursor.fetchall()
+        if rows:
+            placeholders = ", ".join(["%s"] * len(rows))
+            cursor.execute(
+                f"""
+                UPDATE {OUTBOX_TABLE}
+                SET Attempts = Attempts + 1, Available_at = CURRENT_TIMESTAMP + INTERVAL %s SECOND
+                WHERE Outbox_id IN ({placeholders})
+                """,
+                (lease_seconds, *[row[0] for row in rows]),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return [
+        OutboxEvent(row[0], row[1], row[2], json.loads(row[3]) if isinstance(row[3], (str, bytes)) else row[3], row[4] + 1)
+        for row in rows
+    ]
+
+
+def mark_sent(cursor, ids: list[int]) -> None:
+    if ids:
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"UPDATE {OUTBOX_TABLE} SET Status = 'sent', Sent_at = CURRENT_TIMESTAMP, Last_error = NULL "
+            f"WHERE Outbox_id IN ({placeholders})",
+            tuple(ids),
+        )
+
+
+def mark_failed(cursor, event: OutboxEvent, error: Exception, retry_in: int | None) -> None:
+    """Schedule a retry in ``retry_in`` seconds, or park the event as dead when None."""
+    message = str(error)[:255]
+    if retry_in is None:
+        cursor.execute(
+            f"UPDATE {OUTBOX_TABLE} SET Status = 'dead', Last_error = %s WHERE Outbox_id = %s",
+            (message, event.id),
+        )
+    else:
+        cursor.execute(
+            f"UPDATE {OUTBOX_TABLE} SET Available_at = CURRENT_TIMESTAMP + INTERVAL %s SECOND, Last_error = %s "
+            f"WHERE Outbox_id = %s",
+            (retry_in, message, event.id),
+        )
+
+
+def purge_sent(cursor, retention_days: int) -> int:
+    cursor.execute(
+        f"DELETE FROM {OUTBOX_TABLE} WHERE Status = 'sent' AND Sent_at < CURRENT_TIMESTAMP - INTERVAL %s DAY",
+        (retention_days,),
+    )
+    return cursor.rowcount
+
+
+# A consumer takes a batch of events for its topic and yields (event, error) as
+# each one is handled; error is None on success.
+Consumer = Callable[[Iterable[OutboxEvent]], Iterator[tuple[OutboxEvent, Any]]]
+
+
+class OutboxDispatcher:
+    """Drains the outbox in batches and hands events to per-topic consumers.
+
+    Runs outside the request cycle, so request latency never depends on how
+    fast a consumer (e.g. the mail server) is. Events without a consumer
+    are acknowledged; failed events are retried with exponential backoff
+    and parked as 'dead' after ``max_attempts``.
+    """
+
+    def __init__(self, connect: Callable, consumers: dict[str, Consumer], batch_size: int = 100,
+                 lease_seconds: int = 300, max_attempts: int = 8, backoff: int = 30, max_backoff: int = 3600):
+        self.connect = connect
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_delay(self, attempts: int) -> int | None:
+        if attempts >= self.max_attempts:
+            return None
+        return min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+
+    def run_once(self, conn) -> DispatchStats:
+        """Claim, deliver and acknowledge one batch."""
+        events = claim_batch(conn, self.batch_size, self.lease_seconds)
+        if not events:
+            return DispatchStats(0, 0, 0)
+
+        by_topic = {}
+        for event in events:
+            by_topic.setdefault(event.topic, []).append(event)
+
+        delivered, failures = [], []
+        for topic, batch in by_topic.items():
+            consumer = self.consumers.get(topic)
+            if consumer is None:
+                delivered.extend(event.id for event in batch)
+                continue
+            for event, error in consumer(batch):
+                if error is None:
+                    delivered.append(event.id)
+                else:
+                    failures.append((event, error))
+
+        retried = dead = 0
+        cursor = conn.cursor()
+        try:
+            mark_sent(cursor, delivered)
+            for event, error in failures:
+                delay = self.retry_delay(event.attempts)
+                mark_failed(cursor, event, error, delay)
+                if delay is None:
+                    dead += 1
+                else:
+                    retried += 1
+            conn.commit()
+        finally:
+            cursor.close()
+        return DispatchStats(len(delivered), retried, dead)
+
+    def run(self, idle_sleep: float = 2.0, once: bool = False, retention_days: int = 7,
+            log: Callable[[str], None] = print, error_sleep: float = 5.0) -> None:
+        """Drain continuously; back off for ``idle_sleep`` seconds when the outbox is empty.
+
+        A failing batch (database gone, consumer bug) is logged and retried on
+        a fresh connection after ``error_sleep`` seconds; claimed events come
+        back when their lease expires. Only KeyboardInterrupt/SystemExit stop
+        the loop, except with ``once``, where the error propagates.
+        """
+        conn = None
+        last_purge = 0.0
+        try:
+            while True:
+                try:
+                    if conn is None:
+                        conn = self.connect()
+                    stats = self.run_once(conn)
+                    if any(stats):
+                        log(f"outbox: {stats.sent} sent, {stats.retried} to retry, {stats.dead} dead")
+                    if stats.sent + stats.retried + stats.dead >= self.batch_size:
+                        continue
+                    if once:
+                        return
+                    if time.monotonic() - last_purge > 3600:
+                        cursor = conn.cursor()
+                        try:
+                            purge_sent(cursor, retention_days)
+                            conn.commit()
+                        finally:
+                            cursor.close()
+                        last_purge = time.monotonic()
+                except Exception as err:
+                    if once:
+                        raise
+                    log(f"outbox: {type(err).__name__}: {err}; reconnecting in {error_sleep:g}s")
+                    _close_quietly(conn)
+                    conn = None
+                    time.sleep(error_sleep)
+                    continue
+                time.sleep(idle_sleep)
+        finally:
+            _close_quietly(conn)
+
+
+def _close_quietly(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.close()
+    except Exception:
+        pass
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from typing import Callable, NamedTuple
+
+from flask import Response, current_app, render_template, request
+from markupsafe import Markup
+
+from utils.compression import ENCODINGS, compress, negotiate
+
+
+class CachedPage(NamedTuple):
+    etag: str
+    variants: dict  # encoding ("identity", "gzip", "br") -> bytes
+    headers: dict  # encoding -> (etag, response headers), built once
+    uptodate: object  # Jinja's source-changed check, used in dev mode
+
+
+class RenderedPageCache:
+    """Rendered output of templates that take no per-request context.
+
+    Each page is rendered through Jinja once; its ETag and compressed
+    variants are computed at the same time. Revalidations are answered
+    with 304 from the stored ETag without rendering. With ``auto_reload``
+    (debug / TEMPLATES_AUTO_RELOAD) an entry is dropped as soon as Jinja
+    reports its template source changed.
+    """
+
+    def __init__(self, auto_reload: bool = False, min_size: int = 500):
+        self.auto_reload = auto_reload
+        self.min_size = min_size
+        self._pages = {}  # name -> (version, CachedPage); one version kept per page
+        self._fragments = {}  # name -> (version, Markup)
+        self._lock = threading.Lock()
+
+    def _render(self, name: str, context: dict) -> CachedPage:
+        env = current_app.jinja_env
+        _, _, uptodate = env.loader.get_source(env, name)
+        body = render_template(name, **context).encode("utf-8")
+        variants = {"identity": body}
+        if len(body) >= self.min_size:
+            for encoding in ENCODINGS:
+                variants[encoding] = compress(body, encoding)
+        etag = hashlib.sha256(body).hexdigest()[:16]
+        headers = {}
+        for encoding, payload in variants.items():
+            variant_etag = etag if encoding == "identity" else f"{etag}-{encoding}"
+            variant_headers = [
+                ("ETag", f'"{variant_etag}"'),
+                ("Vary", "Accept-Encoding"),
+                ("Cache-Control", "no-cache"),
+            ]
+            if encoding != "identity":
+                variant_headers.append(("Content-Encoding", encoding))
+            headers[encoding] = (variant_etag, variant_headers)
+        return CachedPage(etag, variants, headers, uptodate)
+
+    def _stale(self, page: CachedPage) -> bool:
+        return self.auto_reload and page.uptodate is not None and not page.uptodate()
+
+    def get(self, name: str, version: str | None = None, context: Callable[[], dict] | None = None) -> CachedPage:
+        """Cached page for ``version``; ``context()`` is only called when it has to be rendered.
+
+        Pages built from data (e.g. the service catalog) pass that data's
+        version, so a data change renders the page once more and changes
+        its ETag.
+        """
+        cached = self._pages.get(name)
+        if cached is not None and cached[0] == version and not self._stale(cached[1]):
+            return cached[1]
+        with self._lock:
+            # Another request may have rendered it while this one waited
+            cached = self._pages.get(name)
+            if cached is not None and cached[0] == version and not self._stale(cached[1]):
+                return cached[1]
+            page = self._render(name, context() if context else {})
+            self._pages[name] = (version, page)
+        return page
+
+    def fragment(self, name: str, version: str, context: Callable[[], dict]) -> Markup:
+        """Rendered partial template, cached per ``version``."""
+        cached = self._fragments.get(name)
+        if cached is not None and cached[0] == version and not self.auto_reload:
+            return cached[1]
+        markup = Markup(render_template(name, **context()))
+        self._fragments[name] = (version, markup)
+        return markup
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            self._fragments.clear()
+
+    def respond(self, name: str, version: str | None = None, context: Callable[[], dict] | None = None) -> Response:
+        page = self.get(name, version, context)
+        encoding = negotiate(request.accept_encodings, page.variants) or "identity"
+        etag, headers = page.headers[encoding]
+        # Weak comparison (as If-None-Match requires): a client may hold the
+        # W/ form if the page ever went out through CompressionMiddleware
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+        return Response(page.variants[encoding], headers=headers, mimetype="text/html")
+
+
+def get_page_cache() -> RenderedPageCache:
+    cache = current_app.extensions.get("page_cache")
+    if cache is None:
+        auto_reload = current_app.debug or bool(current_app.config.get("TEMPLATES_AUTO_RELOAD"))
+        # Same threshold as CompressionMiddleware, so no page is left for it to compress
+        min_size = current_app.config.get("COMPRESSION_MIN_SIZE", 500)
+        cache = current_app.extensions.setdefault(
+            "page_cache", RenderedPageCache(auto_reload=auto_reload, min_size=min_size)
+        )
+    return cache
+
+
+def cached_page(name: str) -> Response:
+    """Serve a context-free template from the rendered-page cache."""
+    return get_page_cache().respond(name)
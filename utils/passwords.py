@@ -0,0 +1,163 @@
+import hashlib
+import hmac
+import os
+import re
+import threading
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+_SHA1_RE = re.compile(r"^[0-9a-f]{40}$")
+_HEX_RE = re.compile(r"^[0-9a-f]+$")
+
+
+def identify_scheme(stored: str) -> str:
+    """Classify a stored admin password.
+
+    - ``sha1``: bare hex digest from login.py's sha1_hash
+    - ``legacy-sha256``: ``sha256$salt$hex`` fallback of appointment.py's generate_scrypt_hash
+    - ``legacy-scrypt``: ``scrypt:n:r:p$<hex salt>$hex`` from generate_scrypt_hash
+    - ``scrypt`` / ``pbkdf2``: werkzeug.security hashes
+    """
+    stored = stored.strip()
+    if _SHA1_RE.match(stored):
+        return "sha1"
+    method, _, rest = stored.partition("$")
+    salt = rest.partition("$")[0]
+    if method == "sha256":
+        return "legacy-sha256"
+    if method.startswith("scrypt"):
+        # werkzeug salts are 16 alphanumerics; generate_scrypt_hash used 16 random bytes as hex
+        return "legacy-scrypt" if len(salt) == 32 and _HEX_RE.match(salt) else "scrypt"
+    if method.startswith("pbkdf2"):
+        return "pbkdf2"
+    return "unknown"
+
+
+def _verify_legacy_scrypt(stored: str, password: str) -> bool:
+    method, salt, expected = stored.split("$", 2)
+    n, r, p = (int(x) for x in method.split(":")[1:4])
+    computed = hashlib.scrypt(
+        password.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p, maxmem=132 * n * r * p
+    ).hex()
+    return hmac.compare_digest(computed, expected)
+
+
+def verify_any(stored: str | None, password: str) -> bool:
+    """Verify ``password`` against any supported stored format, in constant time per format."""
+    if not stored:
+        return False
+    stored = stored.strip()
+    scheme = identify_scheme(stored)
+    try:
+        if scheme == "sha1":
+            return hmac.compare_digest(hashlib.sha1(password.encode()).hexdigest(), stored)
+        if scheme == "legacy-sha256":
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored.rsplit("$", 1)[1])
+        if scheme == "legacy-scrypt":
+            return _verify_legacy_scrypt(stored, password)
+        if scheme in ("scrypt", "pbkdf2"):
+            return check_password_hash(stored, password)
+    except (ValueError, IndexError):
+        return False
+    return False
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class PasswordHasher:
+    """Runs password hashing/verification in a bounded process pool.
+
+    Hashing is pure CPU work that holds the GIL, so running it on the
+    request thread stalls every other request on the worker. Jobs are sent
+    to a ProcessPoolExecutor instead and at most ``max_pending`` may be
+    queued or running at once. ``workers=0`` hashes inline.
+    """
+
+    def __init__(self, method, salt_length=16, workers=2, max_pending=32):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._target_prefix = None
+
+    def _executor(self):
+        # Created lazily and re-created after fork so prefork workers get their own pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                from concurrent.futures import ProcessPoolExecutor  # multiprocessing: only when hashing
+
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _discard(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Too many password operations in progress")
+        try:
+            pool = self._executor()
+            from concurrent.futures import BrokenExecutor  # loaded by _executor already
+
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenExecutor:
+                # A pool process died (e.g. OOM-killed); the pool refuses all
+                # further work, so replace it and retry this job once
+                self._discard(pool)
+                return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, stored_hash: str | None, password: str) -> bool:
+        if not stored_hash:
+            return False
+        return self._run(verify_any, stored_hash, password)
+
+    @property
+    def target_prefix(self) -> str:
+        """Fully expanded method string new hashes start with, e.g. 'scrypt:32768:8:1'."""
+        if self._target_prefix is None:
+            self._target_prefix = generate_password_hash("", self.method, 1).partition("$")[0]
+        return self._target_prefix
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True when a verified hash is a legacy format or uses other parameters than configured."""
+        if identify_scheme(stored_hash) not in ("scrypt", "pbkdf2"):
+            return True
+        return stored_hash.partition("$")[0] != self.target_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the app's PasswordHasher, creating it from config on first use."""
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        config = current_app.config
+        hasher = current_app.extensions.setdefault("password_hasher", PasswordHasher(
+            method=config.get("PASSWORD_HASH_METHOD", "scrypt"),
+            salt_length=config.get("PASSWORD_SALT_LENGTH", 16),
+            workers=config.get("HASH_POOL_WORKERS", 2),
+            max_pending=config.get("HASH_POOL_MAX_PENDING", 32),
+        ))
+    return hasher
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request, session
+
+
+class MemoryBucketStore:
+    """Per-process token buckets, LRU-ordered so idle keys are evicted in O(1).
+
+    Each key costs one small list. A bucket that has been idle long enough
+    to refill completely carries no information and is dropped.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at, full_at]
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now=None):
+        """Consume one token; return 0 if allowed, else seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+            return wait
+
+    def _evict(self, now):
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if bucket[2] > now and len(buckets) < self.max_keys:
+                break
+            buckets.popitem(last=False)
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file so limits hold across workers on a host."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # The constructor's connection belongs to the process that created the store
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst, now=None):
+        # Wall clock: monotonic clocks are not comparable between processes
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (burst - tokens) / rate),
+            )
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rate_buckets WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def _make_store(config):
+    backend = config.get("RATE_LIMIT_BACKEND", "memory")
+    if backend == "memory":
+        return MemoryBucketStore(config.get("RATE_LIMIT_MAX_KEYS", 100000))
+    if backend == "sqlite":
+        return SQLiteBucketStore(config.get("RATE_LIMIT_SQLITE_PATH") or "rate_limits.db")
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+def get_bucket_store():
+    store = current_app.extensions.get("rate_limit_store")
+    if store is None:
+        store = current_app.extensions.setdefault("rate_limit_store", _make_store(current_app.config))
+    return store
+
+
+def _limit_keys(rule):
+    keys = [("ip", request.remote_addr or "unknown")]
+    if rule.get("per_username"):
+        # Runs before the route validates the body: tolerate any JSON shape
+        data = request.get_json(silent=True)
+        username = data.get("username") if isinstance(data, dict) else None
+        if not isinstance(username, str) or not username.strip():
+            username = session.get("username")
+        username = username.strip().lower() if isinstance(username, str) else ""
+        if username:
+            keys.append(("user", username))
+    return keys
+
+
+def enforce_rate_limit():
+    """before_request hook: answer 429 when a per-IP or per-username bucket is empty."""
+    config = current_app.config
+    if not config.get("RATE_LIMIT_ENABLED", True):
+        return None
+    rule = config.get("RATE_LIMIT_RULES", {}).get(request.endpoint)
+    if not rule or request.method == "OPTIONS":
+        return None
+
+    store = get_bucket_store()
+    rate = rule["per_minute"] / 60.0
+    wait = 0.0
+    for kind, value in _limit_keys(rule):
+        wait = max(wait, store.take(f"{request.endpoint}:{kind}:{value}", rate, rule["burst"]))
+    if wait > 0:
+        response = jsonify({"status": "error", "message": "Too many requests, please slow down"})
+        response.headers["Retry-After"] = str(max(1, int(wait + 0.999)))
+        return response, 429
+    return None
@@ -0,0 +1,169 @@
+from datetime import date, timedelta
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+WATERMARK_TABLE = "reminder_watermark"
+LEDGER_TABLE = "reminder_ledger"
+DEFAULT_JOB = "oil_change"
+
+
+class RunResult(NamedTuple):
+    sent: int
+    failed: int
+    watermark: date | None
+
+
+def due_window(watermark: date | None, today: date, lead_days: int) -> tuple[date, date]:
+    """Due dates to cover on this run: everything after the watermark up to today + lead.
+
+    Without a watermark only the current target date is covered, so the
+    first run does not mail the whole table's history.
+    """
+    end = today + timedelta(days=lead_days)
+    start = end if watermark is None else watermark + timedelta(days=1)
+    return start, end
+
+
+def load_watermark(cursor, job: str = DEFAULT_JOB) -> date | None:
+    cursor.execute(f"SELECT last_due FROM {WATERMARK_TABLE} WHERE job = %s", (job,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return row["last_due"] if isinstance(row, dict) else row[0]
+
+
+def save_watermark(cursor, last_due: date, job: str = DEFAULT_JOB) -> None:
+    cursor.execute(
+        f"""
+        INSERT INTO {WATERMARK_TABLE} (job, last_due) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE last_due = VALUES(last_due)
+        """,
+        (job, last_due),
+    )
+
+
+def stream_due(cursor, start: date, end: date) -> Iterator[dict]:
+    """Yield cars due in [start, end] not yet sent or given up on, as they arrive.
+
+    Rows carry ``attempts``: earlier failed deliveries of this reminder.
+
+    ``cursor`` must be unbuffered (``buffered=False``) on a connection of its
+    own: rows are pulled from the server one at a time instead of the whole
+    result set being materialized before the first reminder is sent.
+    """
+    cursor.execute(
+        f"""
+        SELECT c.plate_number, c.owner_name, c.model, c.next_oil_change_due, c.owner_email,
+               COALESCE(l.attempts, 0) AS attempts
+        FROM car_maintenance c
+        LEFT JOIN {LEDGER_TABLE} l
+            ON l.plate_number = c.plate_number AND l.due_date = c.next_oil_change_due
+        WHERE c.next_oil_change_due BETWEEN %s AND %s
+          AND (l.plate_number IS NULL OR l.status = 'retry')
+        ORDER BY c.next_oil_change_due, c.plate_number
+        """,
+        (start, end),
+    )
+    yield from cursor
+
+
+def record_sent(cursor, rows: list[dict]) -> None:
+    if rows:
+        cursor.executemany(
+            f"""
+            INSERT INTO {LEDGER_TABLE} (plate_number, due_date, status) VALUES (%s, %s, 'sent')
+            ON DUPLICATE KEY UPDATE status = 'sent', last_error = NULL
+            """,
+            [(row["plate_number"], row["next_oil_change_due"]) for row in rows],
+        )
+
+
+def record_failed(cursor, failures: list[tuple]) -> None:
+    """Ledger ``(row, status, attempts, error)`` failures: 'retry' rows come back next run, 'failed' ones never."""
+    if failures:
+        cursor.executemany(
+            f"""
+            INSERT INTO {LEDGER_TABLE} (plate_number, due_date, status, attempts, last_error)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE status = VALUES(status), attempts = VALUES(attempts),
+                last_error = VALUES(last_error)
+            """,
+            [(row["plate_number"], row["next_oil_change_due"], status, attempts, str(error)[:255])
+             for row, status, attempts, error in failures],
+        )
+
+
+def run_reminders(conn, read_conn, deliver: Callable[[Iterable[dict]], Iterable[tuple]], today: date | None = None,
+                  lead_days: int = 15, batch_size: int = 500, job: str = DEFAULT_JOB, max_attempts: int = 5,
+                  is_transient: Callable[[Exception], bool] = lambda err: True) -> RunResult | None:
+    """Send every reminder due since the last watermark as one streaming pipeline.
+
+    fetch (``stream_due`` on ``read_conn``) -> ``deliver(rows)``, which
+    renders and sends lazily and yields ``(row, error)`` per row -> record.
+    Delivered rows are written to the ledger on ``conn`` and committed every
+    ``batch_size`` rows, so a crash loses at most one batch of bookkeeping
+    and a re-run skips everything already delivered. Failures are ledgered
+    too: transient ones (``is_transient``) as 'retry' until ``max_attempts``
+    deliveries have failed, anything else (a bounce) as 'failed'. The
+    watermark only holds back for 'retry' rows, so one dead address cannot
+    pin it. Returns None when another scheduler holds the job lock.
+    """
+    today = today or date.today()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (f"reminders:{job}",))
+        if not cursor.fetchone()["acquired"]:
+            return None
+        try:
+            previous = load_watermark(cursor, job)
+            start, end = due_window(previous, today, lead_days)
+            sent = failed = 0
+            first_failed = None
+            if start <= end:
+                read_cursor = read_conn.cursor(dictionary=True, buffered=False)
+                try:
+                    delivered, failures = [], []
+                    try:
+                        for row, error in deliver(stream_due(read_cursor, start, end)):
+                            if error is None:
+                                delivered.append(row)
+                            else:
+                                failed += 1
+                                attempts = row.get("attempts", 0) + 1
+                                retry = attempts < max_attempts and is_transient(error)
+                                failures.append((row, "retry" if retry else "failed", attempts, error))
+                                if retry:
+                                    due = row["next_oil_change_due"]
+                                    first_failed = due if first_failed is None else min(first_failed, due)
+                            if len(delivered) + len(failures) >= batch_size:
+                                sent += _flush(conn, cursor, delivered, failures)
+                    except BaseException:
+                        # These went out: record them or the next run sends them again
+                        try:
+                            _flush(conn, cursor, delivered, failures)
+                        except Exception:
+                            pass  # report the original error
+                        raise
+                    sent += _flush(conn, cursor, delivered, failures)
+                finally:
+                    read_cursor.close()
+
+            watermark = end if first_failed is None else first_failed - timedelta(days=1)
+            if previous is None or watermark > previous:
+                save_watermark(cursor, watermark, job)
+                conn.commit()
+            return RunResult(sent, failed, watermark)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (f"reminders:{job}",))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _flush(conn, cursor, delivered: list[dict], failures: list[tuple]) -> int:
+    count = len(delivered)
+    record_sent(cursor, delivered)
+    record_failed(cursor, failures)
+    conn.commit()
+    delivered.clear()
+    failures.clear()
+    return count
@@ -0,0 +1,209 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose data lives in a backend; the cookie only holds ``sid``."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.rotate = False
+        self.expires = None  # stored expiry, for sessions loaded from the backend
+
+    def clear(self):
+        # Login/logout clear the session; issue a fresh ID to avoid fixation
+        super().clear()
+        self.rotate = True
+
+
+class MemoryBackend:
+    """In-process LRU store. Only suitable for a single worker process."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        """(payload, expires) of a live session, or None."""
+        with self._lock:
+            item = self._data.get(sid)
+            if item is None:
+                return None
+            if item[1] < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return item
+
+    def get(self, sid):
+        item = self.load(sid)
+        return item[0] if item else None
+
+    def set(self, sid, payload, expires):
+        with self._lock:
+            self._data[sid] = (payload, expires)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def touch(self, sid, expires):
+        with self._lock:
+            item = self._data.get(sid)
+            if item is not None:
+                self._data[sid] = (item[0], expires)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteBackend:
+    """SQLite file store shared by every worker on the host."""
+
+    PURGE_EVERY = 500
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # A connection opened before fork (preloaded app) must not be shared with the parent
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, sid):
+        """(payload, expires) of a live session, or None."""
+        return self._conn().execute(
+            "SELECT data, expires FROM sessions WHERE sid = ? AND expires >= ?", (sid, time.time())
+        ).fetchone()
+
+    def get(self, sid):
+        row = self.load(sid)
+        return row[0] if row else None
+
+    def set(self, sid, payload, expires):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)", (sid, payload, expires))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (time.time(),))
+
+    def touch(self, sid, expires):
+        self._conn().execute("UPDATE sessions SET expires = ? WHERE sid = ?", (expires, sid))
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Stores session data in a backend and keeps only a random ID in the cookie.
+
+    Unlike the signed-cookie session there is no payload to upload or
+    HMAC-verify per request, and backends are only written when the session
+    actually changed. Stored expiries run ``touch_interval`` seconds past
+    the cookie's, so an unchanged session only needs its expiry touched
+    once per interval to outlive the cookie that refers to it.
+    """
+
+    serializer = TaggedJSONSerializer()
+    touch_interval = 300
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _expiry(self, app, session):
+        if session.permanent:
+            return time.time() + app.permanent_session_lifetime.total_seconds()
+        # browser-session cookies: keep server data for a day
+        return time.time() + 86400
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            entry = self.backend.load(sid)
+            if entry is not None:
+                try:
+                    session = ServerSideSession(self.serializer.loads(entry[0]), sid=sid)
+                except ValueError:
+                    pass
+                else:
+                    session.expires = entry[1]
+                    return session
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.rotate and not session.new:
+            self.backend.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.modified = True
+
+        if not session:
+            if not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        expires = self._expiry(app, session)
+        if session.modified:
+            self.backend.set(session.sid, self.serializer.dumps(dict(session)), expires + self.touch_interval)
+        elif session.expires is not None and expires > session.expires:
+            # Still in use but about to outlive its stored copy: extend it
+            # without rewriting the data (at most once per touch_interval)
+            self.backend.touch(session.sid, expires + self.touch_interval)
+
+        if not session.modified and not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+
+def make_session_interface(config):
+    """Build the session interface selected by SESSION_BACKEND (None keeps cookie sessions)."""
+    backend = config.get("SESSION_BACKEND", "cookie")
+    if backend == "cookie":
+        return None
+    if backend == "memory":
+        return ServerSideSessionInterface(MemoryBackend(config.get("SESSION_MEMORY_MAX_ENTRIES", 10000)))
+    if backend == "sqlite":
+        path = config.get("SESSION_SQLITE_PATH") or os.path.join(os.getcwd(), "sessions.db")
+        return ServerSideSessionInterface(SQLiteBackend(path))
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
@@ -0,0 +1,162 @@
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+
+def _is_broken(err: Exception) -> bool:
+    """True when the connection is unusable and must be replaced.
+
+    smtplib.SMTPException subclasses OSError, so protocol replies (which
+    leave the session usable) are excluded before the socket-level check.
+    """
+    if isinstance(err, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(err, OSError) and not isinstance(err, smtplib.SMTPException)
+
+
+class DispatchResult(NamedTuple):
+    sent: int
+    failed: int
+
+
+def _is_transient(err: Exception) -> bool:
+    if _is_broken(err):
+        return True
+    if isinstance(err, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in err.recipients.values())
+    if isinstance(err, smtplib.SMTPResponseException):
+        return 400 <= err.smtp_code < 500
+    return False
+
+
+class SMTPPool:
+    """A fixed number of persistent SMTP connections shared by sender threads.
+
+    Connections are opened lazily, reused across messages (no per-email
+    handshake/STARTTLS/AUTH) and recycled after ``max_messages_per_connection``
+    or when the server drops them.
+    """
+
+    def __init__(self, host, port=587, username="", password="", starttls=True, size=4,
+                 timeout=30, max_retries=3, backoff=0.5, max_messages_per_connection=100):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = set()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.username:
+            conn.login(self.username, self.password)
+        conn.sent_count = 0
+        with self._lock:
+            self._all.add(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._all.discard(conn)
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken=False):
+        if broken or conn.sent_count >= self.max_messages_per_connection:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def send(self, message) -> None:
+        """Send one EmailMessage, retrying transient failures with exponential backoff."""
+        attempt = 0
+        while True:
+            conn = None
+            try:
+                conn = self._acquire()
+                conn.send_message(message)
+                conn.sent_count += 1
+                self._release(conn)
+                return
+            except Exception as err:
+                if conn is not None:
+                    self._release(conn, broken=_is_broken(err))
+                if not _is_transient(err) or attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+
+    def iter_results(self, messages: Iterable, workers: int | None = None) -> Iterator[tuple]:
+        """Send messages in parallel, yielding ``(message, error)`` as each completes.
+
+        ``messages`` is consumed lazily and at most ``2 * workers`` are in
+        flight, so this works as a streaming pipeline stage: memory stays
+        bounded and results are available while input is still being read.
+        ``error`` is None on success.
+        """
+        workers = workers or self.size
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+            for message in messages:
+                if len(in_flight) >= workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield in_flight.pop(future), future.exception()
+                in_flight[executor.submit(self.send, message)] = message
+            for future in as_completed(list(in_flight)):
+                yield in_flight.pop(future), future.exception()
+
+    def dispatch(self, messages: Iterable, on_result: Callable | None = None, workers: int | None = None) -> DispatchResult:
+        """Send messages in parallel over the pool and count the outcomes.
+
+        ``on_result(message, error)`` is called once per message.
+        """
+        sent = failed = 0
+        for message, error in self.iter_results(messages, workers):
+            if error is None:
+                sent += 1
+            else:
+                failed += 1
+            if on_result is not None:
+                on_result(message, error)
+        return DispatchResult(sent, failed)
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
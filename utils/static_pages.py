@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+
+from flask import Response, abort, current_app, request
+from werkzeug.wsgi import wrap_file
+
+from utils.compression import ENCODINGS, compress, negotiate
+
+MANIFEST_NAME = "manifest.json"
+
+
+def write_variants(out_dir: str, filename: str, data: bytes) -> dict:
+    """Write ``data`` as ``filename`` plus its precompressed variants; returns the variant map."""
+    variants = {"identity": (filename, data)}
+    for encoding in ENCODINGS:
+        suffix = ".br" if encoding == "br" else ".gz"
+        variants[encoding] = (filename + suffix, compress(data, encoding))
+    written = {}
+    for encoding, (variant_name, payload) in variants.items():
+        _write_atomic(os.path.join(out_dir, variant_name), payload)
+        written[encoding] = {"file": variant_name, "size": len(payload)}
+    return written
+
+
+def build_pages(source_dir: str, out_dir: str, pages: list[str]) -> dict:
+    """Fingerprint and precompress ``pages`` into ``out_dir``; returns the manifest.
+
+    For each page writes ``<stem>.<hash>.html`` plus ``.gz`` (and ``.br``
+    when brotli is installed) next to it, and records names, sizes and the
+    ETag in manifest.json. Run at build time:
+    flask --app app templates build-pages
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for name in pages:
+        with open(os.path.join(source_dir, name), "rb") as fh:
+            data = fh.read()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{digest}{ext}"
+        manifest[name] = {"file": filename, "etag": digest, "variants": write_variants(out_dir, filename, data)}
+    _write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    # Unique per process and thread: concurrent writers must not share a temp file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class StaticPages:
+    """Serves prebuilt pages from the manifest.
+
+    Bytes are never read into Python: the chosen variant's file object is
+    handed to the server's wsgi.file_wrapper (sendfile where supported).
+    Plain names (/auto.html) revalidate with the ETag; fingerprinted names
+    (/pages/auto.<hash>.html) never change and are cached for a year.
+    Pages are only built on demand with ``auto_reload`` (debug); otherwise
+    a page missing from the build answers 503 until build-pages is run.
+    """
+
+    def __init__(self, source_dir: str, out_dir: str, pages: list[str], aliases: dict | None = None,
+                 max_age: int = 31536000, auto_reload: bool = False):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.pages = list(pages)
+        self.aliases = aliases or {}
+        self.max_age = max_age
+        self.auto_reload = auto_reload
+        self._built_at = 0.0
+        self._manifest = None
+        self._fingerprinted = None
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def _sources_changed(self) -> bool:
+        return any(os.stat(os.path.join(self.source_dir, name)).st_mtime > self._built_at for name in self.pages)
+
+    def manifest(self) -> dict:
+        if self._manifest is not None and self.auto_reload and self._sources_changed():
+            self._manifest = None
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    path = os.path.join(self.out_dir, MANIFEST_NAME)
+                    if os.path.exists(path):
+                        with open(path, encoding="utf-8") as fh:
+                            manifest = json.load(fh)
+                    else:
+                        manifest = {}
+                    self._built_at = os.stat(path).st_mtime if os.path.exists(path) else 0.0
+                    complete = set(manifest) >= set(self.pages)
+                    if self.auto_reload and (not complete or self._sources_changed()):
+                        # Not built yet (dev checkout) or edited in dev mode
+                        manifest = build_pages(self.source_dir, self.out_dir, self.pages)
+                        self._built_at = os.stat(path).st_mtime
+                        complete = True
+                    elif not complete and not self._warned:
+                        self._warned = True
+                        current_app.logger.error(
+                            "Static pages missing from %s: run flask --app app templates build-pages",
+                            self.out_dir)
+                    self._fingerprinted = {entry["file"]: name for name, entry in manifest.items()}
+                    if not complete:
+                        # Not cached, so a build-pages run is picked up without a restart
+                        return manifest
+                    self._manifest = manifest
+        return self._manifest
+
+    def url_for(self, name: str) -> str:
+        """Fingerprinted URL of a page, for links that should be cached forever."""
+        return f"/pages/{self.manifest()[name]['file']}"
+
+    def serve(self, name: str) -> Response:
+        name = self.aliases.get(name, name)
+        entry = self.manifest().get(name)
+        if entry is None:
+            abort(503 if name in self.pages else 404)
+        return self._respond(entry, immutable=False)
+
+    def serve_fingerprinted(self, filename: str) -> Response:
+        manifest = self.manifest()
+        name = self._fingerprinted.get(filename)
+        if name is None:
+            abort(404)
+        return self._respond(manifest[name], immutable=True)
+
+    def _respond(self, entry: dict, immutable: bool) -> Response:
+        return send_variant(self.out_dir, entry, "text/html", self.max_age if immutable else None)
+
+
+def send_variant(out_dir: str, entry: dict, mimetype: str, max_age: int | None = None) -> Response:
+    """Serve the best precompressed variant of a manifest entry through wsgi.file_wrapper.
+
+    With ``max_age`` the response is public and immutable (fingerprinted
+    names); without it the client revalidates with the ETag every time.
+    """
+    variants = entry["variants"]
+    encoding = negotiate(request.accept_encodings, variants)
+    response = Response(mimetype=mimetype)
+    response.set_etag(f"{entry['etag']}-{encoding}" if encoding else entry["etag"])
+    response.vary.add("Accept-Encoding")
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+
+    variant = variants[encoding or "identity"]
+    fh = open(os.path.join(out_dir, variant["file"]), "rb")
+    response.response = wrap_file(request.environ, fh)
+    response.direct_passthrough = True
+    response.content_length = variant["size"]
+    if encoding:
+        response.content_encoding = encoding
+    return response
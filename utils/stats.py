@@ -0,0 +1,104 @@
+from datetime import timedelta
+from typing import Any, Iterable, NamedTuple
+
+SUMMARY_TABLE = "booking_daily_summary"
+
+
+def slot_key(time_val: Any) -> str:
+    """Normalize a TIME value (timedelta from MySQL or 'H:MM[:SS]' string) to 'HH:MM'."""
+    if isinstance(time_val, timedelta):
+        minutes = int(time_val.total_seconds()) // 60
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    hours, minutes = str(time_val).split(":")[:2]
+    return f"{int(hours):02d}:{int(minutes):02d}"
+
+
+def summary_deltas(date: Any, time_val: Any, service_ids: Iterable, delta: int) -> list[tuple]:
+    """Rows to upsert into the summary table for one booking."""
+    rows = [(date, "total", "", delta), (date, "slot", slot_key(time_val), delta)]
+    rows.extend((date, "service", str(sid), delta) for sid in service_ids)
+    return rows
+
+
+def apply_booking_delta(cursor, date: Any, time_val: Any, service_ids: Iterable, delta: int) -> None:
+    """Add ``delta`` bookings to the counters for a date/slot/services.
+
+    Must run on the caller's cursor, inside the same transaction as the
+    appointment change, so the summary never drifts from the base tables.
+    """
+    cursor.executemany(
+        f"""
+        INSERT INTO {SUMMARY_TABLE} (Summary_date, Dimension, Dim_key, Bookings)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE Bookings = Bookings + VALUES(Bookings)
+        """,
+        summary_deltas(date, time_val, service_ids, delta),
+    )
+
+
+class BookingRow(NamedTuple):
+    date: Any
+    time: Any
+    service_ids: list
+    car_plate: str | None
+    version: int | None
+
+
+def fetch_booking(cursor, appointment_id: int) -> BookingRow | None:
+    """Lock an appointment row and return its current booking, or None."""
+    cursor.execute(
+        "SELECT Date, Time, Car_plate, Version FROM appointment WHERE Appointment_id = %s FOR UPDATE",
+        (appointment_id,),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    cursor.execute(
+        "SELECT Service_ID FROM appointment_service WHERE Appointment_id = %s",
+        (appointment_id,),
+    )
+    return BookingRow(row[0], row[1], [r[0] for r in cursor.fetchall()], row[2], row[3])
+
+
+def rebuild_summary(conn) -> int:
+    """Recompute the whole summary table from appointment/appointment_service.
+
+    Runs as one transaction so readers see either the old or the new counters.
+    Returns the number of summary rows written.
+    """
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute(f"DELETE FROM {SUMMARY_TABLE}")
+        cursor.execute(
+            f"""
+            INSERT INTO {SUMMARY_TABLE} (Summary_date, Dimension, Dim_key, Bookings)
+            SELECT Date, 'total', '', COUNT(*) FROM appointment GROUP BY Date
+            """
+        )
+        written = cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {SUMMARY_TABLE} (Summary_date, Dimension, Dim_key, Bookings)
+            SELECT Date, 'slot', TIME_FORMAT(Time, '%H:%i'), COUNT(*)
+            FROM appointment GROUP BY Date, TIME_FORMAT(Time, '%H:%i')
+            """
+        )
+        written += cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {SUMMARY_TABLE} (Summary_date, Dimension, Dim_key, Bookings)
+            SELECT a.Date, 'service', CAST(aps.Service_ID AS CHAR), COUNT(*)
+            FROM appointment a
+            JOIN appointment_service aps ON a.Appointment_id = aps.Appointment_id
+            GROUP BY a.Date, aps.Service_ID
+            """
+        )
+        written += cursor.rowcount
+        conn.commit()
+        return written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
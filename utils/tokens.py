@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+
+from flask import current_app, g, request, session
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(secret: bytes, payload: str) -> str:
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(secret: bytes, subject: str, scopes: list[str], ttl: int, now: float | None = None) -> tuple[str, dict]:
+    """Create a ``v1.<payload>.<signature>`` bearer token; returns (token, claims)."""
+    now = time.time() if now is None else now
+    claims = {"sub": subject, "scp": sorted(set(scopes)), "exp": int(now + ttl), "jti": secrets.token_urlsafe(12)}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"v1.{payload}.{_sign(secret, payload)}", claims
+
+
+def verify_token(secret: bytes, token: str, now: float | None = None) -> dict:
+    """Return the claims of a valid, unexpired token or raise InvalidToken.
+
+    Only an HMAC and a JSON decode: no database lookup.
+    """
+    try:
+        version, payload, signature = token.split(".")
+        # Header values can carry any latin-1 text; ours are base64url (ASCII) only
+        signature = signature.encode("ascii")
+        expected = _sign(secret, payload).encode("ascii")
+    except (AttributeError, ValueError):  # UnicodeEncodeError is a ValueError
+        raise InvalidToken("Malformed token")
+    if version != "v1" or not hmac.compare_digest(expected, signature):
+        raise InvalidToken("Bad signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if claims.get("exp", 0) <= (time.time() if now is None else now):
+        raise InvalidToken("Token expired")
+    return claims
+
+
+class RevocationSet:
+    """Revoked token IDs, kept only until the token would have expired anyway."""
+
+    def __init__(self):
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: float) -> None:
+        with self._lock:
+            now = time.time()
+            self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+            self._revoked[jti] = exp
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._revoked
+
+
+def token_secret() -> bytes:
+    secret = current_app.config.get("API_TOKEN_SECRET") or current_app.config["SECRET_KEY"]
+    return secret.encode() if isinstance(secret, str) else secret
+
+
+def get_revocations() -> RevocationSet:
+    revocations = current_app.extensions.get("token_revocations")
+    if revocations is None:
+        revocations = current_app.extensions.setdefault("token_revocations", RevocationSet())
+    return revocations
+
+
+def is_authorized(scope: str) -> bool:
+    """True for a logged-in session or a bearer token carrying ``scope``."""
+    if session.get("logged_in"):
+        return True
+    claims = g.get("api_token")
+    return bool(claims) and scope in claims["scp"]
+
+
+def has_query_token(scope: str, param: str = "token") -> bool:
+    """True when the ``?token=`` query parameter is a valid token carrying ``scope``.
+
+    For clients that can only be handed a URL, such as calendar
+    subscriptions; issue such a token with only the scope the URL needs.
+    """
+    token = request.args.get(param)
+    if not token:
+        return False
+    try:
+        claims = verify_token(token_secret(), token)
+    except InvalidToken:
+        return False
+    return claims["jti"] not in get_revocations() and scope in claims["scp"]